@@ -0,0 +1,88 @@
+"""Compare HTML parser backends on saved pages.
+
+Usage: python bench_parsers.py page1.html [page2.html ...] [--rounds N]
+
+Each page is run through the same extractors the bot uses, once per installed
+backend ('html.parser', 'lxml', 'selectolax'), and the average time per page is printed.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import time
+
+import main
+
+EXTRACTORS = [
+    'extract_imagetwist_urls',
+    'extract_vidoza_urls',
+    'extract_streamtape_urls',
+    'extract_luluvid_urls',
+    'extract_stream2z_urls',
+    'extract_image_sample_style',
+    'extract_video_sample_style',
+    'extract_erome_media_links',
+]
+
+def available_backends():
+    """Backends that can run in this environment"""
+    backends = ['html.parser']
+    if main.LXML_AVAILABLE:
+        backends.append('lxml')
+    if main.SELECTOLAX_AVAILABLE:
+        backends.append('selectolax')
+    return backends
+
+def run_extractors(url, html):
+    """Run every benchmarked extractor on one fresh snapshot, like a single bot job"""
+    snapshot = main.PageSnapshot(url, html=html)
+    results = {}
+    for name in EXTRACTORS:
+        results[name] = getattr(main.content_extractor, name)(url, snapshot)
+    return results
+
+def bench_page(url, html, backend, rounds):
+    """Average seconds to extract one page with the given backend"""
+    main.HTML_PARSER = backend
+    start = time.perf_counter()
+    for _ in range(rounds):
+        results = run_extractors(url, html)
+    return (time.perf_counter() - start) / rounds, results
+
+def count_items(results):
+    """Number of items each extractor found, to spot backends that disagree"""
+    return {name: len(value) if isinstance(value, (list, tuple)) else value for name, value in results.items()}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on saved pages")
+    parser.add_argument('pages', nargs='+', help="Saved HTML files")
+    parser.add_argument('--rounds', type=int, default=5, help="Extraction rounds per page and backend")
+    parser.add_argument('--url', default='https://example.com/page', help="URL the pages are treated as coming from")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    backends = available_backends()
+    totals = dict.fromkeys(backends, 0.0)
+
+    for path in args.pages:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        print(f"📄 {path} ({len(html) / 1024:.0f} KB)")
+        baseline = None
+        for backend in backends:
+            with contextlib.redirect_stdout(io.StringIO()):  # Extractors print debug output
+                elapsed, results = bench_page(args.url, html, backend, args.rounds)
+            totals[backend] += elapsed
+            counts = count_items(results)
+            if baseline is None:
+                baseline = counts
+            note = "" if counts == baseline else f"  ⚠️ results differ from {backends[0]}: {counts}"
+            print(f"   {backend:<12} {elapsed * 1000:8.1f} ms{note}")
+
+    print("📊 Total per backend:")
+    for backend in backends:
+        speedup = totals[backends[0]] / totals[backend] if totals[backend] else 0
+        print(f"   {backend:<12} {totals[backend] * 1000:8.1f} ms  ({speedup:.1f}x)")
+
+if __name__ == '__main__':
+    main_cli()
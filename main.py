@@ -9,14 +9,30 @@ import aiohttp
 import aiofiles
 import time
 import random
-from urllib.parse import urlparse, urljoin
+import shutil
+import json
+import sqlite3
+import hashlib
+import math
+import copy
+import itertools
+import contextlib
+import mmap
+import struct
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin, parse_qsl, urlencode
 from bs4 import BeautifulSoup
-from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, ConversationHandler
+from telegram import Update, InputMediaPhoto
+from telegram.error import RetryAfter
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, ConversationHandler, BaseRateLimiter
 from telethon import TelegramClient
-from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser, DocumentAttributeVideo
+from telethon import utils as telethon_utils
+from telethon.sessions import StringSession
+from telethon.tl.types import InputPeerChannel, InputPeerChat, InputPeerUser, DocumentAttributeVideo, InputFile, InputFileBig
+from telethon.tl.functions.upload import SaveBigFilePartRequest, SaveFilePartRequest
 from telethon.tl.functions.channels import GetFullChannelRequest, CreateForumTopicRequest
-from telethon.errors import SessionPasswordNeededError
+from telethon.errors import SessionPasswordNeededError, FloodWaitError
 from tqdm import tqdm
 
 from flask import Flask # Import Flask
@@ -78,6 +94,13 @@ async def memory_efficient_video_upload(bot, chat_id, video_file, caption="", re
             logger.warning("⚠️ High memory usage detected, forcing garbage collection")
             force_garbage_collection()
         
+        info = await prepare_video_for_upload(video_file) or {}
+        dimensions = {
+            'width': info.get('width') or None,
+            'height': info.get('height') or None,
+            'duration': round(info['duration']) if info.get('duration') else None,
+        }
+
         file_size = os.path.getsize(video_file)
         file_size_mb = file_size / (1024 * 1024)
         
@@ -112,8 +135,7 @@ async def memory_efficient_video_upload(bot, chat_id, video_file, caption="", re
                     video=streaming_file,
                     caption=caption,
                     supports_streaming=True,
-                    width=1920,
-                    height=1080,
+                    **dimensions,
                     reply_to_message_id=reply_to_message_id
                 )
         else:
@@ -126,8 +148,7 @@ async def memory_efficient_video_upload(bot, chat_id, video_file, caption="", re
                     video=video,
                     caption=caption,
                     supports_streaming=True,
-                    width=1920,
-                    height=1080,
+                    **dimensions,
                     reply_to_message_id=reply_to_message_id
                 )
         
@@ -136,6 +157,7 @@ async def memory_efficient_video_upload(bot, chat_id, video_file, caption="", re
         memory_used = final_memory - initial_memory
         
         logger.info(f"✅ Video upload successful! Memory used: {memory_used:.1f}MB")
+        media_registry.record_bot_message(video_file, result)
         
         # Force garbage collection after upload
         force_garbage_collection()
@@ -178,8 +200,9 @@ async def validate_group_and_topic(group_id, topic_id=None):
         
         # Validate group ID
         try:
-            group_entity = await telegram_client.get_entity(group_id)
-            logger.info(f"✅ Group validation successful: {group_entity.title}")
+            group = await peer_cache.get(telegram_client, group_id)
+            group_entity = group['peer']
+            logger.info(f"✅ Group validation successful: {group['title']}")
         except Exception as e:
             logger.error(f"❌ Group validation failed: {e}")
             return False, f"Invalid group ID: {e}"
@@ -230,6 +253,14 @@ except ImportError:
     YT_DLP_AVAILABLE = False
     logger.warning("⚠️ yt-dlp not available. Video downloads may fail.")
 
+# Import cryptography for AES-128 encrypted HLS streams
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+    logger.warning("⚠️ cryptography not available, AES-128 HLS streams cannot be decrypted")
+
 # Import streamlit for JWPlayer video downloads (alternative approach)
 try:
     import streamlit as st
@@ -239,6 +270,23 @@ except ImportError:
     STREAMLIT_AVAILABLE = False
     logger.warning("⚠️ Streamlit not available, using yt-dlp method only")
 
+# Import faster HTML parsers (html.parser is used when neither is installed)
+try:
+    import lxml
+    LXML_AVAILABLE = True
+    logger.info(f"✅ lxml {lxml.__version__} available for HTML parsing")
+except ImportError:
+    LXML_AVAILABLE = False
+    logger.warning("⚠️ lxml not available, BeautifulSoup will use html.parser")
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+    logger.info("✅ selectolax available for fast HTML queries")
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+    logger.warning("⚠️ selectolax not available, HTML queries will use BeautifulSoup")
+
 # Detect if running on VPS/Server (no display)
 def is_vps_environment():
     """Detect if running on VPS/Server environment"""
@@ -281,6 +329,406 @@ except ImportError:
     CHANNEL_ID = "-1002679595778"
     GROUP_ID = "-1001234567890"
 
+# Download tuning
+IMAGE_DOWNLOAD_CONCURRENCY = 8  # Images downloaded in parallel per job
+IMAGE_DOWNLOAD_PER_HOST = 4  # Parallel image downloads allowed against a single host
+MEDIA_SUBPROCESS_CONCURRENCY = 2  # ffmpeg / yt-dlp processes allowed to run at once
+HLS_SEGMENT_CONCURRENCY = 8  # HLS segments fetched in parallel per stream
+HLS_SEGMENT_RETRIES = 3  # Attempts per HLS segment before the download fails
+VIDEO_DOWNLOAD_CONNECTIONS = 8  # Parallel byte-range connections per direct video download
+VIDEO_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Bytes fetched per range request
+VIDEO_DOWNLOAD_WRITE_BLOCK = 2 * 1024 * 1024  # Bytes buffered per range before a write (done in a thread)
+PIPELINED_UPLOAD_MIN_SIZE = 50 * 1024 * 1024  # Videos at least this large upload while downloading
+
+# Upload tuning
+UPLOAD_WORKERS = 8  # Upload parts in flight at once per file (built-in and pipelined uploads)
+UPLOAD_PART_SIZE = 512 * 1024  # Bytes per part; must divide 512KB and be a multiple of 1KB
+UPLOAD_PART_RETRIES = 5  # Attempts per part before the whole upload fails
+UPLOAD_CONNECTIONS = 2  # Pool connections one upload spreads its parts over
+NATIVE_UPLOAD_ENABLED = True  # Try the built-in parallel uploader before FastTelethonhelper
+
+# Video probe tuning
+VIDEO_FASTSTART_REMUX = True  # Remux MP4s whose moov sits after the media data, so playback starts instantly
+VIDEO_PROBE_TIMEOUT = 30  # Seconds ffprobe may take on formats the MP4 reader can't handle
+VIDEO_PROBE_CACHE_SIZE = 64  # Probe results kept for files that are uploaded more than once
+
+# Posting tuning
+MEDIA_GROUP_SIZE = 10  # Telegram allows at most 10 items per album
+SEND_RATE_GLOBAL = 30  # Messages per second across all chats
+SEND_RATE_PRIVATE = 1  # Messages per second in one private chat
+SEND_BURST_PRIVATE = 3
+SEND_RATE_GROUP = 20 / 60  # Messages per second in one group or channel (20 per minute)
+SEND_BURST_GROUP = 20
+SEND_RATE_TOPIC = 1  # Messages per second in one forum topic
+SEND_RATE_EDIT = 1  # Message edits per second in one chat (progress updates), paced apart from new messages
+SEND_BURST_EDIT = 2
+
+# Job queue tuning
+JOB_DB_PATH = 'bot_jobs.db'  # SQLite file holding queued and running jobs
+JOB_WORKERS = 2  # Jobs processed at the same time (never more than one per user)
+JOB_MAX_ATTEMPTS = 3  # Restarts a job may survive before it is marked failed
+JOB_POLL_INTERVAL = 30  # Seconds an idle worker waits before rechecking blocked jobs
+SELECTION_TIMEOUT = 300  # Seconds a video type selection menu stays valid
+
+# Peer cache tuning
+PEER_CACHE_TTL = 6 * 60 * 60  # Seconds a resolved channel/group peer is trusted before it is resolved again
+
+# Client pool tuning
+CLIENT_POOL_SIZE = 3  # Telethon connections uploads are spread across (extras reuse the bot_session login)
+CLIENT_POOL_RECONNECT_ATTEMPTS = 5  # Tries before an unhealthy pool connection is left offline
+CLIENT_POOL_RECONNECT_DELAY = 5  # Seconds added to the wait before each further reconnect attempt
+
+# Dedupe tuning
+DEDUPE_RESHARE_EXISTING = True  # Forward the existing channel post to the user when a link was already posted
+DEDUPE_BLOOM_CAPACITY = 1_000_000  # Entries the in-memory filter is sized for
+DEDUPE_BLOOM_ERROR_RATE = 0.001  # False positive rate at capacity (each false positive costs one SQLite lookup)
+
+# Extraction cache tuning
+EXTRACTION_CACHE_SIZE = 256  # Extraction results kept in memory (least recently used are dropped)
+EXTRACTION_CACHE_TTL = 15 * 60  # Seconds a cached extraction result stays valid
+EXTRACTION_CACHE_HOST_TTLS = {'streamtape': 60, 'strtape': 60}  # Shorter TTLs for hosts whose links expire quickly
+EXTRACTION_CACHE_TOKEN_PARAMS = ('token', 'expires', 'exp', 'signature', 'sig')  # Query params of signed links
+EXTRACTION_CACHE_TOKEN_TTL = 60  # TTL of results containing signed links
+EXTRACTION_HEDGE_DELAY = 3.0  # Seconds before a slow extraction method is hedged with its fallback
+EXTRACTION_THREADS = 4  # Worker threads for page extractors (losing fallback attempts finish here, off the default pool)
+EMBED_RESOLVE_PER_HOST = 4  # Embed/host pages resolved in parallel against one host
+EMBED_RESOLVE_TTL = 5 * 60  # Seconds a resolved direct link is reused before resolving again
+
+# Parser tuning
+HTML_PARSER = 'auto'  # 'auto', 'selectolax', 'lxml' or 'html.parser'; 'auto' picks the fastest installed backend
+
+def get_flood_wait_seconds(error):
+    """Seconds Telegram asked us to wait (RetryAfter / FloodWaitError), or None for other errors"""
+    if isinstance(error, RetryAfter):
+        retry_after = error.retry_after
+        return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else float(retry_after)
+    if isinstance(error, FloodWaitError):
+        return float(error.seconds)
+    return None
+
+class TokenBucket:
+    """Token bucket refilled at a fixed rate; acquire() waits until a token is available"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class SendScheduler:
+    """Paces Telegram sends with token buckets (global, per chat, per topic) and honours server flood waits"""
+
+    def __init__(self):
+        self.global_bucket = TokenBucket(SEND_RATE_GLOBAL, SEND_RATE_GLOBAL)
+        self.buckets = {}
+        self.blocked_until = {}
+
+    def _bucket(self, key, rate, capacity):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    async def acquire(self, chat_id, topic_id=None, edit=False):
+        """Wait until one more message may be sent to this chat (and topic)"""
+        chat_key = str(chat_id)
+        while True:
+            wait_time = self.blocked_until.get(chat_key, 0) - time.monotonic()
+            if wait_time <= 0:
+                break
+            await asyncio.sleep(wait_time)
+
+        if edit:
+            # Edits (mostly progress messages) have their own bucket so they never delay new messages
+            await self._bucket(f"{chat_key}:edits", SEND_RATE_EDIT, SEND_BURST_EDIT).acquire()
+        elif chat_key.isdigit():
+            # Positive ids are private chats
+            await self._bucket(chat_key, SEND_RATE_PRIVATE, SEND_BURST_PRIVATE).acquire()
+        else:
+            await self._bucket(chat_key, SEND_RATE_GROUP, SEND_BURST_GROUP).acquire()
+            if topic_id:
+                await self._bucket(f"{chat_key}:{topic_id}", SEND_RATE_TOPIC, 1).acquire()
+        await self.global_bucket.acquire()
+
+    def report_flood_wait(self, chat_id, seconds):
+        """Hold back every send to a chat until Telegram's retry-after has passed"""
+        chat_key = str(chat_id)
+        self.blocked_until[chat_key] = max(self.blocked_until.get(chat_key, 0), time.monotonic() + seconds)
+
+    async def run(self, send, chat_id, topic_id=None, label="send", max_retries=3, edit=False):
+        """Run a send (a coroutine factory) within the chat's limits, retrying after flood waits"""
+        for attempt in range(max_retries):
+            await self.acquire(chat_id, topic_id, edit)
+            try:
+                return await send()
+            except (RetryAfter, FloodWaitError) as e:
+                wait_time = get_flood_wait_seconds(e)
+                self.report_flood_wait(chat_id, wait_time)
+                if attempt == max_retries - 1:
+                    logger.error(f"❌ {label} to {chat_id}: still flood limited after {max_retries} attempts")
+                    raise
+                logger.warning(f"⚠️ Flood control on {label} to {chat_id}, waiting {wait_time:.0f}s (attempt {attempt + 1}/{max_retries})")
+
+send_scheduler = SendScheduler()
+
+class SchedulerRateLimiter(BaseRateLimiter):
+    """Routes every Bot API send through send_scheduler so it shares limits with the Telethon senders.
+
+    Edits are paced in a separate per-chat bucket (SEND_RATE_EDIT): frequent progress-message edits
+    would otherwise use up the tokens of the replies users are waiting for. They still share the
+    global rate and any flood wait on the chat.
+    """
+
+    PACED_ENDPOINTS = ('send', 'copy', 'forward', 'edit')
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+        if chat_id is None or not endpoint.startswith(self.PACED_ENDPOINTS):
+            return await callback(*args, **kwargs)
+
+        # Group posts reply to the topic's root message, so that id identifies the topic
+        topic_id = data.get('message_thread_id')
+        reply_parameters = data.get('reply_parameters')
+        if not topic_id and reply_parameters:
+            if isinstance(reply_parameters, dict):
+                topic_id = reply_parameters.get('message_id')
+            else:
+                topic_id = getattr(reply_parameters, 'message_id', None)
+        topic_id = topic_id or data.get('reply_to_message_id')
+
+        return await send_scheduler.run(lambda: callback(*args, **kwargs), chat_id, topic_id, label=endpoint,
+                                        edit=endpoint.startswith('edit'))
+
+class MediaRegistry:
+    """Remembers the Telegram references returned by the first upload of each local media file"""
+
+    def __init__(self, max_entries=500):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+
+    def _key(self, file_path):
+        # Size and mtime are part of the key so a reused temp filename never matches an older upload
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+    def _entry(self, file_path):
+        key = self._key(file_path)
+        if key is None:
+            return None
+        entry = self.entries.setdefault(key, {})
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def record_bot_message(self, file_path, message):
+        """Store the Bot API file_id and source message of an upload"""
+        if message is None:
+            return
+        if message.photo:
+            kind, file_id = 'photo', message.photo[-1].file_id
+        elif message.video:
+            kind, file_id = 'video', message.video.file_id
+        elif message.document:
+            kind, file_id = 'document', message.document.file_id
+        else:
+            return
+        entry = self._entry(file_path)
+        if entry is not None and 'bot_file_id' not in entry:
+            entry.update(kind=kind, bot_file_id=file_id, chat_id=message.chat_id, message_id=message.message_id)
+
+    def record_telethon_message(self, file_path, message):
+        """Store the Telethon input media (InputDocument/InputPhoto) of an upload"""
+        media = getattr(message, 'media', None)
+        if media is None:
+            return
+        try:
+            input_media = telethon_utils.get_input_media(media)
+        except Exception:
+            return
+        entry = self._entry(file_path)
+        if entry is not None and 'telethon_media' not in entry:
+            entry['telethon_media'] = input_media
+            entry.setdefault('chat_id', message.chat_id)
+            entry.setdefault('message_id', message.id)
+
+    def get(self, file_path):
+        """Return the recorded references for a file, or None if it was never uploaded"""
+        key = self._key(file_path)
+        return self.entries.get(key) if key else None
+
+    def forget(self, file_path):
+        """Drop the references of a file that is about to be deleted"""
+        key = self._key(file_path)
+        if key:
+            self.entries.pop(key, None)
+
+media_registry = MediaRegistry()
+
+async def send_media_by_reference(bot, file_path, chat_id, topic_id=None, caption=""):
+    """Send an already-uploaded file to another chat/topic by reference; returns the sent message or None"""
+    entry = media_registry.get(file_path)
+    if not entry:
+        return None
+
+    # 1. Resend the Bot API file_id
+    if bot and entry.get('bot_file_id'):
+        try:
+            if entry['kind'] == 'photo':
+                return await bot.send_photo(chat_id=chat_id, photo=entry['bot_file_id'], caption=caption,
+                                            reply_to_message_id=topic_id)
+            if entry['kind'] == 'document':
+                return await bot.send_document(chat_id=chat_id, document=entry['bot_file_id'], caption=caption,
+                                               reply_to_message_id=topic_id)
+            return await bot.send_video(chat_id=chat_id, video=entry['bot_file_id'], caption=caption,
+                                        supports_streaming=True, reply_to_message_id=topic_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Sending by file_id failed: {e}")
+
+    # 2. Resend the Telethon InputDocument/InputPhoto
+    if entry.get('telethon_media') is not None and telegram_client and telegram_client.is_connected():
+        try:
+            entity = await peer_cache.input_peer(telegram_client, chat_id)
+            return await send_scheduler.run(
+                lambda: telegram_client.send_file(entity, entry['telethon_media'], caption=caption, reply_to=topic_id),
+                chat_id, topic_id, label="send by reference"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Sending Telethon media by reference failed: {e}")
+            peer_cache.invalidate_on_error(chat_id, e)
+
+    # 3. Copy the original message
+    if bot and entry.get('message_id'):
+        try:
+            return await bot.copy_message(chat_id=chat_id, from_chat_id=entry['chat_id'], message_id=entry['message_id'],
+                                          caption=caption, reply_to_message_id=topic_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Copying message by reference failed: {e}")
+
+    return None
+
+# --- Non-blocking ffmpeg / yt-dlp execution ---
+media_subprocess_semaphore = asyncio.Semaphore(MEDIA_SUBPROCESS_CONCURRENCY)
+
+YTDLP_PROGRESS_RE = re.compile(r'\[download\]\s+([\d.]+)%(?:\s+of\s+~?\s*([\d.]+\w+))?(?:\s+at\s+([\d.]+\w+/s))?')
+
+def parse_media_progress(line):
+    """Turn an ffmpeg `-progress` line or a yt-dlp `--newline` line into a progress update, or None"""
+    match = YTDLP_PROGRESS_RE.search(line)
+    if match:
+        return {'percent': float(match.group(1)), 'size': match.group(2), 'speed': match.group(3)}
+
+    key, separator, value = line.partition('=')
+    if not separator or value in ('', 'N/A'):
+        return None
+    try:
+        if key in ('out_time_us', 'out_time_ms'):  # ffmpeg reports both in microseconds
+            return {'seconds': int(value) / 1_000_000}
+        if key == 'total_size':
+            return {'bytes': int(value)}
+    except ValueError:
+        return None
+    if key == 'speed':
+        return {'speed': value}
+    return None
+
+def format_media_progress(progress):
+    """Short human-readable form of a progress dict"""
+    parts = []
+    if 'percent' in progress:
+        parts.append(f"{progress['percent']:.1f}%")
+    if progress.get('size'):
+        parts.append(f"of {progress['size']}")
+    if 'seconds' in progress:
+        parts.append(f"{progress['seconds']:.0f}s of media")
+    if 'bytes' in progress:
+        parts.append(f"{progress['bytes'] / 1024 / 1024:.1f}MB")
+    if progress.get('speed'):
+        parts.append(f"at {progress['speed']}")
+    return ' '.join(parts) or 'running'
+
+async def run_media_subprocess(cmd, label, timeout=None, progress_callback=None):
+    """Run ffmpeg / yt-dlp without blocking the event loop.
+
+    Returns (returncode, stderr_tail); returncode is None when the process timed out.
+    The process is killed on timeout or when the calling task is cancelled.
+    """
+    async with media_subprocess_semaphore:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=1024 * 1024
+        )
+        stderr_tail = deque(maxlen=20)
+        progress = {}
+        last_logged = [0.0]
+
+        async def read_stream(stream, keep_tail):
+            async for raw_line in stream:
+                line = raw_line.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                update = parse_media_progress(line)
+                if update:
+                    progress.update(update)
+                    if progress_callback:
+                        progress_callback(dict(progress))
+                    if time.monotonic() - last_logged[0] >= 10:
+                        last_logged[0] = time.monotonic()
+                        logger.info(f"⏳ {label}: {format_media_progress(progress)}")
+                elif keep_tail:
+                    stderr_tail.append(line)
+
+        async def kill_process():
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(read_stream(process.stdout, False), read_stream(process.stderr, True), process.wait()),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"⏰ {label} timed out after {timeout}s, killing process")
+            await kill_process()
+            return None, '\n'.join(stderr_tail)
+        except asyncio.CancelledError:
+            logger.warning(f"🛑 {label} cancelled, killing process")
+            await kill_process()
+            raise
+
+        return process.returncode, '\n'.join(stderr_tail)
+
+def get_ytdlp_command():
+    """yt-dlp executable, falling back to the installed Python module"""
+    return ['yt-dlp'] if shutil.which('yt-dlp') else [sys.executable, '-m', 'yt_dlp']
+
 # Initialize Telegram client
 telegram_client = None
 
@@ -329,13 +777,477 @@ async def init_telegram_client():
 
 # Pyrogram removed - using FastTelethon only for fast uploads
 
-def get_video_attributes_for_streaming():
-    """Get optimized video attributes for streaming without FFmpeg"""
-    # Use standard attributes that work well for streaming
+# --- Resolved peer cache ---
+
+class PeerCache:
+    """Resolved Telethon peers and forum flags per chat, plus the account's own user, so jobs skip repeated lookups"""
+
+    def __init__(self, ttl=PEER_CACHE_TTL):
+        self.ttl = ttl
+        self.client = None
+        self.peers = {}  # chat key -> {'peer', 'id', 'title', 'megagroup', 'forum', 'resolved_at'}
+        self.me = None
+        self._locks = {}
+
+    @staticmethod
+    def _key(chat_id):
+        try:
+            return int(str(chat_id).strip())
+        except ValueError:
+            return str(chat_id).strip().lstrip('@').lower()
+
+    def _use_client(self, client):
+        # Access hashes belong to one account, so a new client starts with an empty cache
+        if client is not self.client:
+            self.client = client
+            self.peers.clear()
+            self.me = None
+
+    async def get(self, client, chat_id):
+        """Cached peer record for chat_id, resolving it with get_entity on a miss"""
+        self._use_client(client)
+        key = self._key(chat_id)
+        entry = self.peers.get(key)
+        if entry and time.time() - entry['resolved_at'] < self.ttl:
+            return entry
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self.peers.get(key)
+            if entry and time.time() - entry['resolved_at'] < self.ttl:
+                return entry
+
+            # Same variants the channel upload used to try one by one
+            variants = [key] + [variant for variant in (chat_id, str(chat_id).replace('@', '')) if variant != key]
+            entity = None
+            for variant in variants:
+                try:
+                    entity = await client.get_entity(variant)
+                    break
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not resolve chat {variant}: {e}")
+            if entity is None:
+                raise ValueError(f"Could not resolve chat {chat_id}")
+
+            entry = {
+                'peer': telethon_utils.get_input_peer(entity),
+                'id': entity.id,
+                'title': getattr(entity, 'title', None) or getattr(entity, 'first_name', '') or str(chat_id),
+                'megagroup': bool(getattr(entity, 'megagroup', False)),
+                'forum': bool(getattr(entity, 'forum', False)),
+                'resolved_at': time.time(),
+            }
+            self.peers[key] = entry
+            logger.info(f"🔗 Resolved chat {chat_id}: {entry['title']} (forum: {entry['forum']})")
+            return entry
+
+    async def input_peer(self, client, chat_id):
+        """InputPeer for chat_id, usable wherever Telethon expects an entity"""
+        return (await self.get(client, chat_id))['peer']
+
+    async def get_me(self, client):
+        """The client's own user, fetched once per client"""
+        self._use_client(client)
+        if self.me is None:
+            self.me = await client.get_me()
+        return self.me
+
+    def invalidate(self, chat_id=None):
+        """Forget one chat (or everything) so the next use resolves it again"""
+        if chat_id is None:
+            self.peers.clear()
+            self.me = None
+        else:
+            self.peers.pop(self._key(chat_id), None)
+
+    def invalidate_on_error(self, chat_id, error):
+        """Drop a chat after a failed request, unless Telegram only asked us to slow down"""
+        if get_flood_wait_seconds(error) is None:
+            self.invalidate(chat_id)
+
+    async def warm(self, client):
+        """Resolve the configured channel and group and the own user ahead of the first job"""
+        chat_ids = [chat_id for chat_id in (CHANNEL_ID, GROUP_ID) if chat_id and not str(chat_id).startswith('your_')]
+        for chat_id in chat_ids:
+            try:
+                await self.get(client, chat_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not warm peer cache for {chat_id}: {e}")
+        try:
+            await self.get_me(client)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch own user: {e}")
+
+peer_cache = PeerCache()
+
+# --- Upload client pool ---
+
+class ClientPool:
+    """Extra Telethon connections on the bot_session login, so uploads from concurrent jobs don't share one connection.
+
+    The extra members reuse the primary client's auth key through a StringSession, so peers resolved
+    with the primary (see PeerCache) are valid on every member.
+    """
+
+    def __init__(self, size=CLIENT_POOL_SIZE):
+        self.size = max(1, size)
+        self.primary = None
+        self.members = []  # {'client', 'name', 'active', 'uses', 'healthy', 'task'}
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _member(client, name):
+        return {'client': client, 'name': name, 'active': 0, 'uses': 0, 'healthy': True, 'task': None}
+
+    async def _build(self, primary):
+        """Replace the members with the given primary client plus freshly connected extras"""
+        await self.stop()
+        self.primary = primary
+        self.members = [self._member(primary, 'primary')]
+        if primary is None or self.size == 1:
+            return
+        try:
+            session_string = StringSession.save(primary.session)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not copy the session for the client pool: {e}")
+            return
+        for index in range(1, self.size):
+            member = self._member(TelegramClient(StringSession(session_string), API_ID, API_HASH, receive_updates=False),
+                                  f"pool-{index}")
+            self.members.append(member)
+            try:
+                await member['client'].connect()
+                if not await member['client'].is_user_authorized():
+                    raise RuntimeError("session not authorized")
+            except Exception as e:
+                self._mark_unhealthy(member, e)
+        healthy = sum(1 for member in self.members if member['healthy'])
+        logger.info(f"🔌 Upload client pool ready: {healthy}/{len(self.members)} connections")
+
+    async def refresh(self):
+        """Rebuild the pool when init_telegram_client has replaced the global client"""
+        if telegram_client is not self.primary:
+            async with self._lock:
+                if telegram_client is not self.primary:
+                    await self._build(telegram_client)
+
+    def _mark_unhealthy(self, member, reason):
+        if not member['healthy']:
+            return
+        member['healthy'] = False
+        logger.warning(f"⚠️ Upload connection {member['name']} unhealthy ({reason}), reconnecting in background")
+        member['task'] = asyncio.create_task(self._reconnect(member))
+
+    async def _reconnect(self, member):
+        """Reconnect one member in place, leaving the rest of the pool (and the global client) alone"""
+        client = member['client']
+        for attempt in range(CLIENT_POOL_RECONNECT_ATTEMPTS):
+            await asyncio.sleep(CLIENT_POOL_RECONNECT_DELAY * attempt)
+            try:
+                if client.is_connected():
+                    await client.disconnect()
+                await client.connect()
+                if await client.is_user_authorized():
+                    member['healthy'] = True
+                    member['task'] = None
+                    logger.info(f"✅ Upload connection {member['name']} reconnected")
+                    return
+            except Exception as e:
+                logger.warning(f"⚠️ Reconnecting {member['name']} failed (attempt {attempt + 1}): {e}")
+        member['task'] = None
+        logger.error(f"❌ Upload connection {member['name']} stays offline after {CLIENT_POOL_RECONNECT_ATTEMPTS} attempts")
+
+    async def _pick(self, count):
+        await self.refresh()
+        for member in self.members:
+            if member['healthy'] and not member['client'].is_connected():
+                self._mark_unhealthy(member, "disconnected")
+        healthy = [member for member in self.members if member['healthy']]
+        # Fewest uploads in flight; ties go to the least used so idle connections take turns
+        return sorted(healthy, key=lambda member: (member['active'], member['uses']))[:count]
+
+    @contextlib.asynccontextmanager
+    async def connections(self, count):
+        """Up to count of the least busy healthy clients for one upload; falls back to the global client"""
+        members = await self._pick(max(1, count))
+        if not members:
+            yield [telegram_client]
+            return
+        for member in members:
+            member['active'] += 1
+            member['uses'] += 1
+        try:
+            yield [member['client'] for member in members]
+        except Exception as e:
+            connection_error = isinstance(e, (ConnectionError, OSError, asyncio.TimeoutError))
+            for member in members:
+                if not member['client'].is_connected() or (connection_error and len(members) == 1):
+                    self._mark_unhealthy(member, e)
+            raise
+        finally:
+            for member in members:
+                member['active'] -= 1
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """Least busy healthy client for one upload and its send"""
+        async with self.connections(1) as clients:
+            yield clients[0]
+
+    def stats(self):
+        """(name, uploads in flight, healthy) per member"""
+        return [(member['name'], member['active'], member['healthy']) for member in self.members]
+
+    async def stop(self):
+        """Disconnect the extra members; the primary client is owned by init_telegram_client"""
+        for member in self.members:
+            if member['task']:
+                member['task'].cancel()
+            if member['client'] is not self.primary:
+                try:
+                    await member['client'].disconnect()
+                except Exception as e:
+                    logger.warning(f"⚠️ Error disconnecting {member['name']}: {e}")
+        self.members = []
+        self.primary = None
+
+client_pool = ClientPool()
+
+# --- Video probing ---
+
+MP4_START_BOXES = {b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip', b'pdin', b'styp'}
+
+def _iter_mp4_boxes(read, start, end):
+    """(type, payload_start, box_end) for each box between start and end; read(offset, length) returns bytes"""
+    offset = start
+    while offset + 8 <= end:
+        header = read(offset, 16)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:  # 64-bit size follows the type
+            if len(header) < 16:
+                return
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:  # Box runs to the end of its parent
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, min(offset + size, end)
+        offset += size
+
+def _mp4_child(buf, start, end, *path):
+    """(payload_start, box_end) of the first box along path inside buf[start:end], or None"""
+    def read(offset, length):
+        return buf[offset:offset + length]
+
+    for name in path:
+        for box_type, payload, box_end in _iter_mp4_boxes(read, start, end):
+            if box_type == name:
+                start, end = payload, box_end
+                break
+        else:
+            return None
+    return start, end
+
+def _read_mp4_track(moov, start, end, info):
+    """Fill dimensions and codecs from one trak box"""
+    hdlr = _mp4_child(moov, start, end, b'mdia', b'hdlr')
+    stsd = _mp4_child(moov, start, end, b'mdia', b'minf', b'stbl', b'stsd')
+    handler = moov[hdlr[0] + 8:hdlr[0] + 12] if hdlr else b''
+    codec = moov[stsd[0] + 12:stsd[0] + 16].decode('latin-1').strip() if stsd else None
+
+    if handler == b'vide' and not info['video_codec']:
+        info['video_codec'] = codec
+        tkhd = _mp4_child(moov, start, end, b'tkhd')
+        if tkhd:
+            version = moov[tkhd[0]]
+            matrix_start = tkhd[0] + 4 + (32 if version == 1 else 20) + 16
+            a, b = struct.unpack('>ii', moov[matrix_start:matrix_start + 8])
+            width, height = struct.unpack('>II', moov[matrix_start + 36:matrix_start + 44])
+            width, height = width >> 16, height >> 16
+            if a == 0 and b != 0:  # Rotated 90/270 degrees, so the player shows it the other way round
+                width, height = height, width
+            info['width'], info['height'] = width, height
+    elif handler == b'soun' and not info['audio_codec']:
+        info['audio_codec'] = codec
+
+def probe_mp4(path):
+    """Duration, dimensions, codecs and moov position read from an MP4/MOV file's boxes, or None if it isn't one"""
+    try:
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+
+            def read_file(offset, length):
+                f.seek(offset)
+                return f.read(length)
+
+            top_level = []
+            moov = None
+            for box_type, payload, box_end in _iter_mp4_boxes(read_file, 0, file_size):
+                if not top_level and box_type not in MP4_START_BOXES:
+                    return None
+                top_level.append(box_type)
+                if box_type == b'moov':
+                    moov = read_file(payload, box_end - payload)
+                    if b'mdat' in top_level:
+                        break  # Nothing after a trailing moov matters
+        if moov is None:
+            return None
+
+        info = {
+            'container': 'mp4',
+            'duration': 0.0,
+            'width': 0,
+            'height': 0,
+            'video_codec': None,
+            'audio_codec': None,
+            # Players can only start before the download finishes when moov comes before the media data
+            'faststart': b'mdat' not in top_level or top_level.index(b'moov') < top_level.index(b'mdat'),
+        }
+        for box_type, payload, box_end in _iter_mp4_boxes(lambda offset, length: moov[offset:offset + length], 0, len(moov)):
+            if box_type == b'mvhd':
+                if moov[payload] == 1:
+                    timescale, duration = struct.unpack('>IQ', moov[payload + 20:payload + 32])
+                else:
+                    timescale, duration = struct.unpack('>II', moov[payload + 12:payload + 20])
+                info['duration'] = duration / timescale if timescale else 0.0
+            elif box_type == b'trak':
+                _read_mp4_track(moov, payload, box_end, info)
+        return info
+    except (OSError, struct.error, IndexError) as e:
+        logger.warning(f"⚠️ MP4 probe failed for {os.path.basename(path)}: {e}")
+        return None
+
+_ffprobe_path = None
+
+def get_ffprobe_path():
+    """ffprobe next to the ffmpeg the bot uses, or on PATH"""
+    global _ffprobe_path
+    if _ffprobe_path is None:
+        _ffprobe_path = shutil.which('ffprobe') or ''
+        ffmpeg_path = content_extractor.get_ffmpeg_path()
+        if not _ffprobe_path and ffmpeg_path:
+            candidate = os.path.join(os.path.dirname(ffmpeg_path), 'ffprobe' + os.path.splitext(ffmpeg_path)[1])
+            _ffprobe_path = candidate if os.path.exists(candidate) else ''
+    return _ffprobe_path or None
+
+async def run_ffprobe(path):
+    """Duration, dimensions and codecs from ffprobe, for containers the MP4 reader can't handle"""
+    ffprobe_path = get_ffprobe_path()
+    if not ffprobe_path:
+        return None
+    process = await asyncio.create_subprocess_exec(
+        ffprobe_path, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        stdout, _ = await asyncio.wait_for(process.communicate(), VIDEO_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning(f"⏰ ffprobe timed out on {os.path.basename(path)}")
+        return None
+    if process.returncode != 0:
+        return None
+
+    data = json.loads(stdout or b'{}')
+    streams = data.get('streams', [])
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), {})
+    audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), {})
+    width, height = int(video.get('width') or 0), int(video.get('height') or 0)
+    rotation = video.get('tags', {}).get('rotate') or next(
+        (side_data.get('rotation') for side_data in video.get('side_data_list', []) if 'rotation' in side_data), 0)
+    if abs(int(float(rotation or 0))) % 180 == 90:
+        width, height = height, width
+    format_name = data.get('format', {}).get('format_name', '')
+    return {
+        'container': 'mp4' if 'mp4' in format_name else format_name,
+        'duration': float(data.get('format', {}).get('duration') or video.get('duration') or 0),
+        'width': width,
+        'height': height,
+        'video_codec': video.get('codec_name'),
+        'audio_codec': audio.get('codec_name'),
+        'faststart': None,  # ffprobe doesn't report where moov sits
+    }
+
+video_probe_cache = OrderedDict()  # (path, size, mtime) -> probe result
+
+async def probe_video(path):
+    """Real duration, dimensions, codecs and faststart flag of a video file, or None when it can't be read"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key in video_probe_cache:
+        video_probe_cache.move_to_end(key)
+        return video_probe_cache[key]
+
+    # Reading the boxes only touches the headers and moov, so no subprocess is needed for MP4s
+    info = await asyncio.to_thread(probe_mp4, path)
+    if not info or not info['width']:
+        try:
+            info = await run_ffprobe(path) or info
+        except Exception as e:
+            logger.warning(f"⚠️ ffprobe failed for {os.path.basename(path)}: {e}")
+
+    video_probe_cache[key] = info
+    while len(video_probe_cache) > VIDEO_PROBE_CACHE_SIZE:
+        video_probe_cache.popitem(last=False)
+    return info
+
+async def ensure_faststart(path, info):
+    """Move moov to the front with a stream-copy remux, only when the probe found it at the end"""
+    if not VIDEO_FASTSTART_REMUX or not info or info.get('container') != 'mp4' or info.get('faststart') is not False:
+        return info
+    ffmpeg_path = content_extractor.get_ffmpeg_path()
+    if not ffmpeg_path:
+        return info
+
+    remuxed_path = f"{os.path.splitext(path)[0]}.faststart.mp4"
+    cmd = [
+        ffmpeg_path,
+        '-progress', 'pipe:1', '-nostats',
+        '-i', path,
+        '-c', 'copy',
+        '-map', '0',
+        '-movflags', '+faststart',
+        '-f', 'mp4',
+        remuxed_path,
+        '-y'
+    ]
+    returncode, stderr = await run_media_subprocess(cmd, "Faststart remux")
+    if returncode != 0 or not os.path.exists(remuxed_path):
+        logger.warning(f"⚠️ Faststart remux failed, uploading as is: {stderr}")
+        if os.path.exists(remuxed_path):
+            os.remove(remuxed_path)
+        return info
+
+    os.replace(remuxed_path, path)
+    logger.info(f"⚡ Moved moov to the front of {os.path.basename(path)} for instant playback")
+    return await probe_video(path) or info
+
+async def prepare_video_for_upload(path):
+    """Probe a video and remux it for faststart when needed; returns the probe result (or None)"""
+    info = await ensure_faststart(path, await probe_video(path))
+    if info:
+        logger.info(f"🎞️ {os.path.basename(path)}: {info['width']}x{info['height']}, {info['duration']:.1f}s, "
+                    f"{info['video_codec'] or '?'}/{info['audio_codec'] or '-'}, faststart: {info['faststart']}")
+    else:
+        logger.warning(f"⚠️ Could not probe {os.path.basename(path)}, using default video attributes")
+    return info
+
+def get_video_attributes_for_streaming(info=None):
+    """Video attributes for send_file, from the probe result when there is one"""
+    info = info or {}
     return DocumentAttributeVideo(
-        duration=0,  # Let Telegram auto-detect
-        w=1920,      # Standard HD width
-        h=1080,      # Standard HD height
+        duration=round(info.get('duration') or 0),  # 0 lets Telegram work it out
+        w=info.get('width') or 1920,
+        h=info.get('height') or 1080,
         supports_streaming=True
     )
 
@@ -351,73 +1263,102 @@ async def upload_large_video_api(video_file, caption):
                 logger.error("Failed to initialize Telegram API client for upload.")
                 return False
 
+        # Probe first: a faststart remux rewrites the file before its size is taken
+        video_attributes = get_video_attributes_for_streaming(await prepare_video_for_upload(video_file))
+
         file_size = os.path.getsize(video_file)
         file_size_mb = file_size / (1024 * 1024)
         logger.info(f"🚀 Attempting to upload {file_size_mb:.1f}MB video.")
-        
-        video_attributes = get_video_attributes_for_streaming()
 
-        # Method 1: Try FastTelethon if available
+        # Method 1: built-in parallel uploader (no third-party helper needed)
+        if NATIVE_UPLOAD_ENABLED:
+            logger.info("🚀 Uploading with the built-in parallel uploader...")
+            try:
+                channel_entity = await peer_cache.input_peer(telegram_client, CHANNEL_ID)
+
+                progress_bar = tqdm(total=file_size, unit='B', unit_scale=True, desc=f'🚀 Parallel Upload: {os.path.basename(video_file)}')
+
+                def native_progress_callback(done, total):
+                    progress_bar.update(done - progress_bar.n)
+
+                async with client_pool.connections(UPLOAD_CONNECTIONS) as upload_clients:
+                    file_object = await native_upload(video_file, upload_clients, native_progress_callback)
+
+                    result = await send_scheduler.run(
+                        lambda: upload_clients[0].send_file(
+                            channel_entity,
+                            file_object,
+                            caption=caption,
+                            supports_streaming=True,
+                            attributes=[video_attributes],
+                            thumb=None
+                        ),
+                        CHANNEL_ID, label="channel video"
+                    )
+
+                progress_bar.close()
+                logger.info(f"🚀 Parallel upload successful: {result.id}")
+                media_registry.record_telethon_message(video_file, result)
+                return True
+            except Exception as e:
+                if 'progress_bar' in locals() and progress_bar:
+                    progress_bar.close()
+                logger.warning(f"Built-in parallel upload failed: {e}. Falling back.")
+                peer_cache.invalidate_on_error(CHANNEL_ID, e)
+
+        # Method 2: Try FastTelethon if available
         if FAST_TELETHON_AVAILABLE:
             logger.info("⚡ Trying FastTelethon for ultra-fast upload...")
             try:
-                channel_entity = await telegram_client.get_entity(int(CHANNEL_ID))
+                channel_entity = await peer_cache.input_peer(telegram_client, CHANNEL_ID)
 
                 progress_bar = tqdm(total=file_size, unit='B', unit_scale=True, desc=f'⚡ FastTelethon Upload: {os.path.basename(video_file)}')
 
                 def fast_progress_callback(done, total):
                     progress_bar.update(done - progress_bar.n)
 
-                file_object = await fast_upload(
-                    telegram_client,
-                    video_file,
-                    progress_bar_function=fast_progress_callback
-                )
+                async with client_pool.acquire() as upload_client:
+                    file_object = await fast_upload(
+                        upload_client,
+                        video_file,
+                        progress_bar_function=fast_progress_callback
+                    )
 
-                result = await telegram_client.send_file(
-                    channel_entity,
-                    file_object,
-                    caption=caption,
-                    supports_streaming=True,
-                    attributes=[video_attributes],
-                    thumb=None
-                )
+                    result = await send_scheduler.run(
+                        lambda: upload_client.send_file(
+                            channel_entity,
+                            file_object,
+                            caption=caption,
+                            supports_streaming=True,
+                            attributes=[video_attributes],
+                            thumb=None
+                        ),
+                        CHANNEL_ID, label="channel video"
+                    )
 
                 progress_bar.close()
                 logger.info(f"⚡ FastTelethon upload successful: {result.id}")
+                media_registry.record_telethon_message(video_file, result)
                 return True
             except Exception as e:
                 if 'progress_bar' in locals() and progress_bar:
                     progress_bar.close()
                 logger.warning(f"FastTelethon failed: {e}. Falling back to standard upload.")
+                peer_cache.invalidate_on_error(CHANNEL_ID, e)
 
-        # Method 2: Fallback to standard Telethon upload
+        # Method 3: Fallback to standard Telethon upload
         logger.info("📤 Using standard Telethon upload...")
 
-        # Try different channel ID formats
-        channel_id_variants = [
-            CHANNEL_ID,  # Current setting from info.py (integer)
-            str(CHANNEL_ID),  # As string
-            str(CHANNEL_ID).replace('@', ''),  # Without @
-        ]
-
-        channel_entity = None
-        for variant in channel_id_variants:
-            try:
-                logger.info(f"Trying channel ID variant: {variant}")
-                channel_entity = await telegram_client.get_entity(variant)
-                logger.info(f"✅ Successfully found channel: {channel_entity.title}")
-                break
-            except Exception as e:
-                logger.warning(f"Failed to get entity with variant {variant}: {e}")
-                continue
-
-        if not channel_entity:
-            logger.error("❌ Could not find channel entity with any variant")
+        # Resolved once and cached (the cache tries the different channel ID formats)
+        try:
+            channel = await peer_cache.get(telegram_client, CHANNEL_ID)
+        except Exception as e:
+            logger.error(f"❌ Could not find channel entity with any variant: {e}")
             return False
+        channel_entity = channel['peer']
 
         # Upload the video with tqdm progress bar
-        logger.info(f"Starting video upload to channel: {channel_entity.title}")
+        logger.info(f"Starting video upload to channel: {channel['title']}")
         logger.info(f"File size: {file_size_mb:.1f}MB - Using tqdm progress tracking...")
 
         try:
@@ -436,31 +1377,36 @@ async def upload_large_video_api(video_file, caption):
                     else:
                         logger.info(f"📤 Uploaded {mb_uploaded}MB - {os.path.basename(video_file)}")
 
-            # Upload file with progress tracking and proper attributes
-            with open(video_file, 'rb') as video:
-                result = await telegram_client.send_file(
-                    channel_entity,
-                    video,
-                    caption=caption,
-                    supports_streaming=True,
-                    progress_callback=progress_callback,
-                    attributes=[video_attributes],
-                    # Additional parameters for better streaming compatibility
-                    thumb=None,  # Let Telegram generate thumbnail
-                    parse_mode=None
+            # Upload file with progress tracking; the send is retried separately so a flood wait never re-uploads
+            async with client_pool.acquire() as upload_client:
+                uploaded_file = await upload_client.upload_file(video_file, progress_callback=progress_callback)
+                result = await send_scheduler.run(
+                    lambda: upload_client.send_file(
+                        channel_entity,
+                        uploaded_file,
+                        caption=caption,
+                        supports_streaming=True,
+                        attributes=[video_attributes],
+                        # Additional parameters for better streaming compatibility
+                        thumb=None,  # Let Telegram generate thumbnail
+                        parse_mode=None
+                    ),
+                    CHANNEL_ID, label="channel video"
                 )
 
             progress_bar.close()
             logger.info(f"✅ Successfully uploaded video via Telegram API: {result.id}")
-            logger.info(f"✅ Video uploaded to channel: {channel_entity.title}")
+            logger.info(f"✅ Video uploaded to channel: {channel['title']}")
             logger.info(f"✅ Message ID: {result.id}")
+            media_registry.record_telethon_message(video_file, result)
             return True
 
         except Exception as upload_error:
             if 'progress_bar' in locals():
                 progress_bar.close()
             logger.error(f"❌ Upload failed: {upload_error}")
-            logger.error(f"❌ Channel: {channel_entity.title}")
+            logger.error(f"❌ Channel: {channel['title']}")
+            peer_cache.invalidate_on_error(CHANNEL_ID, upload_error)
             logger.error(f"❌ File: {video_file}")
             return False
         
@@ -468,6 +1414,254 @@ async def upload_large_video_api(video_file, caption):
         logger.error(f"❌ Failed to upload large video via API: {e}")
         return False
 
+class ParallelUploader:
+    """Uploads a finished file with SaveBigFilePart/SaveFilePart requests spread over several workers and clients"""
+
+    MAX_PART_SIZE = 512 * 1024  # Largest part size MTProto accepts
+    MAX_PARTS = 4000  # Parts Telegram accepts per file
+    BIG_FILE_SIZE = 10 * 1024 * 1024  # Files above this must use SaveBigFilePart
+
+    def __init__(self, clients, file_path, total_size=None, workers=None, part_size=None, progress_callback=None):
+        self.clients = clients if isinstance(clients, (list, tuple)) else [clients]
+        self.file_path = file_path
+        self.total_size = os.path.getsize(file_path) if total_size is None else total_size
+        self.workers = workers or UPLOAD_WORKERS
+        self.part_size = self._choose_part_size(part_size or UPLOAD_PART_SIZE, self.total_size)
+        self.total_parts = max(1, (self.total_size + self.part_size - 1) // self.part_size)
+        self.is_big = self.total_size > self.BIG_FILE_SIZE
+        self.file_id = random.getrandbits(63)
+        self.progress_callback = progress_callback
+        self.uploaded_bytes = 0
+        self.retries = 0
+        self.elapsed = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def _choose_part_size(cls, part_size, total_size):
+        # Telegram wants a multiple of 1KB that divides 512KB, and at most MAX_PARTS parts
+        if part_size % 1024 or cls.MAX_PART_SIZE % part_size:
+            logger.warning(f"⚠️ Invalid upload part size {part_size}, using {cls.MAX_PART_SIZE}")
+            part_size = cls.MAX_PART_SIZE
+        while part_size < cls.MAX_PART_SIZE and total_size > part_size * cls.MAX_PARTS:
+            part_size *= 2
+        return part_size
+
+    async def _wait_for_part(self, start, end):
+        """Hook for uploaders whose file is still being written; a finished file is always ready"""
+
+    def _request(self, part, data):
+        if self.is_big:
+            return SaveBigFilePartRequest(self.file_id, part, self.total_parts, data)
+        return SaveFilePartRequest(self.file_id, part, data)
+
+    async def _send_part(self, client, part, data):
+        """Upload one part, retrying it on its own without restarting the file"""
+        for attempt in range(UPLOAD_PART_RETRIES):
+            try:
+                if not await client(self._request(part, data)):
+                    raise RuntimeError(f"Telegram rejected part {part}")
+                return
+            except FloodWaitError as e:
+                self.retries += 1
+                await asyncio.sleep(e.seconds + 1)
+            except Exception as e:
+                self.retries += 1
+                if attempt == UPLOAD_PART_RETRIES - 1:
+                    raise
+                self.logger.warning(f"⚠️ Upload part {part} failed (attempt {attempt + 1}): {e}")
+                await asyncio.sleep(1 + attempt * 2)
+        raise RuntimeError(f"Upload part {part} kept hitting flood waits")
+
+    def _label(self):
+        return "Upload"
+
+    async def upload(self):
+        """Upload every part; returns an InputFile/InputFileBig for send_file"""
+        next_part = 0
+        started = time.time()
+        fd = os.open(self.file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        # os.pread lets workers read without sharing a file position; mmap covers platforms without it
+        file_map = None if hasattr(os, 'pread') else mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+
+        def read_part(start, length):
+            if file_map is None:
+                return os.pread(fd, length, start)
+            return file_map[start:start + length]
+
+        async def worker(client):
+            nonlocal next_part
+            while next_part < self.total_parts:
+                part = next_part
+                next_part += 1
+                start = part * self.part_size
+                end = min(start + self.part_size, self.total_size) - 1
+                await self._wait_for_part(start, end)
+                data = read_part(start, end - start + 1)
+                await self._send_part(client, part, data)
+                self.uploaded_bytes += len(data)
+                if self.progress_callback:
+                    self.progress_callback(self.uploaded_bytes, self.total_size)
+                if (part + 1) % 200 == 0 or part + 1 == self.total_parts:
+                    self.logger.info(f"📤 {self._label()}: {part + 1}/{self.total_parts} parts")
+
+        tasks = [asyncio.create_task(worker(self.clients[index % len(self.clients)])) for index in range(self.workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if file_map is not None:
+                file_map.close()
+            os.close(fd)
+            self.elapsed = time.time() - started
+
+        stats = self.stats()
+        upload_stats.append(stats)
+        self.logger.info(f"📊 {self._label()} finished: {stats['mb']:.1f}MB in {stats['seconds']:.1f}s "
+                         f"({stats['mb_per_second']:.1f}MB/s, {self.total_parts} parts of {self.part_size // 1024}KB, "
+                         f"{len(self.clients)} connection(s), {self.retries} retries)")
+
+        name = os.path.basename(self.file_path)
+        if self.is_big:
+            return InputFileBig(self.file_id, self.total_parts, name)
+        return InputFile(self.file_id, self.total_parts, name, '')
+
+    def stats(self):
+        """Throughput of this upload"""
+        mb = self.uploaded_bytes / (1024 * 1024)
+        return {
+            'file': os.path.basename(self.file_path),
+            'mb': mb,
+            'seconds': self.elapsed,
+            'mb_per_second': mb / self.elapsed if self.elapsed else 0.0,
+            'parts': self.total_parts,
+            'part_size': self.part_size,
+            'workers': self.workers,
+            'connections': len(self.clients),
+            'retries': self.retries,
+        }
+
+upload_stats = deque(maxlen=20)  # Stats of the most recent native uploads, shown by /speed_status
+
+class PipelinedUploader(ParallelUploader):
+    """Uploads a file to Telegram in parts while it is still being downloaded"""
+
+    def __init__(self, clients, file_path, total_size, workers=None):
+        super().__init__(clients, file_path, total_size, workers=workers)
+        self.is_big = True  # Only large videos take the pipelined path
+        self.ready_ranges = []
+        self.download_failed = False
+        self.condition = asyncio.Condition()
+
+    def mark_ready(self, start, end):
+        """Called by the downloader when bytes start..end (inclusive) are on disk"""
+        self.ready_ranges.append((start, end))
+        asyncio.get_running_loop().create_task(self._notify())
+
+    def mark_failed(self):
+        self.download_failed = True
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self):
+        async with self.condition:
+            self.condition.notify_all()
+
+    def _is_ready(self, start, end):
+        # Ranges never overlap, so the part is ready once ranges covering it add up to its length
+        covered = sum(min(end, range_end) - max(start, range_start) + 1
+                      for range_start, range_end in self.ready_ranges
+                      if range_start <= end and range_end >= start)
+        return covered >= end - start + 1
+
+    async def _wait_for_part(self, start, end):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.download_failed or self._is_ready(start, end))
+        if self.download_failed:
+            raise RuntimeError("download failed, upload aborted")
+
+    def _label(self):
+        return "Pipelined upload"
+
+async def native_upload(video_file, clients, progress_callback=None):
+    """Upload a finished file with the built-in parallel uploader; returns the InputFile for send_file"""
+    return await ParallelUploader(clients, video_file, progress_callback=progress_callback).upload()
+
+async def download_and_upload_pipelined(extractor, video_url, output_path, headers=None, caption=""):
+    """Download a large direct video and upload it to the channel at the same time.
+
+    Returns (video_file, message) on success, or None when the pipelined mode does not apply
+    (no API client, no range support, small file) or fails - callers then use the normal path.
+    """
+    if not hasattr(os, 'pread') or not hasattr(os, 'pwrite'):
+        return None
+    if not telegram_client or not telegram_client.is_connected():
+        if not await init_telegram_client():
+            return None
+
+    headers = headers or {}
+    downloader = RangedDownloader(extractor.fetcher)
+    try:
+        total_size, supports_ranges, content_type = await downloader.probe(video_url, headers)
+    except Exception as e:
+        logger.warning(f"⚠️ Pipelined upload probe failed: {e}")
+        return None
+    if (not supports_ranges or not total_size or 'text/html' in content_type
+            or total_size < PIPELINED_UPLOAD_MIN_SIZE or total_size > 2000 * 1024 * 1024):
+        return None
+
+    logger.info(f"🚀 Pipelined download+upload of {total_size / 1024 / 1024:.1f}MB to channel")
+    start_time = time.time()
+    # The downloader preallocates the file; create it first so the uploader can open it immediately
+    open(output_path, 'wb').close()
+    download_task = upload_task = None
+    try:
+        # The parts and the final send stay on the connections picked for this upload
+        async with client_pool.connections(UPLOAD_CONNECTIONS) as upload_clients:
+            uploader = PipelinedUploader(upload_clients, output_path, total_size)
+
+            async def run_download():
+                # Use the size probed above: download() would probe again and could fall back to a
+                # single-stream download that never marks ranges ready, leaving the uploader waiting
+                try:
+                    await downloader.download_known_size(video_url, output_path, total_size, headers, uploader.mark_ready)
+                except BaseException:
+                    uploader.mark_failed()
+                    raise
+                return output_path
+
+            download_task = asyncio.create_task(run_download())
+            upload_task = asyncio.create_task(uploader.upload())
+            video_file, input_file = await asyncio.gather(download_task, upload_task)
+            # Parts are already on Telegram, so only the attributes can be fixed here, not the moov position
+            video_attributes = get_video_attributes_for_streaming(await probe_video(video_file))
+            channel_entity = await peer_cache.input_peer(telegram_client, CHANNEL_ID)
+            message = await send_scheduler.run(
+                lambda: upload_clients[0].send_file(
+                    channel_entity,
+                    input_file,
+                    caption=caption,
+                    supports_streaming=True,
+                    attributes=[video_attributes],
+                    thumb=None
+                ),
+                CHANNEL_ID, label="pipelined channel video"
+            )
+    except Exception as e:
+        logger.error(f"❌ Pipelined download+upload failed: {e}")
+        peer_cache.invalidate_on_error(CHANNEL_ID, e)
+        tasks = [task for task in (download_task, upload_task) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+
+    media_registry.record_telethon_message(video_file, message)
+    logger.info(f"✅ Pipelined download+upload finished in {time.time() - start_time:.1f}s")
+    return video_file, message
+
 async def auth_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start authentication process"""
     user_id = update.effective_user.id
@@ -845,7 +2039,7 @@ class AdvancedCloudflareBypass:
     def _extract_title_from_content(self, content):
         """Extract title from HTML content"""
         try:
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = make_document(content)
             title_tag = soup.find('title')
             return title_tag.get_text().strip() if title_tag else "No title found"
         except:
@@ -861,35 +2055,1097 @@ class AdvancedCloudflareBypass:
             self.scraper = None
         self.logger.info("🔒 Cloudscraper session closed")
 
-class ContentExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.cloudscraper_client = None
-        self.logger = logging.getLogger(__name__)
+def soup_parser_name(backend=None):
+    """Tree builder BeautifulSoup should use for the configured (or given) backend"""
+    backend = backend or HTML_PARSER
+    if backend != 'html.parser' and LXML_AVAILABLE:
+        return 'lxml'
+    return 'html.parser'
+
+def fast_queries_enabled(backend=None):
+    """True when find/find_all queries should be answered by selectolax"""
+    return SELECTOLAX_AVAILABLE and (backend or HTML_PARSER) in ('auto', 'selectolax')
+
+def make_soup(markup, backend=None):
+    """BeautifulSoup tree built with the fastest available tree builder"""
+    return BeautifulSoup(markup, soup_parser_name(backend))
+
+def make_document(markup, backend=None):
+    """Queryable document: selectolax-backed when enabled, otherwise a BeautifulSoup tree"""
+    if fast_queries_enabled(backend):
+        return FastDocument(markup, lambda: make_soup(markup, backend))
+    return make_soup(markup, backend)
+
+SIMPLE_NAME_RE = re.compile(r'^[A-Za-z][\w:-]*$')
+CLASS_TOKEN_RE = re.compile(r'^[A-Za-z_-][\w-]*$')
+
+def css_for_query(name=None, attrs=None, kwargs=None):
+    """CSS selector equivalent to a simple find_all(name, attrs, **kwargs) call, or None if it has no exact equivalent"""
+    filters = dict(attrs or {})
+    for key, value in (kwargs or {}).items():
+        if key == 'class_':
+            key = 'class'
+        elif not SIMPLE_NAME_RE.match(key) or key in ('recursive', 'string', 'text', 'limit'):
+            return None
+        filters[key] = value
+    if name is None:
+        selector = '*'
+    elif isinstance(name, str) and SIMPLE_NAME_RE.match(name):
+        selector = name.lower()
+    elif isinstance(name, (list, tuple)) and not filters and all(isinstance(tag, str) and SIMPLE_NAME_RE.match(tag) for tag in name):
+        return ', '.join(tag.lower() for tag in name)  # Selector lists still match in document order
+    else:
+        return None
+    for key, value in filters.items():
+        if not isinstance(key, str) or not SIMPLE_NAME_RE.match(key):
+            return None
+        if value is True:
+            selector += f'[{key}]'
+        elif not isinstance(value, str) or '"' in value or '\\' in value:
+            return None
+        elif key == 'class' and CLASS_TOKEN_RE.match(value):
+            selector += f'.{value}'  # bs4 matches a single class against each of the element's classes
+        else:
+            selector += f'[{key}="{value}"]'
+    return selector
 
-        # Configure session for better reliability with anti-detection headers
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+class FastNode:
+    """selectolax element exposing the parts of the bs4 Tag API the extractors use"""
 
-        # Configure session for better connection handling
-        adapter = requests.adapters.HTTPAdapter(
-            max_retries=3,
-            pool_connections=10,
-            pool_maxsize=10
-        )
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return {key: value if value is not None else '' for key, value in self.node.attributes.items()}
+
+    def get(self, key, default=None):
+        value = self.node.attributes.get(key, default)
+        if value is None and key in self.node.attributes:
+            return ''
+        if key == 'class' and isinstance(value, str):
+            return value.split()
+        return value
+
+    def __getitem__(self, key):
+        if key not in self.node.attributes:
+            raise KeyError(key)
+        return self.get(key)
+
+    def has_attr(self, key):
+        return key in self.node.attributes
+
+    def get_text(self, separator='', strip=False):
+        return self.node.text(deep=True, separator=separator, strip=strip)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    @property
+    def string(self):
+        """Text of an element without child elements (script bodies, titles), like bs4's .string"""
+        if next(self.node.iter(include_text=False), None) is not None:
+            return None
+        return self.node.text(deep=False) or None
+
+    def find_all(self, name=None, attrs={}, **kwargs):
+        selector = css_for_query(name, attrs, kwargs)
+        if selector is None:
+            raise ValueError(f"Query not supported by the selectolax backend: {name!r} {attrs!r} {kwargs!r}")
+        return [FastNode(node) for node in self.node.css(selector)]
+
+    def find(self, name=None, attrs={}, **kwargs):
+        found = self.find_all(name, attrs, **kwargs)
+        return found[0] if found else None
+
+class FastDocument:
+    """selectolax (lexbor) document answering simple find/find_all queries; anything else goes to a lazily built soup"""
+
+    def __init__(self, markup, soup_factory):
+        self.markup = markup
+        self.tree = LexborHTMLParser(markup)
+        self._soup_factory = soup_factory
+
+    @property
+    def soup(self):
+        return self._soup_factory()
+
+    def find_all(self, name=None, attrs={}, **kwargs):
+        selector = css_for_query(name, attrs, kwargs)
+        if selector is None:
+            return self.soup.find_all(name, attrs, **kwargs)
+        return [FastNode(node) for node in self.tree.css(selector)]
+
+    def find(self, name=None, attrs={}, **kwargs):
+        selector = css_for_query(name, attrs, kwargs)
+        if selector is None:
+            return self.soup.find(name, attrs, **kwargs)
+        node = self.tree.css_first(selector)
+        return FastNode(node) if node is not None else None
+
+    def select_one(self, selector):
+        node = self.tree.css_first(selector)
+        return FastNode(node) if node is not None else None
+
+    def get_text(self):
+        """Visible text like soup.get_text(): script, style and template contents are left out"""
+        tree = LexborHTMLParser(self.markup)
+        tree.strip_tags(['script', 'style', 'template'])
+        return tree.root.text() if tree.root is not None else ''
+
+def has_class(node, class_name):
+    """bs4 class_ matching: one class matches any of the element's classes, several must match the whole attribute"""
+    classes = node.get('class') or []
+    if ' ' in class_name:
+        return ' '.join(classes) == class_name
+    return class_name in classes
+
+class MediaBuckets:
+    """Every img/a/video/source/iframe/script node of a page, classified in one walk so extractors only filter lists"""
+
+    TAGS = ('img', 'a', 'video', 'source', 'iframe', 'script')
+
+    def __init__(self, doc):
+        self.nodes = {tag: [] for tag in self.TAGS}  # Document order, per tag
+        self.links = []  # <a> nodes that have an href
+        self.images = {}  # media host kind -> [(url, img node, 'src' | 'data-src')]
+        self.hosted_links = {}  # media host kind -> [(href, a node)]
+        self.video_sources = []  # (src, node) of every <video> and <source> with a src
+        self._scripts = None
+        if doc is None:
+            return
+
+        for node in doc.find_all(list(self.TAGS)):
+            tag = node.name
+            self.nodes[tag].append(node)
+            if tag == 'img':
+                for attr in ('src', 'data-src'):
+                    url = node.get(attr)
+                    kind = media_hosts.lookup(url) if url else None
+                    if kind:
+                        self.images.setdefault(kind, []).append((url, node, attr))
+            elif tag == 'a':
+                href = node.get('href')
+                if href is None:
+                    continue
+                self.links.append(node)
+                kind = media_hosts.lookup(href) if href else None
+                if kind:
+                    self.hosted_links.setdefault(kind, []).append((href, node))
+            elif tag in ('video', 'source'):
+                src = node.get('src')
+                if src:
+                    self.video_sources.append((src, node))
+
+    @property
+    def scripts(self):
+        """Bodies of inline scripts (script.string), read once"""
+        if self._scripts is None:
+            self._scripts = [body for body in (script.string for script in self.nodes['script']) if body]
+        return self._scripts
+
+class PageSnapshot:
+    """One fetched and parsed copy of a page, shared by every extractor in a job"""
+
+    def __init__(self, url, content=None, html=None, status_code=None, error=None, source='requests', final_url=None):
+        self.url = url
+        self.final_url = final_url or url
+        self.content = content
+        self.html = html
+        self.status_code = status_code
+        self.error = error
+        self.source = source
+        self.fetched_at = time.time()
+        self.derived = {}
+        self._soup = None
+        self._doc = None
+        self._buckets = None
+        self._text = None
+        self._parse_lock = threading.Lock()  # Extractors may read the snapshot from several threads
+
+    @property
+    def ok(self):
+        """True when the page was fetched and can be parsed"""
+        return self.error is None and (self.content is not None or self.html is not None)
+
+    @property
+    def soup(self):
+        """Parsed document, built once on first access"""
+        if self._soup is None and self.ok:
+            with self._parse_lock:
+                if self._soup is None:
+                    self._soup = make_soup(self.content if self.content is not None else self.html)
+        return self._soup
+
+    @property
+    def doc(self):
+        """Document for find/find_all queries: selectolax when enabled (falling back to the soup), else the soup itself"""
+        if not fast_queries_enabled():
+            return self.soup
+        if self._doc is None and self.ok:
+            with self._parse_lock:
+                if self._doc is None:
+                    self._doc = FastDocument(self.text, lambda: self.soup)
+        return self._doc
+
+    @property
+    def buckets(self):
+        """MediaBuckets of the page, built by a single walk on first access"""
+        if self._buckets is None:
+            doc = self.doc
+            with self._parse_lock:
+                if self._buckets is None:
+                    self._buckets = MediaBuckets(doc)
+        return self._buckets
+
+    @property
+    def text(self):
+        """Raw HTML text of the page"""
+        if self.html is None and self.content is not None:
+            self.html = self.content.decode('utf-8', errors='replace')
+        return self.html or ''
+
+    @property
+    def text_content(self):
+        """Visible text of the page (soup.get_text()), computed once"""
+        if self._text is None:
+            doc = self.doc
+            self._text = doc.get_text() if doc is not None else ''
+        return self._text
+
+def url_host(url):
+    """Lowercase hostname of a URL (scheme optional), without port"""
+    if not url:
+        return ''
+    try:
+        parsed = urlparse(url if '//' in url else '//' + url)
+        return (parsed.hostname or '').lower()
+    except ValueError:
+        return ''
+
+class HostRegistry:
+    """Maps domains to values; a lookup walks the host's suffixes with one dict probe each"""
+
+    def __init__(self):
+        self.domains = {}
+
+    def register(self, domains, value):
+        for domain in domains:
+            self.domains[domain.lower()] = value
+
+    def lookup(self, url, default=None):
+        """Value of the most specific registered domain the URL's host belongs to"""
+        labels = url_host(url).split('.')
+        for i in range(len(labels) - 1):
+            value = self.domains.get('.'.join(labels[i:]))
+            if value is not None:
+                return value
+        return default
+
+# Media hosts recognised in links found on pages
+media_hosts = HostRegistry()
+media_hosts.register(['imagetwist.com'], 'imagetwist')
+media_hosts.register(['vidoza.net'], 'vidoza')
+media_hosts.register(['streamtape.to', 'streamtape.com'], 'streamtape')
+media_hosts.register(['luluvid.com'], 'luluvid')
+media_hosts.register(['stream2z.com'], 'stream2z')
+media_hosts.register(['hotpic.cc'], 'hotpic')
+media_hosts.register(['erome.com'], 'erome')
+media_hosts.register([
+    'imgbox.com', 'hotpic.com', 'imgur.com', 'postimg.cc', 'imagebam.com', 'pixhost.org',
+    'imgpile.com', 'imgbb.com', 'freeimage.host', 'ibb.co', 'imgshare.net'
+], 'image_host')
+media_hosts.register([
+    'doodstream.com', 'streamlare.com', 'upstream.to', 'streamhub.to', 'streamwish.com',
+    'filemoon.sx', 'streamvid.net', 'voe.sx'
+], 'video_host')
+
+# --- Precompiled patterns ---
+
+class PatternSet:
+    """Capture-free regexes sharing a literal prefix, joined into one alternation so a text is scanned once for all of them"""
+
+    def __init__(self, prefix, alternatives, flags=0):
+        self.patterns = [prefix + alternative for alternative in alternatives]
+        # The shared prefix stays outside the alternation so the engine can still skip ahead to it
+        self.regex = re.compile(prefix + '(?:' + '|'.join(f'(?P<p{i}>{alternative})' for i, alternative in enumerate(alternatives)) + ')', flags)
+
+    def findall(self, text):
+        """Matches grouped per pattern, in pattern order (one list per pattern)"""
+        found = [[] for _ in self.patterns]
+        for match in self.regex.finditer(text):
+            found[int(match.lastgroup[1:])].append(match.group())
+        return found
+
+URL_TOKEN_RE = re.compile(r'https?://[^\s"\'<>]+', re.IGNORECASE)  # URLs in raw HTML or inline JS
+URL_RUN_RE = re.compile(r'https?://[^\s]+', re.IGNORECASE)  # URLs in visible page text
+MEDIA_URL_EXTENSIONS = ('.mp4', '.m3u8', '.ts', '.webm', '.mkv', '.mov', '.avi', '.wmv', '.flv', '.m4v', '.3gp')
+
+class MediaUrlScan:
+    """Every absolute URL of a text, tokenized in one pass; extension, marker and host lookups only filter the tokens"""
+
+    def __init__(self, text, token_re=URL_TOKEN_RE):
+        self.tokens = []
+        for match in token_re.finditer(text or ''):
+            token = match.group()
+            lower = token.lower()
+            self.tokens.append((token, lower, lower.index('//') + 2))
+
+    def containing(self, marker):
+        """Whole URLs with marker after the scheme (what r'https?://[chars]*marker[chars]*' finds)"""
+        marker = marker.lower()
+        return [token for token, lower, start in self.tokens if marker in lower[start:]]
+
+    def ending_with(self, extension):
+        """URLs cut after their last extension (what r'https?://[chars]+\\.ext' finds)"""
+        extension = extension.lower()
+        found = []
+        for token, lower, start in self.tokens:
+            index = lower.rfind(extension)
+            if index > start:
+                found.append(token[:index + len(extension)])
+        return found
+
+    def classify(self):
+        """Media URLs by kind: 'mp4', 'm3u8', 'ts', 'webm', ... per file extension, plus each media host kind"""
+        kinds = {}
+        for token, lower, start in self.tokens:
+            path = lower[start + 1:]  # An extension needs at least one character before it
+            for extension in MEDIA_URL_EXTENSIONS:
+                if extension in path:
+                    kinds.setdefault(extension[1:], []).append(token)
+            host_kind = media_hosts.lookup(token)
+            if host_kind:
+                kinds.setdefault(host_kind, []).append(token)
+        return kinds
+
+# Title cleanup substitutions, applied in order (each one sees the previous result)
+TITLE_CLEANUP_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'\s*-\s*.*?(?:videos?|clips?|movies?|films?)\s*(?:hd|sd)?\s*',  # Remove "- videos hd/sd - sitename"
+    r'\s*-\s*[A-Z][a-z]+\s+[a-z]+\s+videos?.*', # Remove "- Site name videos"
+    r'\s*-\s*\w+(?:\.\w+)+\s*',  # Remove "- domain.com stuff"
+    r'\s*\|\s*.*',  # Remove everything after |
+    r'\s*\(\d+\)\s*', # Remove (numbers) at end
+    r'\s*\[\d+\]\s*', # Remove [numbers] at end
+    r'\s*-\s*sd MMS Masala\s*', # Remove " - MMS Masala"
+    r'\s*-\s*MmsDose\s*', # Remove " - MmsDose"
+    r'\s*-\s*MMSDose\s*', # Remove " - MMSDose"
+    r'\s*-\s*MMS\s+Dose\s*', # Remove " - MMS Dose"
+    r'\s*-\s*[A-Z][a-z]+[A-Z][a-z]+\s*', # Remove " - SiteName" patterns
+    r'\s*-\s*[A-Z][a-z]+\s*[A-Z][a-z]+\s*', # Remove " - Site Name" patterns
+]]
+
+# Video host links in page text
+VIDOZA_TEXT_RE = re.compile(r'https?://(?:www\.)?vidoza\.net/[a-zA-Z0-9]+\.html')
+STREAMTAPE_TEXT_RE = re.compile(r'https?://(?:www\.)?streamtape\.(?:to|com)/(?:v|e)/[a-zA-Z0-9]+(?:/[^/\s]*)?(?:\.html)?')
+LULUVID_TEXT_RE = re.compile(r'https?://(?:www\.)?luluvid\.com/[a-zA-Z0-9]+')
+STREAM2Z_TEXT_RE = re.compile(r'https?://(?:www\.)?stream2z\.com/[a-zA-Z0-9]+')
+STREAMTAPE_MENTION_RE = re.compile(r'streamtape[^\s]*', re.IGNORECASE)
+LULUVID_MENTION_RE = re.compile(r'luluvid[^\s]*', re.IGNORECASE)
+WORDPRESS_UPLOAD_TEXT_RE = re.compile(r'https?://[^\s]+/wp-content/uploads/[^\s]+\.[a-z]+', re.IGNORECASE)
+WORDPRESS_SIZE_SUFFIX_RE = re.compile(r'-\d+x\d+(?=\.[a-z]+)')
+WORDPRESS_SCALED_SUFFIX_RE = re.compile(r'-scaled(?=\.[a-z]+)')
+FALLBACK_VIDEO_HOST_PATTERNS = PatternSet(r'https?://(?:www\.)?', [
+    r'vidoza\.net/[a-zA-Z0-9]+\.html',
+    r'streamtape\.(?:com|to)/[a-zA-Z0-9]+',
+    r'doodstream\.com/[a-zA-Z0-9]+',
+    r'streamlare\.com/[a-zA-Z0-9]+',
+    r'luluvid\.com/[a-zA-Z0-9]+'
+])
+COMPREHENSIVE_VIDEO_HOST_PATTERNS = PatternSet(r'https?://(?:www\.)?', [
+    r'vidoza\.net/[a-zA-Z0-9]+\.html',
+    r'streamtape\.(?:to|com)/(?:v|e)/[a-zA-Z0-9]+(?:/[^/\s]*)?(?:\.html)?',
+    r'youtube\.com/watch\?v=[a-zA-Z0-9_-]+',
+    r'youtu\.be/[a-zA-Z0-9_-]+',
+    r'vimeo\.com/[0-9]+',
+    r'dailymotion\.com/video/[a-zA-Z0-9]+',
+    r'redtube\.com/[0-9]+',
+    r'pornhub\.com/view_video\.php\?viewkey=[a-zA-Z0-9]+'
+])
+
+# Direct video links in player pages and inline scripts
+SCRIPT_MP4_RE = re.compile(r'https?://[^"\']+\.mp4')
+STREAM2Z_VIDEO_RE = re.compile(r'https?://[^"\s]+\.(?:mp4|avi|mkv|mov|wmv|flv)[^"\s]*')
+JWPLAYER_SOURCE_RE = re.compile(r'jwplayer\s*\(\s*["\'][^"\']*["\']\s*\)\s*\.setup\s*\(\s*\{[^}]*sources\s*:\s*\[\s*\{[^}]*file\s*:\s*["\']([^"\']+)["\']', re.IGNORECASE | re.DOTALL)
+LULUVID_JS_VIDEO_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'["\']([^"\']*\.mp4[^"\']*)["\']',
+    r'["\']([^"\']*\.m3u8[^"\']*)["\']',
+    r'src\s*[:=]\s*["\']([^"\']*\.mp4[^"\']*)["\']',
+    r'file\s*[:=]\s*["\']([^"\']*\.mp4[^"\']*)["\']',
+    r'file\s*[:=]\s*["\']([^"\']*\.m3u8[^"\']*)["\']'
+]]
+SAMPLE_SCRIPT_VIDEO_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp)',
+    r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp)[^\s"\']*',
+    r'["\']([^"\']*\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp))["\']',
+    r'videoUrl["\']?\s*[:=]\s*["\']([^"\']+)["\']',
+    r'src["\']?\s*[:=]\s*["\']([^"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp))["\']'
+]]
+EMBED_SCRIPT_VIDEO_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv)',
+    r'["\']([^"\']*\.(?:mp4|avi|mov|wmv|flv|webm|mkv))["\']'
+]]
+PAGE_VIDEO_URL_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Direct video file patterns
+    r'["\']([^"\']*\.mp4[^"\']*)["\']',
+    r'["\']([^"\']*\.m3u8[^"\']*)["\']',
+    r'["\']([^"\']*\.webm[^"\']*)["\']',
+    r'["\']([^"\']*\.ts[^"\']*)["\']',
+
+    # JavaScript player patterns
+    r'file["\']?\s*:\s*["\']([^"\']+)["\']',
+    r'video["\']?\s*:\s*["\']([^"\']+)["\']',
+    r'src["\']?\s*:\s*["\']([^"\']+)["\']',
+    r'url["\']?\s*:\s*["\']([^"\']+)["\']',
+    r'source["\']?\s*:\s*["\']([^"\']+)["\']',
+
+    # HLS specific patterns
+    r'master\.m3u8[^"\']*',
+    r'playlist\.m3u8[^"\']*',
+    r'index\.m3u8[^"\']*',
+
+    # Common streaming patterns
+    r'https?://[^"\']*\.m3u8[^"\']*',
+    r'https?://[^"\']*\.mp4[^"\']*',
+    r'https?://[^"\']*\.ts[^"\']*',
+
+    # Player-specific patterns
+    r'jwplayer[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
+    r'playerjs[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
+]]
+
+def expiring_link_ttl(links, default_ttl):
+    """default_ttl, shortened for hosts in EXTRACTION_CACHE_HOST_TTLS and for links carrying signed tokens"""
+    ttl = default_ttl
+    for link in links:
+        parsed = urlparse(link)
+        host = parsed.netloc.lower()
+        for host_pattern, host_ttl in EXTRACTION_CACHE_HOST_TTLS.items():
+            if host_pattern in host:
+                ttl = min(ttl, host_ttl)
+        if any(name.lower() in EXTRACTION_CACHE_TOKEN_PARAMS for name, _ in parse_qsl(parsed.query)):
+            ttl = min(ttl, EXTRACTION_CACHE_TOKEN_TTL)
+    return ttl
+
+class ExtractionCache:
+    """TTL + LRU cache of structured extraction results, keyed by extractor and normalized URL"""
+
+    def __init__(self, max_entries=EXTRACTION_CACHE_SIZE, default_ttl=EXTRACTION_CACHE_TTL):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+    @staticmethod
+    def _urls_in(value):
+        """Every http(s) URL found anywhere in a result"""
+        if isinstance(value, str):
+            if value.startswith(('http://', 'https://')):
+                yield value
+        elif isinstance(value, dict):
+            for item in value.values():
+                yield from ExtractionCache._urls_in(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                yield from ExtractionCache._urls_in(item)
+
+    def _ttl(self, url, result):
+        # Short-lived links (signed tokens, Streamtape) expire the whole entry early
+        return expiring_link_ttl(itertools.chain([url], self._urls_in(result)), self.default_ttl)
+
+    def get(self, kind, url):
+        """A private copy of a fresh cached result, or None"""
+        key = (kind, normalize_url(url))
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def put(self, kind, url, result):
+        """Cache a result; error strings and empty results are not cached"""
+        if not result or isinstance(result, str):
+            return
+        ttl = self._ttl(url, result)
+        if ttl <= 0:
+            return
+        key = (kind, normalize_url(url))
+        self.entries[key] = (time.time() + ttl, copy.deepcopy(result))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+extraction_cache = ExtractionCache()
+
+class JobMediaCache:
+    """Per-job store of downloaded media: each file is downloaded once and shared by every destination"""
+
+    def __init__(self, job_tag):
+        self.job_tag = job_tag
+        self.entries = {}
+        self.logger = logging.getLogger(__name__)
+
+    def add(self, key, file_path, consumers, **info):
+        """Register a downloaded file together with the destinations that still need it"""
+        self.entries[key] = dict(info, file_path=file_path, consumers=set(consumers))
+
+    def items_for(self, consumer):
+        """Entries still pending for a consumer, in download order"""
+        return [dict(entry, key=key) for key, entry in self.entries.items()
+                if consumer in entry['consumers'] and os.path.exists(entry['file_path'])]
+
+    def paths_for(self, consumer):
+        """Local file paths still pending for a consumer, in download order"""
+        return [entry['file_path'] for entry in self.items_for(consumer)]
+
+    def has_consumer(self, consumer):
+        """True when at least one cached file is still reserved for a consumer"""
+        return any(consumer in entry['consumers'] for entry in self.entries.values())
+
+    def release(self, key, consumer):
+        """Mark a consumer done with a file; the file is deleted once its last consumer is done"""
+        entry = self.entries.get(key)
+        if not entry:
+            return
+        entry['consumers'].discard(consumer)
+        if not entry['consumers']:
+            self._remove(key)
+
+    def release_consumer(self, consumer):
+        """Release every file held for a consumer"""
+        for key in list(self.entries):
+            self.release(key, consumer)
+
+    def clear(self):
+        """Delete all cached files regardless of pending consumers"""
+        for key in list(self.entries):
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            try:
+                os.remove(entry['file_path'])
+            except OSError:
+                pass
+
+class AsyncFetcher:
+    """Long-lived aiohttp session with async retry/backoff, shared by all async fetches"""
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, headers=None, timeout=15, limit=50, limit_per_host=8):
+        # Default headers are only applied to page fetches; raw session users pass their own
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session = None
+        self._loop = None
+        self.logger = logging.getLogger(__name__)
+
+    async def get_session(self):
+        """Return the shared ClientSession, creating it on first use in the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._loop = loop
+            self.logger.info("🌐 Async HTTP session created")
+        return self._session
+
+    async def fetch_snapshot(self, url, headers=None, timeout=None, max_retries=3, retry_delay=2):
+        """GET a page and wrap it in a PageSnapshot, retrying connection errors and 429/5xx"""
+        for attempt in range(max_retries):
+            try:
+                session = await self.get_session()
+                request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+                async with session.get(url, headers={**self.headers, **(headers or {})},
+                                       timeout=request_timeout, allow_redirects=True) as response:
+                    content = await response.read()
+
+                    if response.status in self.RETRY_STATUSES and attempt < max_retries - 1:
+                        self.logger.warning(f"⚠️ HTTP error {response.status} on attempt {attempt + 1}/{max_retries} for {url}")
+                        await asyncio.sleep(retry_delay)
+                        retry_delay *= 2
+                        continue
+
+                    if response.status >= 400:
+                        self.logger.error(f"❌ HTTP error {response.status} for {url}")
+                        return PageSnapshot(url, status_code=response.status,
+                                            error=f"HTTP Error {response.status}: {response.reason} for url: {url}")
+
+                    return PageSnapshot(
+                        url,
+                        content=content,
+                        status_code=response.status,
+                        final_url=str(response.url)
+                    )
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionResetError) as e:
+                if attempt < max_retries - 1:
+                    self.logger.warning(f"⚠️ Connection error on attempt {attempt + 1}/{max_retries} for {url}: {str(e) or type(e).__name__}")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                self.logger.error(f"❌ Failed to fetch {url} after {max_retries} attempts: {str(e) or type(e).__name__}")
+                return PageSnapshot(url, error=f"Error fetching URL: {str(e) or type(e).__name__}")
+            except Exception as e:
+                self.logger.error(f"❌ Unexpected error fetching {url}: {e}")
+                return PageSnapshot(url, error=f"Error fetching URL: {str(e)}")
+
+        return PageSnapshot(url, error="Error fetching URL: Max retries exceeded")
+
+    async def head_status(self, url, headers=None, timeout=10):
+        """Return the HTTP status of a HEAD request"""
+        session = await self.get_session()
+        async with session.head(url, headers={**self.headers, **(headers or {})}, timeout=aiohttp.ClientTimeout(total=timeout), allow_redirects=True) as response:
+            return response.status
+
+    async def close(self):
+        """Close the shared session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+            self.logger.info("🔒 Async HTTP session closed")
+        self._session = None
+        self._loop = None
+
+def parse_m3u8(playlist_text, playlist_url):
+    """Parse an HLS playlist into variant streams (master) or segments with their keys (media)"""
+    variants = []
+    segments = []
+    init_url = None
+    key = None
+    media_sequence = 0
+    pending_bandwidth = None
+
+    for raw_line in playlist_text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            try:
+                media_sequence = int(line.split(':', 1)[1])
+            except ValueError:
+                pass
+        elif line.startswith('#EXT-X-STREAM-INF:'):
+            match = re.search(r'BANDWIDTH=(\d+)', line)
+            pending_bandwidth = int(match.group(1)) if match else 0
+        elif line.startswith('#EXT-X-KEY:'):
+            method = re.search(r'METHOD=([^,]+)', line)
+            uri = re.search(r'URI="([^"]+)"', line)
+            iv = re.search(r'IV=0[xX]([0-9a-fA-F]+)', line)
+            if method and method.group(1) != 'NONE':
+                key = {
+                    'method': method.group(1),
+                    'uri': urljoin(playlist_url, uri.group(1)) if uri else None,
+                    'iv': bytes.fromhex(iv.group(1).zfill(32)) if iv else None,
+                }
+            else:
+                key = None
+        elif line.startswith('#EXT-X-MAP:'):
+            uri = re.search(r'URI="([^"]+)"', line)
+            if uri:
+                init_url = urljoin(playlist_url, uri.group(1))
+        elif not line.startswith('#'):
+            url = urljoin(playlist_url, line)
+            if pending_bandwidth is not None or '.m3u8' in line:
+                variants.append({'url': url, 'bandwidth': pending_bandwidth or 0})
+                pending_bandwidth = None
+            else:
+                segments.append({'url': url, 'key': key, 'sequence': media_sequence + len(segments)})
+
+    return {'variants': variants, 'segments': segments, 'init_url': init_url}
+
+class HLSDownloader:
+    """Downloads an HLS stream with a bounded worker pool, writes segments in order and remuxes to MP4"""
+
+    def __init__(self, fetcher, ffmpeg_path=None, concurrency=None, retries=None):
+        self.fetcher = fetcher
+        self.ffmpeg_path = ffmpeg_path
+        self.concurrency = concurrency or HLS_SEGMENT_CONCURRENCY
+        self.retries = retries or HLS_SEGMENT_RETRIES
+        self.keys = {}
+        self.logger = logging.getLogger(__name__)
+
+    async def _fetch(self, url, headers):
+        """GET with per-request retries and backoff, returning the body bytes"""
+        session = await self.fetcher.get_session()
+        last_error = None
+        for attempt in range(self.retries):
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    last_error = f"HTTP {response.status}"
+            except Exception as e:
+                last_error = str(e)
+            if attempt < self.retries - 1:
+                await asyncio.sleep(1 + attempt * 2)
+        raise RuntimeError(f"{url} failed after {self.retries} attempts: {last_error}")
+
+    async def _resolve_media_playlist(self, playlist_url, headers):
+        """Follow a master playlist to its highest-bandwidth variant"""
+        for _ in range(3):
+            playlist = parse_m3u8((await self._fetch(playlist_url, headers)).decode('utf-8', errors='replace'), playlist_url)
+            if not playlist['variants']:
+                return playlist
+            best = max(playlist['variants'], key=lambda variant: variant['bandwidth'])
+            self.logger.info(f"📄 Master playlist: using variant {best['url']} ({best['bandwidth']} bps)")
+            playlist_url = best['url']
+        return None
+
+    async def _decrypt(self, data, segment, headers):
+        """Decrypt an AES-128 segment; the IV defaults to the media sequence number"""
+        key_info = segment['key']
+        if not key_info:
+            return data
+        if key_info['method'] != 'AES-128':
+            raise RuntimeError(f"Unsupported HLS encryption: {key_info['method']}")
+        if not CRYPTOGRAPHY_AVAILABLE:
+            raise RuntimeError("AES-128 HLS stream needs the 'cryptography' package")
+        if key_info['uri'] not in self.keys:
+            self.keys[key_info['uri']] = await self._fetch(key_info['uri'], headers)
+        iv = key_info['iv'] or segment['sequence'].to_bytes(16, 'big')
+        decryptor = Cipher(algorithms.AES(self.keys[key_info['uri']]), modes.CBC(iv)).decryptor()
+        plain = decryptor.update(data) + decryptor.finalize()
+        padding = plain[-1] if plain else 0
+        return plain[:-padding] if 0 < padding <= 16 else plain
+
+    async def download(self, playlist_url, output_path, headers=None):
+        """Download every segment of the stream into output_path (faststart MP4); returns the path or None"""
+        headers = headers or {}
+        playlist = await self._resolve_media_playlist(playlist_url, headers)
+        if not playlist or not playlist['segments']:
+            self.logger.error("❌ No video segments found in M3U8 playlist")
+            return None
+
+        segments = playlist['segments']
+        total = len(segments)
+        joined_path = output_path + ('.part.mp4' if playlist['init_url'] else '.part.ts')
+        self.logger.info(f"🎬 Downloading {total} HLS segments with {self.concurrency} workers")
+
+        # Workers may run at most `window` segments ahead of the writer, which bounds memory use
+        window = self.concurrency * 2
+        buffered = {}
+        next_to_write = 0
+        next_to_fetch = 0
+        condition = asyncio.Condition()
+        start_time = time.time()
+        written_bytes = 0
+
+        async def worker():
+            nonlocal next_to_fetch
+            while True:
+                async with condition:
+                    if next_to_fetch >= total:
+                        return
+                    index = next_to_fetch
+                    next_to_fetch += 1
+                    await condition.wait_for(lambda: index < next_to_write + window)
+                data = await self._fetch(segments[index]['url'], headers)
+                data = await self._decrypt(data, segments[index], headers)
+                async with condition:
+                    buffered[index] = data
+                    condition.notify_all()
+
+        async def writer(output_file):
+            nonlocal next_to_write, written_bytes
+            while next_to_write < total:
+                async with condition:
+                    await condition.wait_for(lambda: next_to_write in buffered)
+                    data = buffered.pop(next_to_write)
+                    next_to_write += 1
+                    condition.notify_all()
+                output_file.write(data)
+                written_bytes += len(data)
+                if next_to_write % 50 == 0 or next_to_write == total:
+                    elapsed = max(time.time() - start_time, 0.001)
+                    self.logger.info(f"📥 HLS {next_to_write}/{total} segments ({written_bytes / 1024 / 1024:.1f}MB, {written_bytes / 1024 / 1024 / elapsed:.1f}MB/s)")
+
+        tasks = []
+        try:
+            with open(joined_path, 'wb') as output_file:
+                if playlist['init_url']:
+                    output_file.write(await self._fetch(playlist['init_url'], headers))
+                tasks = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, total))]
+                tasks.append(asyncio.create_task(writer(output_file)))
+                await asyncio.gather(*tasks)
+        except Exception as e:
+            self.logger.error(f"❌ HLS download failed: {e}")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if os.path.exists(joined_path):
+                os.remove(joined_path)
+            return None
+
+        return await self._remux(joined_path, output_path)
+
+    async def _remux(self, joined_path, output_path):
+        """Single stream-copy remux of the joined segments into a faststart MP4"""
+        if not self.ffmpeg_path:
+            self.logger.warning("⚠️ FFmpeg not available, returning joined segments without remux")
+            os.replace(joined_path, output_path)
+            return output_path
+
+        cmd = [
+            self.ffmpeg_path,
+            '-progress', 'pipe:1', '-nostats',
+            '-i', joined_path,
+            '-c', 'copy',
+            '-bsf:a', 'aac_adtstoasc',
+            '-movflags', '+faststart',
+            '-f', 'mp4',
+            output_path,
+            '-y'
+        ]
+        returncode, stderr = await run_media_subprocess(cmd, "HLS remux")
+        if returncode == 0:
+            os.remove(joined_path)
+            self.logger.info(f"✅ HLS stream remuxed to {output_path} ({os.path.getsize(output_path) / 1024 / 1024:.1f}MB)")
+            return output_path
+
+        self.logger.error(f"❌ HLS remux failed: {stderr}")
+        if os.path.exists(joined_path):
+            os.remove(joined_path)
+        return None
+
+class RangedDownloader:
+    """Downloads a direct media URL over several parallel byte-range connections into a preallocated file"""
+
+    def __init__(self, fetcher, connections=None, chunk_size=None, retries=3):
+        self.fetcher = fetcher
+        self.connections = connections or VIDEO_DOWNLOAD_CONNECTIONS
+        self.chunk_size = chunk_size or VIDEO_DOWNLOAD_CHUNK_SIZE
+        self.retries = retries
+        self.logger = logging.getLogger(__name__)
+
+    async def probe(self, url, headers):
+        """Return (total_size, supports_ranges, content_type) using a one-byte range request"""
+        session = await self.fetcher.get_session()
+        probe_headers = dict(headers, Range='bytes=0-0')
+        async with session.get(url, headers=probe_headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            content_type = response.headers.get('Content-Type', '').lower()
+            if response.status == 206:
+                content_range = response.headers.get('Content-Range', '')
+                total = content_range.rsplit('/', 1)[-1]
+                return (int(total) if total.isdigit() else None), True, content_type
+            if response.status == 200:
+                length = response.headers.get('Content-Length')
+                accepts = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+                return (int(length) if length and length.isdigit() else None), accepts, content_type
+            raise RuntimeError(f"HTTP {response.status}")
+
+    def plan_ranges(self, total_size):
+        """Inclusive (start, end) byte ranges of chunk_size covering total_size bytes"""
+        return [(start, min(start + self.chunk_size, total_size) - 1)
+                for start in range(0, total_size, self.chunk_size)]
+
+    @staticmethod
+    def _write_block(fd, data, offset):
+        # pwrite may write less than asked; loop until the whole block is on disk
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+
+    async def _fetch_range(self, url, headers, write, start, end, progress):
+        """Fetch bytes start..end (inclusive) and write them at their offset, retrying on failure.
+
+        Returns the number of bytes written, which is always the full range length.
+        """
+        session = await self.fetcher.get_session()
+        offset = start  # Everything before offset is on disk
+        for attempt in range(self.retries):
+            try:
+                range_headers = dict(headers, Range=f'bytes={offset}-{end}')
+                async with session.get(url, headers=range_headers,
+                                       timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as response:
+                    if response.status != 206:
+                        raise RuntimeError(f"expected 206, got HTTP {response.status}")
+                    # Buffer pieces and write larger blocks off the event loop
+                    buffer = bytearray()
+                    async for piece in response.content.iter_chunked(1024 * 1024):
+                        # Never write past the range, even if the server sends more
+                        buffer += piece[:end + 1 - offset - len(buffer)]
+                        if len(buffer) >= VIDEO_DOWNLOAD_WRITE_BLOCK or offset + len(buffer) > end:
+                            await write(bytes(buffer), offset)
+                            offset += len(buffer)
+                            progress[0] += len(buffer)
+                            buffer = bytearray()
+                        if offset > end:
+                            break
+                    if buffer:
+                        await write(bytes(buffer), offset)
+                        offset += len(buffer)
+                        progress[0] += len(buffer)
+                if offset > end:
+                    return end - start + 1
+                raise RuntimeError(f"range ended early at {offset}/{end + 1}")
+            except Exception as e:
+                # Resume from the last written byte on the next attempt
+                if attempt == self.retries - 1:
+                    raise RuntimeError(f"bytes {start}-{end} failed: {e}")
+                await asyncio.sleep(1 + attempt * 2)
+
+    async def download_known_size(self, url, output_path, total_size, headers=None, on_range_done=None):
+        """Ranged download of a URL whose size was already probed; raises on failure.
+
+        Always ranged, so on_range_done(start, end) is called for every range - unlike download(),
+        which may fall back to a single stream.
+        """
+        headers = headers or {}
+        ranges = self.plan_ranges(total_size)
+        queue = asyncio.Queue()
+        for byte_range in ranges:
+            queue.put_nowait(byte_range)
+        progress = [0]
+        written = [0]
+        pending_writes = set()
+        start_time = time.time()
+
+        fd = os.open(output_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0))
+        try:
+            os.ftruncate(fd, total_size)
+
+            async def write(data, offset):
+                # The write runs in a thread; it is tracked so the file is never closed under it
+                future = asyncio.ensure_future(asyncio.to_thread(self._write_block, fd, data, offset))
+                pending_writes.add(future)
+                future.add_done_callback(pending_writes.discard)
+                await asyncio.shield(future)
+
+            async def worker():
+                while not queue.empty():
+                    start, end = queue.get_nowait()
+                    range_bytes = await self._fetch_range(url, headers, write, start, end, progress)
+                    written[0] += range_bytes
+                    if on_range_done:
+                        on_range_done(start, end)
+
+            async def reporter():
+                while True:
+                    await asyncio.sleep(10)
+                    elapsed = max(time.time() - start_time, 0.001)
+                    self.logger.info(f"📥 Ranged download: {progress[0] / 1024 / 1024:.1f}/{total_size / 1024 / 1024:.1f}MB ({progress[0] / 1024 / 1024 / elapsed:.1f}MB/s)")
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(self.connections, len(ranges)))]
+            report_task = asyncio.create_task(reporter())
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                report_task.cancel()
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(report_task, *workers, return_exceptions=True)
+        finally:
+            if pending_writes:
+                await asyncio.gather(*pending_writes, return_exceptions=True)
+            os.close(fd)
+
+        # The file was preallocated, so its size proves nothing; every range must have been written in full
+        if written[0] != total_size:
+            raise RuntimeError(f"ranges wrote {written[0]} of {total_size} bytes")
+
+        elapsed = max(time.time() - start_time, 0.001)
+        self.logger.info(f"✅ Ranged download finished: {total_size / 1024 / 1024:.1f}MB in {elapsed:.1f}s ({total_size / 1024 / 1024 / elapsed:.1f}MB/s, {len(ranges)} ranges)")
+
+    async def _download_single(self, url, headers, output_path):
+        session = await self.fetcher.get_session()
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=None, sock_read=60)) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            async with aiofiles.open(output_path, 'wb') as output_file:
+                async for piece in response.content.iter_chunked(1024 * 1024):
+                    await output_file.write(piece)
+
+    async def download(self, url, output_path, headers=None, on_range_done=None):
+        """Download url to output_path; returns the path, or None when the URL is not a direct media file.
+
+        on_range_done(start, end) is called as each byte range lands on disk, in ranged mode only;
+        callers that depend on it must use download_known_size.
+        """
+        headers = headers or {}
+        try:
+            total_size, supports_ranges, content_type = await self.probe(url, headers)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Ranged download probe failed for {url}: {e}")
+            return None
+
+        if 'text/html' in content_type or 'mpegurl' in content_type:
+            # Not a direct media file (player page or playlist); let yt-dlp handle it
+            return None
+
+        try:
+            if supports_ranges and total_size and total_size > self.chunk_size and hasattr(os, 'pwrite'):
+                self.logger.info(f"⚡ Downloading {total_size / 1024 / 1024:.1f}MB over {self.connections} connections")
+                await self.download_known_size(url, output_path, total_size, headers, on_range_done)
+            else:
+                self.logger.info("📥 Server does not support ranges, using a single stream")
+                await self._download_single(url, headers, output_path)
+        except Exception as e:
+            self.logger.error(f"❌ Direct download failed for {url}: {e}")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return None
+
+        if total_size and os.path.getsize(output_path) != total_size:
+            self.logger.error(f"❌ Direct download size mismatch: {os.path.getsize(output_path)} != {total_size}")
+            os.remove(output_path)
+            return None
+        return output_path
+
+class ContentExtractor:
+    def __init__(self):
+        self.session = requests.Session()
+        self.cloudscraper_client = None
+        self.logger = logging.getLogger(__name__)
+
+        # Configure session for better reliability with anti-detection headers
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Cache-Control': 'max-age=0'
+        })
+
+        # Configure session for better connection handling
+        adapter = requests.adapters.HTTPAdapter(
+            max_retries=3,
+            pool_connections=10,
+            pool_maxsize=10
+        )
         self.session.mount('http://', adapter)
         self.session.mount('https://', adapter)
+
+        # Shared aiohttp session for async fetches (created lazily inside the bot's event loop)
+        self.fetcher = AsyncFetcher(headers=dict(self.session.headers))
         
         self.temp_dir = tempfile.mkdtemp()
         
@@ -939,62 +3195,239 @@ class ContentExtractor:
             logger.error(f"❌ Error in get_with_chromium_fallback: {e}")
             return None
 
+    def _get_page_headers(self, url):
+        """Request headers for a page fetch (mmsdose.us needs its exact browser headers)"""
+        if 'mmsdose.us' in url:
+            return {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'DNT': '1',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Sec-Fetch-Dest': 'document',
+                'Sec-Fetch-Mode': 'navigate',
+                'Sec-Fetch-Site': 'same-origin',
+                'Cache-Control': 'max-age=0',
+                'Referer': 'https://mmsdose.us/',
+                'Origin': 'https://mmsdose.us'
+            }
+
+        headers = {}
+        if 'mmsbee' in url:
+            headers['Referer'] = 'https://mmsbee42.com/'
+        return headers
+
+    def fetch_page_snapshot(self, url, max_retries=3):
+        """Fetch and wrap a page once so every extractor can share it"""
+        retry_delay = 2  # seconds
+
+        # Add protocol if missing
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        # Try with chromium fallback first for better Cloudflare bypass (only outside the event loop)
+        if AIOHTTP_CHROMIUM_AVAILABLE and self.chromium_session:
+            try:
+                try:
+                    asyncio.get_running_loop()
+                    logger.info("🔄 In async context, skipping aiohttp_chromium for now")
+                except RuntimeError:
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    content = loop.run_until_complete(self.get_with_chromium_fallback(url))
+                    loop.close()
+                    if content:
+                        return PageSnapshot(url, html=content, status_code=200, source='chromium')
+            except Exception as e:
+                logger.warning(f"⚠️ aiohttp_chromium fallback failed: {e}")
+
+        for attempt in range(max_retries):
+            try:
+                headers = self._get_page_headers(url)
+                if 'mmsdose.us' in url:
+                    # Add a small delay to avoid rate limiting
+                    time.sleep(random.uniform(1, 2))
+                    response = requests.get(url, headers=headers, timeout=15)
+                else:
+                    response = self.session.get(url, headers=headers, timeout=15)
+                response.raise_for_status()
+
+                logger.info(f"📄 Fetched page snapshot for {url} ({len(response.content)} bytes)")
+                return PageSnapshot(
+                    url,
+                    content=response.content,
+                    html=response.text,
+                    status_code=response.status_code,
+                    final_url=response.url
+                )
+
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 403:
+                    logger.warning(f"🛡️ 403 Forbidden error for {url}, trying cloudscraper bypass...")
+                    return self._fetch_snapshot_with_cloudscraper(url)
+                if attempt < max_retries - 1:
+                    logger.warning(f"⚠️ HTTP error {e.response.status_code} on attempt {attempt + 1}/{max_retries} for {url}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                logger.error(f"❌ HTTP error {e.response.status_code} after {max_retries} attempts for {url}")
+                return PageSnapshot(url, status_code=e.response.status_code,
+                                    error=f"HTTP Error {e.response.status_code}: {str(e)}")
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.RequestException, ConnectionResetError) as e:
+                if attempt < max_retries - 1:
+                    logger.warning(f"⚠️ Connection error on attempt {attempt + 1}/{max_retries} for {url}: {str(e)}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                logger.error(f"❌ Failed to fetch {url} after {max_retries} attempts: {str(e)}")
+                return PageSnapshot(url, error=f"Error fetching URL: {str(e)}")
+            except Exception as e:
+                logger.error(f"❌ Unexpected error fetching {url}: {str(e)}")
+                return PageSnapshot(url, error=f"Error fetching URL: {str(e)}")
+
+        return PageSnapshot(url, error="Error fetching URL: Max retries exceeded")
+
+    def _fetch_snapshot_with_cloudscraper(self, url):
+        """Fetch a page snapshot through cloudscraper as fallback for 403 errors"""
+        if not CLOUDSCRAPER_AVAILABLE:
+            self.logger.warning("Cloudscraper not available for 403 bypass")
+            return PageSnapshot(url, status_code=403, error="Error: 403 Forbidden (Cloudscraper not available)")
+
+        try:
+            # Initialize cloudscraper client if not already done
+            if not self.cloudscraper_client:
+                self.cloudscraper_client = AdvancedCloudflareBypass()
+
+            result = self.cloudscraper_client.get_page_content(url)
+            if result and result.get('content'):
+                return PageSnapshot(url, html=result['content'], status_code=200,
+                                    source='cloudscraper', final_url=result.get('url'))
+
+            self.logger.error("❌ Cloudscraper failed to get page content")
+            return PageSnapshot(url, status_code=403, error="Error: Cloudscraper failed to load page")
+
+        except Exception as e:
+            self.logger.error(f"❌ Cloudscraper error fetching page: {e}")
+            return PageSnapshot(url, status_code=403, error=f"Error: Cloudscraper failed - {str(e)}")
+
+    async def fetch_page_snapshot_async(self, url, max_retries=3):
+        """Async variant of fetch_page_snapshot built on the shared aiohttp session"""
+        # Add protocol if missing
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        if 'mmsdose.us' in url:
+            # Add a small delay to avoid rate limiting
+            await asyncio.sleep(random.uniform(1, 2))
+
+        snapshot = await self.fetcher.fetch_snapshot(url, headers=self._get_page_headers(url), max_retries=max_retries)
+        if snapshot.status_code == 403:
+            logger.warning(f"🛡️ 403 Forbidden error for {url}, trying cloudscraper bypass...")
+            return await asyncio.to_thread(self._fetch_snapshot_with_cloudscraper, url)
+
+        if snapshot.ok:
+            logger.info(f"📄 Fetched page snapshot for {url} ({len(snapshot.content)} bytes)")
+        return snapshot
+
+    async def _run_with_snapshot_async(self, extractor, url, snapshot=None):
+        """Run a snapshot-based extractor off the event loop, fetching the page asynchronously if needed"""
+        if snapshot is not None:
+            return await run_extractor(extractor, snapshot.url, snapshot)
+
+        # Repeat requests for a recently extracted URL are answered from the cache
+        cached = extraction_cache.get(extractor.__name__, url)
+        if cached is not None:
+            logger.info(f"⚡ Using cached {extractor.__name__} result for {url}")
+            return cached
+
+        snapshot = await self.fetch_page_snapshot_async(url)
+        # HTML parsing is CPU-bound; run it on the extraction executor like extract_page_content does
+        result = await run_extractor(extractor, snapshot.url, snapshot)
+        if snapshot.ok:
+            extraction_cache.put(extractor.__name__, url, result)
+        return result
+
+    async def extract_title_async(self, url, snapshot=None):
+        """Async variant of extract_title"""
+        return await self._run_with_snapshot_async(self.extract_title, url, snapshot)
+
+    async def extract_imagetwist_urls_async(self, url, snapshot=None):
+        """Async variant of extract_imagetwist_urls"""
+        return await self._run_with_snapshot_async(self.extract_imagetwist_urls, url, snapshot)
+
+    async def extract_vidoza_urls_async(self, url, snapshot=None):
+        """Async variant of extract_vidoza_urls"""
+        return await self._run_with_snapshot_async(self.extract_vidoza_urls, url, snapshot)
+
+    async def extract_streamtape_urls_async(self, url, snapshot=None):
+        """Async variant of extract_streamtape_urls"""
+        return await self._run_with_snapshot_async(self.extract_streamtape_urls, url, snapshot)
+
+    async def extract_stream2z_urls_async(self, url, snapshot=None):
+        """Async variant of extract_stream2z_urls"""
+        return await self._run_with_snapshot_async(self.extract_stream2z_urls, url, snapshot)
+
+    async def extract_luluvid_urls_async(self, url, snapshot=None):
+        """Async variant of extract_luluvid_urls"""
+        return await self._run_with_snapshot_async(self.extract_luluvid_urls, url, snapshot)
+
+    async def extract_images_from_url_async(self, url, snapshot=None):
+        """Async variant of extract_images_from_url"""
+        return await self._run_with_snapshot_async(self.extract_images_from_url, url, snapshot)
+
+    async def extract_content_comprehensive_async(self, url, snapshot=None):
+        """Async variant of extract_content_comprehensive"""
+        return await self._run_with_snapshot_async(self.extract_content_comprehensive, url, snapshot)
+
     def is_imagetwist_url(self, url):
         """Check if URL is from ImageTwist (including all subdomains)"""
         if not url:
             return False
-        return 'imagetwist.com' in url.lower()
+        return media_hosts.lookup(url) == 'imagetwist'
 
     def is_vidoza_url(self, url):
         """Check if URL is from Vidoza (including all subdomains)"""
         if not url:
             return False
-        return 'vidoza.net' in url.lower()
+        return media_hosts.lookup(url) == 'vidoza'
 
     def is_streamtape_url(self, url):
         """Check if URL is from Streamtape (including all subdomains)"""
         if not url:
             return False
-        return 'streamtape.to' in url.lower() or 'streamtape.com' in url.lower()
+        return media_hosts.lookup(url) == 'streamtape'
 
     def is_other_image_source(self, url):
         """Check if URL is from other common image hosting services or WordPress uploads"""
         if not url:
             return False
-        url_lower = url.lower()
-        
+
         # WordPress uploads directory - prioritize original images
         if '/wp-content/uploads/' in url:
             return True
 
-        return any(domain in url_lower for domain in [
-            'imgbox.com', 'hotpic.com', 'imgur.com', 'postimg.cc',
-            'imagebam.com', 'pixhost.org', 'imgpile.com', 'imgbb.com',
-            'freeimage.host', 'ibb.co', 'imgshare.net'
-        ])
+        return media_hosts.lookup(url) == 'image_host'
 
     def is_other_video_source(self, url):
         """Check if URL is from other common video hosting services"""
         if not url:
             return False
-        url_lower = url.lower()
-        return any(domain in url_lower for domain in [
-            'streamtape.com', 'doodstream.com', 'streamlare.com',
-            'upstream.to', 'streamhub.to', 'streamwish.com',
-            'filemoon.sx', 'streamvid.net', 'voe.sx', 'luluvid.com'
-        ])
+        return media_hosts.lookup(url) in ('video_host', 'streamtape', 'luluvid')
 
     def is_luluvid_url(self, url):
         """Check if URL is from Luluvid"""
         if not url:
             return False
-        return 'luluvid.com' in url.lower()
+        return media_hosts.lookup(url) == 'luluvid'
 
     def is_stream2z_url(self, url):
         """Check if URL is from Stream2z"""
         if not url:
             return False
-        return 'stream2z.com' in url.lower()
+        return media_hosts.lookup(url) == 'stream2z'
 
     def clean_title(self, title):
         """Clean title by removing site names and extra text"""
@@ -1002,24 +3435,9 @@ class ContentExtractor:
             return title
 
         # Remove common site suffixes and patterns
-        cleaning_patterns = [
-            r'\s*-\s*.*?(?:videos?|clips?|movies?|films?)\s*(?:hd|sd)?\s*',  # Remove "- videos hd/sd - sitename"
-            r'\s*-\s*[A-Z][a-z]+\s+[a-z]+\s+videos?.*', # Remove "- Site name videos"
-            r'\s*-\s*\w+(?:\.\w+)+\s*',  # Remove "- domain.com stuff"
-            r'\s*\|\s*.*',  # Remove everything after |
-            r'\s*\(\d+\)\s*', # Remove (numbers) at end
-            r'\s*\[\d+\]\s*', # Remove [numbers] at end
-            r'\s*-\s*sd MMS Masala\s*', # Remove " - MMS Masala"
-            r'\s*-\s*MmsDose\s*', # Remove " - MmsDose"
-            r'\s*-\s*MMSDose\s*', # Remove " - MMSDose"
-            r'\s*-\s*MMS\s+Dose\s*', # Remove " - MMS Dose"
-            r'\s*-\s*[A-Z][a-z]+[A-Z][a-z]+\s*', # Remove " - SiteName" patterns
-            r'\s*-\s*[A-Z][a-z]+\s*[A-Z][a-z]+\s*', # Remove " - Site Name" patterns
-        ]
-
         clean_title = title
-        for pattern in cleaning_patterns:
-            clean_title = re.sub(pattern, '', clean_title, flags=re.IGNORECASE)
+        for pattern in TITLE_CLEANUP_PATTERNS:
+            clean_title = pattern.sub('', clean_title)
 
         # Clean up extra whitespace
         clean_title = ' '.join(clean_title.split())
@@ -1029,447 +3447,284 @@ class ContentExtractor:
 
         return clean_title
 
-    def extract_title(self, url):
-        """Extract title from a given URL with retry logic for connection errors"""
-        max_retries = 3
-        retry_delay = 2  # seconds
-
-        for attempt in range(max_retries):
-            try:
-                # Add protocol if missing
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
-
-                # Try with chromium fallback first for better Cloudflare bypass
-                if AIOHTTP_CHROMIUM_AVAILABLE and self.chromium_session:
-                    try:
-                        # Check if we're already in an event loop
-                        import asyncio
-                        try:
-                            loop = asyncio.get_running_loop()
-                            # We're in an async context, can't use run_until_complete
-                            logger.info("🔄 In async context, skipping aiohttp_chromium for now")
-                        except RuntimeError:
-                            # No running loop, safe to create one
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            content = loop.run_until_complete(self.get_with_chromium_fallback(url))
-                            loop.close()
-
-                            if content:
-                                soup = BeautifulSoup(content, 'html.parser')
-                                title = soup.find('title')
-                                if title and title.text.strip():
-                                    return title.text.strip()
-                    except Exception as e:
-                        logger.warning(f"⚠️ aiohttp_chromium fallback failed: {e}")
-
-                # Fallback to regular requests
-                # Special handling for mmsdose.us URLs - use exact headers from test script
-                if 'mmsdose.us' in url:
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Cache-Control': 'max-age=0',
-                        'Referer': 'https://mmsdose.us/',
-                        'Origin': 'https://mmsdose.us'
-                    }
-                    # Add a small delay to avoid rate limiting
-                    time.sleep(random.uniform(1, 2))
-                    response = requests.get(url, headers=headers, timeout=15)
-                else:
-                    # Use a longer timeout and add retry strategy
-                    response = self.session.get(url, timeout=15)
-                response.raise_for_status()
+    def extract_title(self, url, snapshot=None):
+        """Extract title from a given URL (uses the shared page snapshot when given)"""
+        if snapshot is None:
+            snapshot = self.fetch_page_snapshot(url)
 
-                soup = BeautifulSoup(response.content, 'html.parser')
+        if snapshot.source == 'cloudscraper':
+            return self._extract_title_with_cloudscraper(snapshot.url, snapshot)
+        if not snapshot.ok:
+            return snapshot.error
 
-                title = None
+        try:
+            soup = snapshot.soup
 
-                # Look for a span with both 'ipsType_break' and 'ipsContained' classes
-                span_title = soup.find('span', class_=['ipsType_break', 'ipsContained'])
-                if span_title:
-                    # Assuming the actual title is in a nested span
-                    nested_span = span_title.find('span')
-                    if nested_span:
-                        title = nested_span.get_text(strip=True)
-                        if title: # If we found it here, use it and clean it
-                            return ' '.join(title.split())
+            title = None
 
-                if soup.title:
-                    title = soup.title.string
+            # Look for a span with both 'ipsType_break' and 'ipsContained' classes
+            span_title = soup.find('span', class_=['ipsType_break', 'ipsContained'])
+            if span_title:
+                # Assuming the actual title is in a nested span
+                nested_span = span_title.find('span')
+                if nested_span:
+                    title = nested_span.get_text(strip=True)
+                    if title: # If we found it here, use it and clean it
+                        return ' '.join(title.split())
 
-                if not title:
-                    og_title = soup.find('meta', property='og:title')
-                    if og_title:
-                        title = og_title.get('content')
+            if soup.title:
+                title = soup.title.string
 
-                if not title:
-                    twitter_title = soup.find('meta', name='twitter:title')
-                    if twitter_title:
-                        title = twitter_title.get('content')
+            if not title:
+                og_title = soup.find('meta', property='og:title')
+                if og_title:
+                    title = og_title.get('content')
 
-                if not title:
-                    h1 = soup.find('h1')
-                    if h1:
-                        title = h1.get_text()
+            if not title:
+                twitter_title = soup.find('meta', name='twitter:title')
+                if twitter_title:
+                    title = twitter_title.get('content')
 
-                if title:
-                    title = ' '.join(title.split())
-                    return title
-                else:
-                    return "No title found"
+            if not title:
+                h1 = soup.find('h1')
+                if h1:
+                    title = h1.get_text()
 
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 403:
-                    logger.warning(f"🛡️ 403 Forbidden error for {url}, trying cloudscraper bypass...")
-                    return self._extract_title_with_cloudscraper(url)
-                else:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"⚠️ HTTP error {e.response.status_code} on attempt {attempt + 1}/{max_retries} for {url}")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                    else:
-                        logger.error(f"❌ HTTP error {e.response.status_code} after {max_retries} attempts for {url}")
-                        return f"HTTP Error {e.response.status_code}: {str(e)}"
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
-                    requests.exceptions.RequestException, ConnectionResetError) as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"⚠️ Connection error on attempt {attempt + 1}/{max_retries} for {url}: {str(e)}")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                else:
-                    logger.error(f"❌ Failed to fetch title after {max_retries} attempts for {url}: {str(e)}")
-                    return f"Error fetching URL: {str(e)}"
-            except Exception as e:
-                logger.error(f"❌ Unexpected error extracting title from {url}: {str(e)}")
-                return f"Error extracting title: {str(e)}"
+            if title:
+                title = ' '.join(title.split())
+                return title
+            else:
+                return "No title found"
 
-        return "Error fetching URL: Max retries exceeded"
+        except Exception as e:
+            logger.error(f"❌ Unexpected error extracting title from {snapshot.url}: {str(e)}")
+            return f"Error extracting title: {str(e)}"
 
-    def _extract_title_with_cloudscraper(self, url):
-        """Extract title using cloudscraper as fallback for 403 errors"""
-        if not CLOUDSCRAPER_AVAILABLE:
-            self.logger.warning("Cloudscraper not available for 403 bypass")
-            return "Error: 403 Forbidden (Cloudscraper not available)"
+    def _extract_title_with_cloudscraper(self, url, snapshot=None):
+        """Extract title from a cloudscraper-fetched page (fallback for 403 errors)"""
+        if snapshot is None:
+            snapshot = self._fetch_snapshot_with_cloudscraper(url)
+        if not snapshot.ok:
+            return snapshot.error
 
         try:
-            # Initialize cloudscraper client if not already done
-            if not self.cloudscraper_client:
-                self.cloudscraper_client = AdvancedCloudflareBypass()
+            soup = snapshot.doc
 
-            # Get page content using cloudscraper
-            result = self.cloudscraper_client.get_page_content(url)
-            if result and result.get('content'):
-                soup = BeautifulSoup(result['content'], 'html.parser')
+            # Try different title extraction methods
+            title = None
 
-                # Try different title extraction methods
-                title = None
-
-                # Method 1: Standard title tag
-                title_tag = soup.find('title')
-                if title_tag and title_tag.get_text().strip():
-                    title = title_tag.get_text().strip()
-
-                # Method 2: Open Graph title
-                if not title:
-                    og_title = soup.find('meta', property='og:title')
-                    if og_title and og_title.get('content'):
-                        title = og_title.get('content').strip()
-
-                # Method 3: Twitter card title
-                if not title:
-                    twitter_title = soup.find('meta', name='twitter:title')
-                    if twitter_title and twitter_title.get('content'):
-                        title = twitter_title.get('content').strip()
-
-                # Method 4: H1 tag as fallback
-                if not title:
-                    h1_tag = soup.find('h1')
-                    if h1_tag and h1_tag.get_text().strip():
-                        title = h1_tag.get_text().strip()
+            # Method 1: Standard title tag
+            title_tag = soup.find('title')
+            if title_tag and title_tag.get_text().strip():
+                title = title_tag.get_text().strip()
 
-                if title:
-                    self.logger.info(f"✅ Successfully extracted title using cloudscraper: {title}")
-                    return title
-                else:
-                    return "No title found (cloudscraper)"
+            # Method 2: Open Graph title
+            if not title:
+                og_title = soup.find('meta', property='og:title')
+                if og_title and og_title.get('content'):
+                    title = og_title.get('content').strip()
+
+            # Method 3: Twitter card title
+            if not title:
+                twitter_title = soup.find('meta', name='twitter:title')
+                if twitter_title and twitter_title.get('content'):
+                    title = twitter_title.get('content').strip()
+
+            # Method 4: H1 tag as fallback
+            if not title:
+                h1_tag = soup.find('h1')
+                if h1_tag and h1_tag.get_text().strip():
+                    title = h1_tag.get_text().strip()
+
+            if title:
+                self.logger.info(f"✅ Successfully extracted title using cloudscraper: {title}")
+                return title
             else:
-                self.logger.error("❌ Cloudscraper failed to get page content")
-                return "Error: Cloudscraper failed to load page"
+                return "No title found (cloudscraper)"
 
         except Exception as e:
             self.logger.error(f"❌ Cloudscraper error extracting title: {e}")
             return f"Error: Cloudscraper failed - {str(e)}"
 
-    def extract_imagetwist_urls(self, url):
-        """Extract ImageTwist image URLs from a webpage with retry logic"""
-        max_retries = 3
-        retry_delay = 2  # seconds
+    def extract_imagetwist_urls(self, url, snapshot=None):
+        """Extract ImageTwist image URLs from a webpage (uses the shared page snapshot when given)"""
+        if snapshot is None:
+            snapshot = self.fetch_page_snapshot(url)
 
-        for attempt in range(max_retries):
-            try:
-                # Add protocol if missing
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
-
-                # Special handling for mmsdose.us URLs - use exact headers from test script
-                if 'mmsdose.us' in url:
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Cache-Control': 'max-age=0',
-                        'Referer': 'https://mmsdose.us/',
-                        'Origin': 'https://mmsdose.us'
-                    }
-                    time.sleep(random.uniform(1, 2))
-                    response = requests.get(url, headers=headers, timeout=15)
-                else:
-                    response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, 'html.parser')
-                imagetwist_urls = []
-
-                img_tags = soup.find_all('img')
-
-                for img in img_tags:
-                    src = img.get('src')
-                    if src and self.is_imagetwist_url(src):
-                        imagetwist_urls.append({
-                            'url': src,
-                            'alt': img.get('alt', ''),
-                            'type': 'src'
-                        })
+        if snapshot.source == 'cloudscraper':
+            return self._extract_images_with_cloudscraper(snapshot.url, snapshot)
+        if not snapshot.ok:
+            return f"Error extracting ImageTwist URLs: {snapshot.error}"
 
-                    data_src = img.get('data-src')
-                    if data_src and self.is_imagetwist_url(data_src):
-                        imagetwist_urls.append({
-                            'url': data_src,
-                            'alt': img.get('alt', ''),
-                            'type': 'data-src'
-                        })
-
-                seen_urls = set()
-                unique_urls = []
-                for item in imagetwist_urls:
-                    if item['url'] not in seen_urls:
-                        seen_urls.add(item['url'])
-                        unique_urls.append(item)
-
-                return unique_urls
+        try:
+            imagetwist_urls = []
 
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 403:
-                    logger.warning(f"🛡️ 403 Forbidden error for {url}, trying cloudscraper bypass for images...")
-                    return self._extract_images_with_cloudscraper(url)
-                else:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"⚠️ HTTP error {e.response.status_code} on attempt {attempt + 1}/{max_retries} for ImageTwist extraction")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                    else:
-                        logger.error(f"❌ HTTP error {e.response.status_code} after {max_retries} attempts for ImageTwist extraction")
-                        return f"HTTP Error {e.response.status_code}: {str(e)}"
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
-                    requests.exceptions.RequestException, ConnectionResetError) as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"⚠️ Connection error on attempt {attempt + 1}/{max_retries} for ImageTwist extraction: {str(e)}")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                else:
-                    logger.error(f"❌ Failed to extract ImageTwist URLs after {max_retries} attempts: {str(e)}")
-                    return f"Error extracting ImageTwist URLs: {str(e)}"
-            except Exception as e:
-                logger.error(f"❌ Unexpected error extracting ImageTwist URLs: {str(e)}")
-                return f"Error extracting ImageTwist URLs: {str(e)}"
+            for src, img, attr in snapshot.buckets.images.get('imagetwist', []):
+                imagetwist_urls.append({
+                    'url': src,
+                    'alt': img.get('alt', ''),
+                    'type': attr
+                })
 
-        return f"Error extracting ImageTwist URLs: Max retries exceeded"
+            seen_urls = set()
+            unique_urls = []
+            for item in imagetwist_urls:
+                if item['url'] not in seen_urls:
+                    seen_urls.add(item['url'])
+                    unique_urls.append(item)
 
-    def _extract_images_with_cloudscraper(self, url):
-        """Extract images using cloudscraper as fallback for 403 errors"""
-        if not CLOUDSCRAPER_AVAILABLE:
-            self.logger.warning("Cloudscraper not available for 403 bypass")
-            return "Error: 403 Forbidden (Cloudscraper not available)"
+            return unique_urls
 
-        try:
-            # Initialize cloudscraper client if not already done
-            if not self.cloudscraper_client:
-                self.cloudscraper_client = AdvancedCloudflareBypass()
+        except Exception as e:
+            logger.error(f"❌ Unexpected error extracting ImageTwist URLs: {str(e)}")
+            return f"Error extracting ImageTwist URLs: {str(e)}"
 
-            # Get page content using cloudscraper
-            result = self.cloudscraper_client.get_page_content(url)
-            if result and result.get('content'):
-                soup = BeautifulSoup(result['content'], 'html.parser')
-                imagetwist_urls = []
+    def _extract_images_with_cloudscraper(self, url, snapshot=None):
+        """Extract images from a cloudscraper-fetched page (fallback for 403 errors)"""
+        if snapshot is None:
+            snapshot = self._fetch_snapshot_with_cloudscraper(url)
+        if not snapshot.ok:
+            return snapshot.error
 
-                img_tags = soup.find_all('img')
+        try:
+            buckets = snapshot.buckets
+            imagetwist_urls = []
 
-                for img in img_tags:
-                    src = img.get('src')
-                    if src and (self.is_imagetwist_url(src) or self.is_other_image_source(src)):
-                        imagetwist_urls.append({
-                            'url': src,
-                            'alt': img.get('alt', ''),
-                            'type': 'src'
-                        })
+            for img in buckets.nodes['img']:
+                src = img.get('src')
+                if src and (self.is_imagetwist_url(src) or self.is_other_image_source(src)):
+                    imagetwist_urls.append({
+                        'url': src,
+                        'alt': img.get('alt', ''),
+                        'type': 'src'
+                    })
 
-                    data_src = img.get('data-src')
-                    if data_src and (self.is_imagetwist_url(data_src) or self.is_other_image_source(data_src)):
-                        imagetwist_urls.append({
-                            'url': data_src,
-                            'alt': img.get('alt', ''),
-                            'type': 'data-src'
-                        })
+                data_src = img.get('data-src')
+                if data_src and (self.is_imagetwist_url(data_src) or self.is_other_image_source(data_src)):
+                    imagetwist_urls.append({
+                        'url': data_src,
+                        'alt': img.get('alt', ''),
+                        'type': 'data-src'
+                    })
 
-                seen_urls = set()
-                unique_urls = []
-                for item in imagetwist_urls:
-                    if item['url'] not in seen_urls:
-                        seen_urls.add(item['url'])
-                        unique_urls.append(item)
+            seen_urls = set()
+            unique_urls = []
+            for item in imagetwist_urls:
+                if item['url'] not in seen_urls:
+                    seen_urls.add(item['url'])
+                    unique_urls.append(item)
 
-                # If no specific image sources found, try to find any image-like URLs including WordPress
-                if len(unique_urls) == 0:
-                    self.logger.info("No specific image sources found, looking for any image-like URLs...")
-                    all_links = soup.find_all('a', href=True)
-                    for link in all_links:
-                        href = link.get('href')
-                        # Check for image file extensions or WordPress uploads
-                        if href and (any(ext in href.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']) or '/wp-content/uploads/' in href):
-                            # For WordPress uploads, ONLY accept original quality versions
-                            if '/wp-content/uploads/' in href:
-                                # REJECT all thumbnail sizes
-                                if any(size in href.lower() for size in [
-                                    '-16x16', '-32x32', '-48x48', '-64x64', '-75x75', '-96x96',
-                                    '-100x100', '-150x150', '-200x200', '-300x300', '-400x400',
-                                    '-thumbnail', '-thumb', '-small', '-medium', '-large'
-                                ]):
-                                    continue  # Skip ALL thumbnails
-
-                                # Get original version
-                                href = re.sub(r'-\d+x\d+(?=\.[a-z]+)', '', href)
-                                href = re.sub(r'-scaled(?=\.[a-z]+)', '', href)
-
-                                # ONLY add if it passes quality check
-                                if href and not any(size in href for size in ['x', '-thumb', '-small']):
-                                    imagetwist_urls.append({
-                                        'url': href,
-                                        'alt': link.get_text(strip=True),
-                                        'type': 'wordpress_original'
-                                    })
-                            else:
-                                # For non-WordPress, add regular image links
+            # If no specific image sources found, try to find any image-like URLs including WordPress
+            if len(unique_urls) == 0:
+                self.logger.info("No specific image sources found, looking for any image-like URLs...")
+                all_links = buckets.links
+                for link in all_links:
+                    href = link.get('href')
+                    # Check for image file extensions or WordPress uploads
+                    if href and (any(ext in href.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']) or '/wp-content/uploads/' in href):
+                        # For WordPress uploads, ONLY accept original quality versions
+                        if '/wp-content/uploads/' in href:
+                            # REJECT all thumbnail sizes
+                            if any(size in href.lower() for size in [
+                                '-16x16', '-32x32', '-48x48', '-64x64', '-75x75', '-96x96',
+                                '-100x100', '-150x150', '-200x200', '-300x300', '-400x400',
+                                '-thumbnail', '-thumb', '-small', '-medium', '-large'
+                            ]):
+                                continue  # Skip ALL thumbnails
+
+                            # Get original version
+                            href = WORDPRESS_SIZE_SUFFIX_RE.sub('', href)
+                            href = WORDPRESS_SCALED_SUFFIX_RE.sub('', href)
+
+                            # ONLY add if it passes quality check
+                            if href and not any(size in href for size in ['x', '-thumb', '-small']):
                                 imagetwist_urls.append({
                                     'url': href,
                                     'alt': link.get_text(strip=True),
-                                    'type': 'link'
+                                    'type': 'wordpress_original'
                                 })
+                        else:
+                            # For non-WordPress, add regular image links
+                            imagetwist_urls.append({
+                                'url': href,
+                                'alt': link.get_text(strip=True),
+                                'type': 'link'
+                            })
 
-                    # Also look for image URLs in text content, including WordPress uploads
-                    text_content = soup.get_text()
-                    # Look for WordPress uploads in text - ONLY accept originals
-                    wp_pattern = r'https?://[^\s]+/wp-content/uploads/[^\s]+\.[a-z]+'
-                    wp_matches = re.findall(wp_pattern, text_content, re.IGNORECASE)
-                    for match in wp_matches:
-                        # REJECT thumbnail versions
-                        if any(size in match.lower() for size in [
-                            '-16x16', '-32x32', '-48x48', '-64x64', '-75x75', '-96x96',
-                            '-100x100', '-150x150', '-200x200', '-300x300', '-400x400',
-                            '-thumbnail', '-thumb', '-small', '-medium', '-large'
-                        ]):
-                            continue  # Skip ALL thumbnails
-
-                        # Get original version
-                        original_match = re.sub(r'-\d+x\d+(?=\.[a-z]+)', '', match)
-                        original_match = re.sub(r'-scaled(?=\.[a-z]+)', '', original_match)
+                # Also look for image URLs in text content, including WordPress uploads
+                text_content = snapshot.text_content
+                # Look for WordPress uploads in text - ONLY accept originals
+                wp_matches = WORDPRESS_UPLOAD_TEXT_RE.findall(text_content)
+                for match in wp_matches:
+                    # REJECT thumbnail versions
+                    if any(size in match.lower() for size in [
+                        '-16x16', '-32x32', '-48x48', '-64x64', '-75x75', '-96x96',
+                        '-100x100', '-150x150', '-200x200', '-300x300', '-400x400',
+                        '-thumbnail', '-thumb', '-small', '-medium', '-large'
+                    ]):
+                        continue  # Skip ALL thumbnails
+
+                    # Get original version
+                    original_match = WORDPRESS_SIZE_SUFFIX_RE.sub('', match)
+                    original_match = WORDPRESS_SCALED_SUFFIX_RE.sub('', original_match)
+
+                    # ONLY add high-quality originals
+                    if original_match and not any(item['url'] == original_match for item in imagetwist_urls):
+                        imagetwist_urls.append({
+                            'url': original_match,
+                            'alt': '',
+                            'type': 'wordpress_original'
+                        })
 
-                        # ONLY add high-quality originals
-                        if original_match and not any(item['url'] == original_match for item in imagetwist_urls):
+                # Look for regular image file extensions
+                image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
+                text_urls = MediaUrlScan(text_content, URL_RUN_RE)
+                for ext in image_extensions:
+                    for match in text_urls.ending_with(ext):
+                        if not any(item['url'] == match for item in imagetwist_urls):
                             imagetwist_urls.append({
-                                'url': original_match,
+                                'url': match,
                                 'alt': '',
-                                'type': 'wordpress_original'
+                                'type': 'text'
                             })
 
-                    # Look for regular image file extensions
-                    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']
-                    for ext in image_extensions:
-                        pattern = rf'https?://[^\s]+{re.escape(ext)}'
-                        matches = re.findall(pattern, text_content, re.IGNORECASE)
-                        for match in matches:
-                            if not any(item['url'] == match for item in imagetwist_urls):
-                                imagetwist_urls.append({
-                                    'url': match,
-                                    'alt': '',
-                                    'type': 'text'
-                                })
-
-                    # Update unique_urls with any new findings
-                    seen_urls = set()
-                    unique_urls = []
-                    for item in imagetwist_urls:
-                        if item['url'] not in seen_urls:
-                            seen_urls.add(item['url'])
-                            unique_urls.append(item)
+                # Update unique_urls with any new findings
+                seen_urls = set()
+                unique_urls = []
+                for item in imagetwist_urls:
+                    if item['url'] not in seen_urls:
+                        seen_urls.add(item['url'])
+                        unique_urls.append(item)
 
-                self.logger.info(f"✅ Successfully extracted {len(unique_urls)} images using cloudscraper")
-                return unique_urls
-            else:
-                self.logger.error("❌ Cloudscraper failed to get page content for images")
-                return "Error: Cloudscraper failed to load page"
+            self.logger.info(f"✅ Successfully extracted {len(unique_urls)} images using cloudscraper")
+            return unique_urls
 
         except Exception as e:
             self.logger.error(f"❌ Cloudscraper error extracting images: {e}")
             return f"Error: Cloudscraper failed - {str(e)}"
 
-    def extract_vidoza_urls(self, url):
-        """Extract Vidoza URLs from a webpage"""
-        try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+    def extract_vidoza_urls(self, url, snapshot=None):
+        """Extract Vidoza URLs from a webpage (uses the shared page snapshot when given)"""
+        if snapshot is None:
+            snapshot = self.fetch_page_snapshot(url)
 
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+        if snapshot.source == 'cloudscraper':
+            return self._extract_videos_with_cloudscraper(snapshot.url, snapshot)
+        if not snapshot.ok:
+            return f"Error extracting Vidoza URLs: {snapshot.error}"
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        try:
             vidoza_urls = []
 
-            a_tags = soup.find_all('a', href=True)
-
-            for a in a_tags:
-                href = a.get('href')
-                if href and self.is_vidoza_url(href):
-                    vidoza_urls.append({
-                        'url': href,
-                        'text': a.get_text(strip=True),
-                        'title': a.get('title', '')
-                    })
+            for href, a in snapshot.buckets.hosted_links.get('vidoza', []):
+                vidoza_urls.append({
+                    'url': href,
+                    'text': a.get_text(strip=True),
+                    'title': a.get('title', '')
+                })
 
-            text_content = soup.get_text()
-            vidoza_pattern = r'https?://(?:www\.)?vidoza\.net/[a-zA-Z0-9]+\.html'
-            text_urls = re.findall(vidoza_pattern, text_content)
+            text_content = snapshot.text_content
+            text_urls = VIDOZA_TEXT_RE.findall(text_content)
 
             for text_url in text_urls:
                 if not any(item['url'] == text_url for item in vidoza_urls):
@@ -1488,64 +3743,71 @@ class ContentExtractor:
 
             return unique_urls
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                logger.warning(f"🛡️ 403 Forbidden error for {url}, trying cloudscraper bypass for videos...")
-                return self._extract_videos_with_cloudscraper(url)
-            else:
-                logger.error(f"❌ HTTP error {e.response.status_code} for Vidoza extraction")
-                return f"HTTP Error {e.response.status_code}: {str(e)}"
         except Exception as e:
             return f"Error extracting Vidoza URLs: {str(e)}"
 
-    def _extract_videos_with_cloudscraper(self, url):
-        """Extract videos using cloudscraper as fallback for 403 errors"""
-        if not CLOUDSCRAPER_AVAILABLE:
-            self.logger.warning("Cloudscraper not available for 403 bypass")
-            return "Error: 403 Forbidden (Cloudscraper not available)"
+    def _extract_videos_with_cloudscraper(self, url, snapshot=None):
+        """Extract videos from a cloudscraper-fetched page (fallback for 403 errors)"""
+        if snapshot is None:
+            snapshot = self._fetch_snapshot_with_cloudscraper(url)
+        if not snapshot.ok:
+            return snapshot.error
 
         try:
-            # Initialize cloudscraper client if not already done
-            if not self.cloudscraper_client:
-                self.cloudscraper_client = AdvancedCloudflareBypass()
+            vidoza_urls = []
 
-            # Get page content using cloudscraper
-            result = self.cloudscraper_client.get_page_content(url)
-            if result and result.get('content'):
-                soup = BeautifulSoup(result['content'], 'html.parser')
-                vidoza_urls = []
+            for href, a in snapshot.buckets.hosted_links.get('vidoza', []):
+                vidoza_urls.append({
+                    'url': href,
+                    'text': a.get_text(strip=True),
+                    'title': a.get('title', '')
+                })
+
+            text_content = snapshot.text_content
+            # Look for multiple video hosting patterns
+            for text_urls in FALLBACK_VIDEO_HOST_PATTERNS.findall(text_content):
+                for text_url in text_urls:
+                    if not any(item['url'] == text_url for item in vidoza_urls):
+                        vidoza_urls.append({
+                            'url': text_url,
+                            'text': '',
+                            'title': ''
+                        })
 
-                a_tags = soup.find_all('a', href=True)
+            seen_urls = set()
+            unique_urls = []
+            for item in vidoza_urls:
+                if item['url'] not in seen_urls:
+                    seen_urls.add(item['url'])
+                    unique_urls.append(item)
 
-                for a in a_tags:
-                    href = a.get('href')
-                    if href and self.is_vidoza_url(href):
+            # If no specific video sources found, try to find any video-like URLs
+            if len(unique_urls) == 0:
+                self.logger.info("No specific video sources found, looking for any video-like URLs...")
+                all_links = snapshot.buckets.links
+                for link in all_links:
+                    href = link.get('href')
+                    if href and any(ext in href.lower() for ext in ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']):
                         vidoza_urls.append({
                             'url': href,
-                            'text': a.get_text(strip=True),
-                            'title': a.get('title', '')
+                            'text': link.get_text(strip=True),
+                            'title': link.get('title', '')
                         })
 
-                text_content = soup.get_text()
-                # Look for multiple video hosting patterns
-                video_patterns = [
-                    r'https?://(?:www\.)?vidoza\.net/[a-zA-Z0-9]+\.html',
-                    r'https?://(?:www\.)?streamtape\.(?:com|to)/[a-zA-Z0-9]+',
-                    r'https?://(?:www\.)?doodstream\.com/[a-zA-Z0-9]+',
-                    r'https?://(?:www\.)?streamlare\.com/[a-zA-Z0-9]+',
-                    r'https?://(?:www\.)?luluvid\.com/[a-zA-Z0-9]+'
-                ]
-
-                for pattern in video_patterns:
-                    text_urls = re.findall(pattern, text_content)
-                    for text_url in text_urls:
-                        if not any(item['url'] == text_url for item in vidoza_urls):
+                # Also look for video URLs in text content
+                text_content = snapshot.text_content
+                video_extensions = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']
+                text_urls = MediaUrlScan(text_content, URL_RUN_RE)
+                for ext in video_extensions:
+                    for match in text_urls.ending_with(ext):
+                        if not any(item['url'] == match for item in vidoza_urls):
                             vidoza_urls.append({
-                                'url': text_url,
+                                'url': match,
                                 'text': '',
                                 'title': ''
                             })
 
+                # Update unique_urls with any new findings
                 seen_urls = set()
                 unique_urls = []
                 for item in vidoza_urls:
@@ -1553,138 +3815,100 @@ class ContentExtractor:
                         seen_urls.add(item['url'])
                         unique_urls.append(item)
 
-                # If no specific video sources found, try to find any video-like URLs
-                if len(unique_urls) == 0:
-                    self.logger.info("No specific video sources found, looking for any video-like URLs...")
-                    all_links = soup.find_all('a', href=True)
-                    for link in all_links:
-                        href = link.get('href')
-                        if href and any(ext in href.lower() for ext in ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']):
-                            vidoza_urls.append({
-                                'url': href,
-                                'text': link.get_text(strip=True),
-                                'title': link.get('title', '')
-                            })
-
-                    # Also look for video URLs in text content
-                    text_content = soup.get_text()
-                    video_extensions = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']
-                    for ext in video_extensions:
-                        pattern = rf'https?://[^\s]+{re.escape(ext)}'
-                        matches = re.findall(pattern, text_content, re.IGNORECASE)
-                        for match in matches:
-                            if not any(item['url'] == match for item in vidoza_urls):
-                                vidoza_urls.append({
-                                    'url': match,
-                                    'text': '',
-                                    'title': ''
-                                })
-
-                    # Update unique_urls with any new findings
-                    seen_urls = set()
-                    unique_urls = []
-                    for item in vidoza_urls:
-                        if item['url'] not in seen_urls:
-                            seen_urls.add(item['url'])
-                            unique_urls.append(item)
-
-                self.logger.info(f"✅ Successfully extracted {len(unique_urls)} videos using cloudscraper")
-                return unique_urls
-            else:
-                self.logger.error("❌ Cloudscraper failed to get page content for videos")
-                return "Error: Cloudscraper failed to load page"
+            self.logger.info(f"✅ Successfully extracted {len(unique_urls)} videos using cloudscraper")
+            return unique_urls
 
         except Exception as e:
             self.logger.error(f"❌ Cloudscraper error extracting videos: {e}")
             return f"Error: Cloudscraper failed - {str(e)}"
 
-    def extract_vidoza_video_url(self, vidoza_url):
-        """Extract direct MP4 URL from Vidoza page"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Referer': 'https://vidoza.net/'
-            }
+    def _get_vidoza_headers(self):
+        """Request headers for Vidoza embed pages"""
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Referer': 'https://vidoza.net/'
+        }
 
-            response = self.session.get(vidoza_url, headers=headers, timeout=15)
-            response.raise_for_status()
+    def _parse_vidoza_video_url(self, buckets):
+        """Find the direct MP4 URL in the media buckets of a Vidoza page"""
+        video_tag = next((video for video in buckets.nodes['video'] if video.get('id') == 'player_html5_api'), None)
+        if video_tag:
+            src = video_tag.get('src')
+            if src and src.endswith('.mp4'):
+                return src
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+        for source in buckets.nodes['source']:
+            if source.get('type') != 'video/mp4':
+                continue
+            src = source.get('src')
+            if src and src.endswith('.mp4'):
+                return src
 
-            video_tag = soup.find('video', id='player_html5_api')
-            if video_tag:
-                src = video_tag.get('src')
-                if src and src.endswith('.mp4'):
-                    return src
+        for video in buckets.nodes['video']:
+            src = video.get('src')
+            if src and '.mp4' in src:
+                return src
 
-            source_tags = soup.find_all('source', type='video/mp4')
-            for source in source_tags:
+            sources = video.find_all('source')
+            for source in sources:
                 src = source.get('src')
-                if src and src.endswith('.mp4'):
-                    return src
-
-            all_videos = soup.find_all('video')
-            for video in all_videos:
-                src = video.get('src')
                 if src and '.mp4' in src:
                     return src
 
-                sources = video.find_all('source')
-                for source in sources:
-                    src = source.get('src')
-                    if src and '.mp4' in src:
-                        return src
+        for script in buckets.scripts:
+            mp4_matches = SCRIPT_MP4_RE.findall(script)
+            if mp4_matches:
+                return mp4_matches[0]
+
+        return None
+
+    def extract_vidoza_video_url(self, vidoza_url):
+        """Extract direct MP4 URL from Vidoza page"""
+        try:
+            response = self.session.get(vidoza_url, headers=self._get_vidoza_headers(), timeout=15)
+            response.raise_for_status()
 
-            script_tags = soup.find_all('script')
-            for script in script_tags:
-                if script.string:
-                    mp4_matches = re.findall(r'https?://[^"\']+\.mp4', script.string)
-                    if mp4_matches:
-                        return mp4_matches[0]
+            return self._parse_vidoza_video_url(MediaBuckets(make_document(response.content)))
 
+        except Exception as e:
+            logger.error(f"Error extracting video URL from {vidoza_url}: {e}")
             return None
 
+    async def extract_vidoza_video_url_async(self, vidoza_url):
+        """Async variant of extract_vidoza_video_url"""
+        try:
+            snapshot = await self.fetcher.fetch_snapshot(vidoza_url, headers=self._get_vidoza_headers())
+            if not snapshot.ok:
+                logger.error(f"Error extracting video URL from {vidoza_url}: {snapshot.error}")
+                return None
+            return self._parse_vidoza_video_url(snapshot.buckets)
+
         except Exception as e:
             logger.error(f"Error extracting video URL from {vidoza_url}: {e}")
             return None
 
-    def extract_streamtape_urls(self, url):
+    def extract_streamtape_urls(self, url, snapshot=None):
         """Extract Streamtape URLs from a webpage - prioritize links over text"""
         try:
             print(f"🔍 STREAMTAPE DEBUG: Starting extraction from: {url}")
 
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                print(f"🔍 STREAMTAPE DEBUG: ❌ Page fetch failed: {snapshot.error}")
+                return f"Error extracting Streamtape URLs: {snapshot.error}"
+            print(f"🔍 STREAMTAPE DEBUG: Using page snapshot ({snapshot.source}), content length: {len(snapshot.text)}")
 
-            # Try regular request first
-            try:
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-                print(f"🔍 STREAMTAPE DEBUG: Successfully fetched page with regular request, content length: {len(response.content)}")
-            except Exception as e:
-                print(f"🔍 STREAMTAPE DEBUG: Regular request failed ({e}), trying cloudscraper...")
-                # Try with cloudscraper if regular request fails
-                try:
-                    scraper = cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-                    response = scraper.get(url, timeout=15)
-                    response.raise_for_status()
-                    print(f"🔍 STREAMTAPE DEBUG: Successfully fetched page with cloudscraper, content length: {len(response.content)}")
-                except Exception as cloudscraper_error:
-                    print(f"🔍 STREAMTAPE DEBUG: ❌ Both regular and cloudscraper requests failed: {cloudscraper_error}")
-                    return f"Error extracting Streamtape URLs: {str(cloudscraper_error)}"
-
-            soup = BeautifulSoup(response.content, 'html.parser')
             streamtape_urls = []
 
             # Method 1: Extract from <a> tags (PRIORITY)
-            a_tags = soup.find_all('a', href=True)
+            a_tags = snapshot.buckets.links
             print(f"🔍 STREAMTAPE DEBUG: Found {len(a_tags)} total <a> tags with href")
 
             streamtape_links_found = 0
@@ -1708,13 +3932,12 @@ class ContentExtractor:
             # Method 2: Extract from text content (only if no links found)
             if not streamtape_urls:  # Only search text if no links were found
                 print(f"🔍 STREAMTAPE DEBUG: No links found, searching text content...")
-                text_content = soup.get_text()
+                text_content = snapshot.text_content
                 print(f"🔍 STREAMTAPE DEBUG: Text content length: {len(text_content)}")
 
                 # Pattern to match Streamtape URLs (both /v/ and /e/ formats) - more flexible
                 # Support both .com and .to domains
-                streamtape_pattern = r'https?://(?:www\.)?streamtape\.(?:to|com)/(?:v|e)/[a-zA-Z0-9]+(?:/[^/\s]*)?(?:\.html)?'
-                text_urls = re.findall(streamtape_pattern, text_content)
+                text_urls = STREAMTAPE_TEXT_RE.findall(text_content)
 
                 # Debug: Print found URLs
                 print(f"🔍 STREAMTAPE DEBUG: Found {len(streamtape_urls)} Streamtape URLs from links")
@@ -1722,7 +3945,7 @@ class ContentExtractor:
                 print(f"🔍 STREAMTAPE DEBUG: Text URLs found: {text_urls}")
 
                 # Also search for any streamtape mentions in text
-                streamtape_mentions = re.findall(r'streamtape[^\s]*', text_content, re.IGNORECASE)
+                streamtape_mentions = STREAMTAPE_MENTION_RE.findall(text_content)
                 print(f"🔍 STREAMTAPE DEBUG: Found {len(streamtape_mentions)} streamtape mentions in text: {streamtape_mentions[:5]}")
 
                 if text_urls:
@@ -1746,37 +3969,22 @@ class ContentExtractor:
             print(f"🔍 STREAMTAPE DEBUG: ❌ Error: {str(e)}")
             return f"Error extracting Streamtape URLs: {str(e)}"
 
-    def extract_luluvid_urls(self, url):
+    def extract_luluvid_urls(self, url, snapshot=None):
         """Extract Luluvid URLs from a webpage - prioritize links over text"""
         try:
             print(f"🔍 LULUVID DEBUG: Starting extraction from: {url}")
 
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                print(f"🔍 LULUVID DEBUG: ❌ Page fetch failed: {snapshot.error}")
+                return f"Error extracting Luluvid URLs: {snapshot.error}"
+            print(f"🔍 LULUVID DEBUG: Using page snapshot ({snapshot.source}), content length: {len(snapshot.text)}")
 
-            # Try regular request first
-            try:
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-                print(f"🔍 LULUVID DEBUG: Successfully fetched page with regular request, content length: {len(response.content)}")
-            except Exception as e:
-                print(f"🔍 LULUVID DEBUG: Regular request failed ({e}), trying cloudscraper...")
-                # Try with cloudscraper if regular request fails
-                try:
-                    scraper = cloudscraper.create_scraper(browser={'browser': 'firefox', 'platform': 'windows', 'mobile': False})
-                    response = scraper.get(url, timeout=15)
-                    response.raise_for_status()
-                    print(f"🔍 LULUVID DEBUG: Successfully fetched page with cloudscraper, content length: {len(response.content)}")
-                except Exception as cloudscraper_error:
-                    print(f"🔍 LULUVID DEBUG: ❌ Both regular and cloudscraper requests failed: {cloudscraper_error}")
-                    return f"Error extracting Luluvid URLs: {str(cloudscraper_error)}"
-
-            soup = BeautifulSoup(response.content, 'html.parser')
             luluvid_urls = []
 
             # Method 1: Extract from <a> tags (PRIORITY)
-            a_tags = soup.find_all('a', href=True)
+            a_tags = snapshot.buckets.links
             print(f"🔍 LULUVID DEBUG: Found {len(a_tags)} total <a> tags with href")
 
             luluvid_links_found = 0
@@ -1800,12 +4008,11 @@ class ContentExtractor:
             # Method 2: Extract from text content (only if no links found)
             if not luluvid_urls:  # Only search text if no links were found
                 print(f"🔍 LULUVID DEBUG: No links found, searching text content...")
-                text_content = soup.get_text()
+                text_content = snapshot.text_content
                 print(f"🔍 LULUVID DEBUG: Text content length: {len(text_content)}")
 
                 # Pattern to match Luluvid URLs
-                luluvid_pattern = r'https?://(?:www\.)?luluvid\.com/[a-zA-Z0-9]+'
-                text_urls = re.findall(luluvid_pattern, text_content)
+                text_urls = LULUVID_TEXT_RE.findall(text_content)
 
                 # Debug: Print found URLs
                 print(f"🔍 LULUVID DEBUG: Found {len(luluvid_urls)} Luluvid URLs from links")
@@ -1813,7 +4020,7 @@ class ContentExtractor:
                 print(f"🔍 LULUVID DEBUG: Text URLs found: {text_urls}")
 
                 # Also search for any luluvid mentions in text
-                luluvid_mentions = re.findall(r'luluvid[^\s]*', text_content, re.IGNORECASE)
+                luluvid_mentions = LULUVID_MENTION_RE.findall(text_content)
                 print(f"🔍 LULUVID DEBUG: Found {len(luluvid_mentions)} luluvid mentions in text: {luluvid_mentions[:5]}")
 
                 if text_urls:
@@ -1837,6 +4044,30 @@ class ContentExtractor:
             print(f"🔍 LULUVID DEBUG: ❌ Error: {str(e)}")
             return f"Error extracting Luluvid URLs: {str(e)}"
 
+    def _parse_streamtape_video_url(self, html_source):
+        """Build the direct MP4 URL from a Streamtape page's norobotlink token"""
+        norobot_link_pattern = re.compile(r"document\.getElementById\('norobotlink'\)\.innerHTML = (.+?);")
+        norobot_link_matcher = norobot_link_pattern.search(html_source)
+
+        if norobot_link_matcher:
+            norobot_link_content = norobot_link_matcher.group(1)
+
+            token_pattern = re.compile(r"token=([^&']+)")
+            token_matcher = token_pattern.search(norobot_link_content)
+
+            if token_matcher:
+                token = token_matcher.group(1)
+
+                soup = make_soup(html_source)
+                div_element = soup.select_one("div#ideoooolink[style='display:none;']")
+
+                if div_element:
+                    streamtape = div_element.get_text()
+                    full_url = f"https:/{streamtape}&token={token}"
+                    return f"{full_url}&dl=1"
+
+        return None
+
     def extract_streamtape_video_url(self, streamtape_url):
         """Extract direct MP4 URL from Streamtape page using the improved method"""
         try:
@@ -1850,63 +4081,57 @@ class ContentExtractor:
 
             response = self.session.get(streamtape_url)
             response.raise_for_status()
-            html_source = response.text
-
-            norobot_link_pattern = re.compile(r"document\.getElementById\('norobotlink'\)\.innerHTML = (.+?);")
-            norobot_link_matcher = norobot_link_pattern.search(html_source)
+            return self._parse_streamtape_video_url(response.text)
 
-            if norobot_link_matcher:
-                norobot_link_content = norobot_link_matcher.group(1)
+        except Exception as exception:
+            print(f"An error occurred: {exception}")
 
-                token_pattern = re.compile(r"token=([^&']+)")
-                token_matcher = token_pattern.search(norobot_link_content)
+            return None
 
-                if token_matcher:
-                    token = token_matcher.group(1)
+    async def extract_streamtape_video_url_async(self, streamtape_url):
+        """Async variant of extract_streamtape_video_url"""
+        try:
+            # Validate the URL first
+            if not streamtape_url:
+                return None
 
-                    soup = BeautifulSoup(html_source, 'html.parser')
-                    div_element = soup.select_one("div#ideoooolink[style='display:none;']")
+            # Convert embed URLs to video URLs
+            if "/e/" in streamtape_url:
+                streamtape_url = streamtape_url.replace("/e/", "/v/")
 
-                    if div_element:
-                        streamtape = div_element.get_text()
-                        full_url = f"https:/{streamtape}&token={token}"
-                        return f"{full_url}&dl=1"
+            snapshot = await self.fetcher.fetch_snapshot(streamtape_url)
+            if not snapshot.ok:
+                print(f"An error occurred: {snapshot.error}")
+                return None
+            return self._parse_streamtape_video_url(snapshot.text)
 
         except Exception as exception:
             print(f"An error occurred: {exception}")
 
             return None
 
-    def extract_stream2z_urls(self, url):
-        """Extract Stream2z URLs from a webpage"""
+    def extract_stream2z_urls(self, url, snapshot=None):
+        """Extract Stream2z URLs from a webpage (uses the shared page snapshot when given)"""
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                return f"Error extracting Stream2z URLs: {snapshot.error}"
 
-            soup = BeautifulSoup(response.content, 'html.parser')
             stream2z_urls = []
 
             # Method 1: Extract from <a> tags (PRIORITY)
-            a_tags = soup.find_all('a', href=True)
-
-            for a in a_tags:
-                href = a.get('href')
-                if href and self.is_stream2z_url(href):
-                    stream2z_urls.append({
-                        'url': href,
-                        'text': a.get_text(strip=True),
-                        'title': a.get('title', '')
-                    })
+            for href, a in snapshot.buckets.hosted_links.get('stream2z', []):
+                stream2z_urls.append({
+                    'url': href,
+                    'text': a.get_text(strip=True),
+                    'title': a.get('title', '')
+                })
 
             # Method 2: Extract from text content (only if no links found)
             if not stream2z_urls:
-                text_content = soup.get_text()
-                stream2z_pattern = r'https?://(?:www\.)?stream2z\.com/[a-zA-Z0-9]+'
-                text_urls = re.findall(stream2z_pattern, text_content)
+                text_content = snapshot.text_content
+                text_urls = STREAM2Z_TEXT_RE.findall(text_content)
 
                 if text_urls:
                     stream2z_urls.append({
@@ -1920,6 +4145,16 @@ class ContentExtractor:
         except Exception as e:
             return f"Error extracting Stream2z URLs: {str(e)}"
 
+    def _parse_stream2z_video_url(self, html_source):
+        """Find a direct video URL in a Stream2z page"""
+        video_matches = STREAM2Z_VIDEO_RE.findall(html_source)
+
+        # Prefer MP4, then any other video format
+        for match in video_matches:
+            if '.mp4' in match[match.index('//') + 3:]:
+                return match
+        return video_matches[0] if video_matches else None
+
     def extract_stream2z_video_url(self, stream2z_url):
         """Extract direct video URL from Stream2z page"""
         try:
@@ -1929,23 +4164,24 @@ class ContentExtractor:
 
             response = self.session.get(stream2z_url)
             response.raise_for_status()
-            html_source = response.text
+            return self._parse_stream2z_video_url(response.text)
 
-            # Look for direct video URLs in the page
-            video_pattern = re.compile(r'https?://[^"\s]+\.mp4[^"\s]*')
-            video_matches = video_pattern.findall(html_source)
-
-            if video_matches:
-                return video_matches[0]
-
-            # Look for other video formats
-            video_pattern2 = re.compile(r'https?://[^"\s]+\.(?:mp4|avi|mkv|mov|wmv|flv)[^"\s]*')
-            video_matches2 = video_pattern2.findall(html_source)
+        except Exception as e:
+            print(f"Error extracting Stream2z video URL: {e}")
+            return None
 
-            if video_matches2:
-                return video_matches2[0]
+    async def extract_stream2z_video_url_async(self, stream2z_url):
+        """Async variant of extract_stream2z_video_url"""
+        try:
+            # Validate the URL first
+            if not stream2z_url:
+                return None
 
-            return None
+            snapshot = await self.fetcher.fetch_snapshot(stream2z_url)
+            if not snapshot.ok:
+                print(f"Error extracting Stream2z video URL: {snapshot.error}")
+                return None
+            return self._parse_stream2z_video_url(snapshot.text)
 
         except Exception as e:
             print(f"Error extracting Stream2z video URL: {e}")
@@ -1975,8 +4211,7 @@ class ContentExtractor:
             text_content = response.text
 
             # Method 1: Look for JWPlayer setup with sources
-            jwplayer_pattern = r'jwplayer\s*\(\s*["\'][^"\']*["\']\s*\)\s*\.setup\s*\(\s*\{[^}]*sources\s*:\s*\[\s*\{[^}]*file\s*:\s*["\']([^"\']+)["\']'
-            jwplayer_match = re.search(jwplayer_pattern, text_content, re.IGNORECASE | re.DOTALL)
+            jwplayer_match = JWPLAYER_SOURCE_RE.search(text_content)
             if jwplayer_match:
                 master_m3u8_url = jwplayer_match.group(1)
                 self.logger.info(f"✅ Found JWPlayer master M3U8: {master_m3u8_url}")
@@ -1990,38 +4225,31 @@ class ContentExtractor:
                     # Fallback to master M3U8 if index extraction fails
                     return master_m3u8_url
 
+            # Methods 2-4 filter one tokenization of the page's URLs
+            media_urls = MediaUrlScan(text_content)
+            media_kinds = media_urls.classify()
+
             # Method 2: Look for direct MP4 links in page content
-            mp4_pattern = r'https?://[^\s"\'<>]+\.mp4[^\s"\'<>]*'
-            mp4_matches = re.findall(mp4_pattern, text_content, re.IGNORECASE)
+            mp4_matches = media_kinds.get('mp4')
             if mp4_matches:
                 self.logger.info(f"✅ Found direct MP4 URL: {mp4_matches[0]}")
                 return mp4_matches[0]
 
             # Method 3: Look for M3U8 (HLS) streams
-            m3u8_pattern = r'https?://[^\s"\'<>]+\.m3u8[^\s"\'<>]*'
-            m3u8_matches = re.findall(m3u8_pattern, text_content, re.IGNORECASE)
+            m3u8_matches = media_kinds.get('m3u8')
             if m3u8_matches:
                 self.logger.info(f"✅ Found M3U8 stream URL: {m3u8_matches[0]}")
                 return m3u8_matches[0]
 
             # Method 4: Look for tnmr.org URLs (common luluvid CDN)
-            tnmr_pattern = r'https?://[^\s"\'<>]*tnmr\.org[^\s"\'<>]*'
-            tnmr_matches = re.findall(tnmr_pattern, text_content, re.IGNORECASE)
+            tnmr_matches = media_urls.containing('tnmr.org')
             if tnmr_matches:
                 self.logger.info(f"✅ Found tnmr.org URL: {tnmr_matches[0]}")
                 return tnmr_matches[0]
 
             # Method 5: Look for JavaScript variables that might contain video URLs
-            js_patterns = [
-                r'["\']([^"\']*\.mp4[^"\']*)["\']',
-                r'["\']([^"\']*\.m3u8[^"\']*)["\']',
-                r'src\s*[:=]\s*["\']([^"\']*\.mp4[^"\']*)["\']',
-                r'file\s*[:=]\s*["\']([^"\']*\.mp4[^"\']*)["\']',
-                r'file\s*[:=]\s*["\']([^"\']*\.m3u8[^"\']*)["\']'
-            ]
-
-            for pattern in js_patterns:
-                matches = re.findall(pattern, text_content, re.IGNORECASE)
+            for pattern in LULUVID_JS_VIDEO_PATTERNS:
+                matches = pattern.findall(text_content)
                 for match in matches:
                     if match.startswith('http'):
                         self.logger.info(f"✅ Found video URL in JS: {match}")
@@ -2034,14 +4262,11 @@ class ContentExtractor:
             self.logger.error(f"Error extracting video URL from {luluvid_url}: {e}")
             return None
 
-    def extract_luluvid_video_url(self, luluvid_url):
+    async def extract_luluvid_video_url(self, luluvid_url):
         """Extract direct video URL from Luluvid page using EXACT video_extractor.py method"""
         try:
-            # Import os at the start
-            import os
-
             # Use the yt-dlp approach (most reliable for Luluvid)
-            result = self.download_luluvid_with_ytdlp(luluvid_url)
+            result = await self.download_luluvid_with_ytdlp(luluvid_url)
             if result and os.path.exists(result):
                 # Return the downloaded file path instead of URL for compatibility
                 return result
@@ -2071,17 +4296,10 @@ class ContentExtractor:
             playlist_content = response.text
             self.logger.info(f"📄 Master playlist downloaded: {len(playlist_content)} characters")
 
-            # Parse master playlist to find index M3U8
-            lines = playlist_content.split('\n')
-            base_url = '/'.join(master_m3u8_url.split('/')[:-1]) + '/'
-
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('#') and '.m3u8' in line:
-                    if line.startswith('http'):
-                        return line
-                    else:
-                        return base_url + line
+            # Parse master playlist and pick the best variant
+            variants = parse_m3u8(playlist_content, master_m3u8_url)['variants']
+            if variants:
+                return max(variants, key=lambda variant: variant['bandwidth'])['url']
 
             self.logger.warning("❌ No index M3U8 found in master playlist")
             return None
@@ -2126,49 +4344,98 @@ class ContentExtractor:
 
             file_path = os.path.join(self.temp_dir, filename)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(final_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30), allow_redirects=True) as response:
-                    if response.status not in [200, 206]:
-                        logger.error(f"HTTP {response.status}: {response.reason}")
-                        return None
+            session = await self.fetcher.get_session()
+            async with session.get(final_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30), allow_redirects=True) as response:
+                if response.status not in [200, 206]:
+                    logger.error(f"HTTP {response.status}: {response.reason}")
+                    return None
 
-                    content_type = response.headers.get('content-type', '').lower()
+                content_type = response.headers.get('content-type', '').lower()
 
-                    if ('text/html' in content_type or
-                        b'error' in (await response.read())[:500]):
-                        return await self.download_with_alternative_method_async(final_url, filename, referrer_url)
+                if ('text/html' in content_type or
+                    b'error' in (await response.read())[:500]):
+                    return await self.download_with_alternative_method_async(final_url, filename, referrer_url)
 
-                    content = await response.read()
+                content = await response.read()
 
-                    if len(content) < 1000:
-                        return None
+                if len(content) < 1000:
+                    return None
 
-                    if not any(content_type.startswith(img_type) for img_type in ['image/', 'application/octet-stream']):
-                        magic_bytes = content[:10]
-                        image_signatures = [
-                            b'\xFF\xD8\xFF',  # JPEG
-                            b'\x89PNG\r\n\x1a\n',  # PNG
-                            b'GIF87a',  # GIF87a
-                            b'GIF89a',  # GIF89a
-                            b'RIFF',  # WebP (starts with RIFF)
-                        ]
+                if not any(content_type.startswith(img_type) for img_type in ['image/', 'application/octet-stream']):
+                    magic_bytes = content[:10]
+                    image_signatures = [
+                        b'\xFF\xD8\xFF',  # JPEG
+                        b'\x89PNG\r\n\x1a\n',  # PNG
+                        b'GIF87a',  # GIF87a
+                        b'GIF89a',  # GIF89a
+                        b'RIFF',  # WebP (starts with RIFF)
+                    ]
 
-                        if not any(magic_bytes.startswith(sig) for sig in image_signatures):
-                            return None
+                    if not any(magic_bytes.startswith(sig) for sig in image_signatures):
+                        return None
 
-                    async with aiofiles.open(file_path, 'wb') as f:
-                        await f.write(content)
+                async with aiofiles.open(file_path, 'wb') as f:
+                    await f.write(content)
 
-                    if os.path.getsize(file_path) < 1000:
-                        os.remove(file_path)
-                        return None
+                if os.path.getsize(file_path) < 1000:
+                    os.remove(file_path)
+                    return None
 
-                    return file_path
+                return file_path
 
         except Exception as e:
             logger.error(f"Async download error for {image_url}: {e}")
             return None
 
+    async def download_images_concurrently(self, image_items, referrer_url=None, prefix='image',
+                                           max_concurrency=None, per_host_limit=None):
+        """Download images concurrently (bounded overall and per host), returning results in original order"""
+        max_concurrency = max_concurrency or IMAGE_DOWNLOAD_CONCURRENCY
+        per_host_limit = per_host_limit or IMAGE_DOWNLOAD_PER_HOST
+        global_semaphore = asyncio.Semaphore(max_concurrency)
+        host_semaphores = {}
+
+        async def download_one(index, img_data):
+            image_url = img_data['url']
+            image_alt = re.sub(r'[^\w\-]', '_', img_data.get('alt') or 'unknown')[:40]
+            result = {'index': index, 'url': image_url, 'file_path': None, 'file_size': 0, 'error': None}
+
+            host = urlparse(image_url).netloc.lower()
+            host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(per_host_limit))
+            async with host_semaphore:
+                async with global_semaphore:
+                    try:
+                        logger.info(f"📥 Downloading image {index}/{len(image_items)} from: {image_url}")
+                        file_path = await self.download_image_async(
+                            image_url,
+                            f"{prefix}_{index}_{image_alt}.jpg",
+                            referrer_url=referrer_url
+                        )
+                        if not file_path or not os.path.exists(file_path):
+                            result['error'] = "download failed"
+                        else:
+                            file_size = os.path.getsize(file_path)
+                            if file_size > 1000:
+                                result['file_path'] = file_path
+                                result['file_size'] = file_size
+                                logger.info(f"✅ Image {index} downloaded successfully ({file_size} bytes)")
+                            else:
+                                result['error'] = f"file too small ({file_size} bytes)"
+                                os.remove(file_path)
+                    except Exception as e:
+                        result['error'] = str(e)
+
+            if result['error']:
+                logger.warning(f"⚠️ Image {index} failed: {result['error']} ({image_url})")
+            return result
+
+        started = time.time()
+        results = await asyncio.gather(*(download_one(i, img) for i, img in enumerate(image_items, 1)))
+        downloaded = sum(1 for r in results if r['file_path'])
+        logger.info(f"📥 Image download stage: {downloaded}/{len(image_items)} images in {time.time() - started:.1f}s "
+                    f"(concurrency {max_concurrency}, per host {per_host_limit})")
+        return list(results)
+
     def download_image(self, image_url, filename=None, referrer_url=None):
         """Download image directly from the source URL (synchronous fallback)"""
         try:
@@ -2332,12 +4599,18 @@ class ContentExtractor:
             logger.error(f"❌ M3U8 download error: {e}")
             return None
 
+    # FFmpeg location is probed once per process and shared by every extractor
+    _ffmpeg_path = None
+    _ffmpeg_probed = False
+
     def get_ffmpeg_path(self):
-        """Get the appropriate FFmpeg path for the current operating system"""
+        """Get the appropriate FFmpeg path for the current operating system (probed once, then cached)"""
         import subprocess
-        import os
         import platform
 
+        if ContentExtractor._ffmpeg_probed:
+            return ContentExtractor._ffmpeg_path
+
         # Try different ffmpeg paths based on OS
         if platform.system() == "Windows":
             ffmpeg_paths = [
@@ -2356,23 +4629,25 @@ class ContentExtractor:
                 '/home/*/bin/ffmpeg',  # User installation
             ]
 
-        # Test each path to find working FFmpeg
+        # Only spawn `ffmpeg -version` for candidates that actually exist
         for path in ffmpeg_paths:
+            resolved = shutil.which(path)
+            if not resolved:
+                continue
             try:
-                result = subprocess.run([path, '-version'],
-                                      capture_output=True,
-                                      check=True,
-                                      timeout=5)
-                if result.returncode == 0:
-                    self.logger.info(f"✅ FFmpeg found at: {path}")
-                    return path
-            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+                subprocess.run([resolved, '-version'], capture_output=True, check=True, timeout=5)
+            except (subprocess.CalledProcessError, OSError, subprocess.TimeoutExpired):
                 continue
+            self.logger.info(f"✅ FFmpeg found at: {resolved}")
+            ContentExtractor._ffmpeg_path = resolved
+            ContentExtractor._ffmpeg_probed = True
+            return resolved
 
         # If no FFmpeg found, log warning
         self.logger.warning("⚠️ FFmpeg not found in any standard location")
         self.logger.info("💡 On VPS, install with: sudo apt update && sudo apt install ffmpeg")
         self.logger.info("💡 On Windows, download from: https://ffmpeg.org/download.html")
+        ContentExtractor._ffmpeg_probed = True
         return None
 
     def extract_video_urls_from_page(self, url):
@@ -2391,38 +4666,8 @@ class ContentExtractor:
             content = response.text
             video_urls = []
 
-            # Enhanced video URL patterns for better extraction
-            patterns = [
-                # Direct video file patterns
-                r'["\']([^"\']*\.mp4[^"\']*)["\']',
-                r'["\']([^"\']*\.m3u8[^"\']*)["\']',
-                r'["\']([^"\']*\.webm[^"\']*)["\']',
-                r'["\']([^"\']*\.ts[^"\']*)["\']',
-
-                # JavaScript player patterns
-                r'file["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'video["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'src["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'url["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'source["\']?\s*:\s*["\']([^"\']+)["\']',
-
-                # HLS specific patterns
-                r'master\.m3u8[^"\']*',
-                r'playlist\.m3u8[^"\']*',
-                r'index\.m3u8[^"\']*',
-
-                # Common streaming patterns
-                r'https?://[^"\']*\.m3u8[^"\']*',
-                r'https?://[^"\']*\.mp4[^"\']*',
-                r'https?://[^"\']*\.ts[^"\']*',
-
-                # Player-specific patterns
-                r'jwplayer[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'playerjs[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
-            ]
-
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
+            for pattern in PAGE_VIDEO_URL_PATTERNS:
+                matches = pattern.findall(content)
                 for match in matches:
                     if self.is_video_url_valid(match):
                         from urllib.parse import urljoin
@@ -2446,10 +4691,8 @@ class ContentExtractor:
 
         return any(ext in url_lower for ext in video_extensions)
 
-    def download_hls_to_mp4_exact(self, hls_url, output_file):
+    async def download_hls_to_mp4_exact(self, hls_url, output_file):
         """Download HLS stream directly to MP4 using FFmpeg with enhanced headers"""
-        import subprocess  # Import subprocess here
-
         # Get the appropriate FFmpeg path for this OS
         ffmpeg_path = self.get_ffmpeg_path()
         if not ffmpeg_path:
@@ -2464,6 +4707,7 @@ class ContentExtractor:
         # FFmpeg command to download HLS directly to MP4 (cross-platform)
         cmd = [
             ffmpeg_path,  # Use detected FFmpeg path
+            '-progress', 'pipe:1', '-nostats',  # Machine-readable progress on stdout
             '-user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             '-referer', 'https://luluvid.com/',
             '-i', hls_url,
@@ -2476,18 +4720,19 @@ class ContentExtractor:
 
         try:
             print("Starting download...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            returncode, stderr = await run_media_subprocess(cmd, "HLS download")
 
-            if result.returncode == 0:
+            if returncode == 0:
                 print(f"Successfully downloaded to: {output_file}")
                 return True
             else:
-                print(f"FFmpeg error: {result.stderr}")
+                print(f"FFmpeg error: {stderr}")
 
                 # Try with re-encoding if copy fails (cross-platform)
                 print("Trying with re-encoding...")
                 cmd_reencode = [
                     ffmpeg_path,  # Use detected FFmpeg path
+                    '-progress', 'pipe:1', '-nostats',
                     '-user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                     '-referer', 'https://luluvid.com/',
                     '-i', hls_url,
@@ -2499,37 +4744,34 @@ class ContentExtractor:
                     '-y'
                 ]
 
-                result2 = subprocess.run(cmd_reencode, capture_output=True, text=True)
+                returncode, stderr = await run_media_subprocess(cmd_reencode, "HLS re-encode")
 
-                if result2.returncode == 0:
+                if returncode == 0:
                     print(f"Successfully downloaded with re-encoding to: {output_file}")
                     return True
                 else:
-                    print(f"Re-encoding also failed: {result2.stderr}")
+                    print(f"Re-encoding also failed: {stderr}")
                     return False
 
         except Exception as e:
             print(f"Download failed: {e}")
             return False
 
-    def download_luluvid_with_ytdlp(self, luluvid_url):
+    async def download_luluvid_with_ytdlp(self, luluvid_url):
         """Download Luluvid video using optimized yt-dlp + FFmpeg stream copy encoding"""
         print("🎬 Using optimized yt-dlp method (10x faster with encoding)")
 
         try:
-            import subprocess
-            import os
-            import time
-
             # Create output directory
             os.makedirs(self.temp_dir, exist_ok=True)
 
-            # Generate output filename pattern
-            raw_output_pattern = os.path.join(self.temp_dir, "luluvid_raw.%(ext)s")
+            # Unique names so concurrent downloads never pick up each other's files
+            job_id = f"{int(time.time() * 1000)}_{random.randint(1000, 9999)}"
+            raw_prefix = f"luluvid_raw_{job_id}"
+            raw_output_pattern = os.path.join(self.temp_dir, f"{raw_prefix}.%(ext)s")
 
             # OPTIMIZED yt-dlp command for 10x faster downloads
-            cmd = [
-                'yt-dlp',
+            cmd = get_ytdlp_command() + [
                 '--user-agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 '--referer', 'https://luluvid.com/',
                 '--output', raw_output_pattern,
@@ -2541,6 +4783,7 @@ class ContentExtractor:
                 '--socket-timeout', '10',       # Shorter timeout
                 '--http-chunk-size', '1048576', # 1MB chunks for faster download
 
+                '--newline',                    # One progress line per update
                 '--no-warnings',
                 '--no-playlist',
                 '--format', 'best[ext=mp4]/best',
@@ -2553,16 +4796,20 @@ class ContentExtractor:
             download_start = time.time()
 
             # Execute optimized yt-dlp
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            returncode, stderr = await run_media_subprocess(cmd, "Luluvid yt-dlp download", timeout=300)
+
+            if returncode is None:
+                print("⏰ yt-dlp timeout (5 minutes)")
+                return None
 
-            if result.returncode == 0:
+            if returncode == 0:
                 download_time = time.time() - download_start
                 print(f"✅ yt-dlp download successful in {download_time:.1f}s!")
 
                 # Find the downloaded file
                 raw_file_path = None
                 for file in os.listdir(self.temp_dir):
-                    if file.startswith('luluvid_raw') and file.endswith(('.mp4', '.mkv', '.webm')):
+                    if file.startswith(raw_prefix) and file.endswith(('.mp4', '.mkv', '.webm')):
                         raw_file_path = os.path.join(self.temp_dir, file)
                         break
 
@@ -2577,7 +4824,13 @@ class ContentExtractor:
                 # STEP 2: Ultra-fast FFmpeg stream copy encoding for web optimization
                 print("⚡ Starting ultra-fast FFmpeg stream copy encoding...")
 
-                final_output = os.path.join(self.temp_dir, "luluvid_optimized.mp4")
+                final_output = os.path.join(self.temp_dir, f"luluvid_optimized_{job_id}.mp4")
+
+                # yt-dlp often delivers an MP4 that already has moov up front; only remux when it doesn't
+                raw_info = await probe_video(raw_file_path)
+                if raw_file_path.endswith('.mp4') and raw_info and raw_info.get('faststart'):
+                    print("✅ Download is already a faststart MP4, skipping the remux")
+                    return raw_file_path
 
                 # Get FFmpeg path
                 ffmpeg_path = self.get_ffmpeg_path()
@@ -2590,6 +4843,7 @@ class ContentExtractor:
                 # Ultra-fast FFmpeg stream copy command
                 encode_cmd = [
                     ffmpeg_path,
+                    '-progress', 'pipe:1', '-nostats',  # Machine-readable progress on stdout
                     '-i', raw_file_path,
                     '-c', 'copy',                # Copy streams without re-encoding
                     '-movflags', '+faststart',   # Optimize for web streaming
@@ -2598,11 +4852,11 @@ class ContentExtractor:
                     '-y'                         # Overwrite output
                 ]
 
-                encode_result = subprocess.run(encode_cmd, capture_output=True, text=True)
+                encode_returncode, encode_stderr = await run_media_subprocess(encode_cmd, "Luluvid faststart remux")
 
                 encode_time = time.time() - encode_start
 
-                if encode_result.returncode == 0:
+                if encode_returncode == 0:
                     final_file_size = os.path.getsize(final_output)
                     encode_speed = (final_file_size / 1024 / 1024) / encode_time if encode_time > 0 else 0
                     total_time = download_time + encode_time
@@ -2620,20 +4874,19 @@ class ContentExtractor:
 
                     return final_output
                 else:
-                    print(f"⚠️ Encoding failed: {encode_result.stderr}")
+                    print(f"⚠️ Encoding failed: {encode_stderr}")
                     print("📁 Returning raw file instead")
                     return raw_file_path
 
             else:
-                print(f"❌ yt-dlp failed: {result.stderr}")
+                print(f"❌ yt-dlp failed: {stderr}")
                 return None
 
-        except subprocess.TimeoutExpired:
-            print("⏰ yt-dlp timeout (5 minutes)")
-            return None
         except Exception as e:
             print(f"💥 yt-dlp error: {e}")
             return None
+
+    async def download_luluvid_with_video_extractor(self, page_url, filename=None, referrer_url=None):
         """Download Luluvid video using EXACT same logic as video_extractor.py main() function"""
         print("=" * 50)
         print("🎬 VIDEO EXTRACTOR")
@@ -2641,8 +4894,6 @@ class ContentExtractor:
         print()
 
         try:
-            import os
-
             if not page_url:
                 print("❌ No URL provided!")
                 return None
@@ -2660,64 +4911,13 @@ class ContentExtractor:
             if not filename:
                 filename = "video.mp4"
             elif not filename.endswith('.mp4'):
-                filename += '.mp4'
-
-            output_file = os.path.join(self.temp_dir, filename)
-
-            # IMMEDIATE extraction and download to prevent token expiration
-            # (Create completely fresh session like video_extractor.py)
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-
-            print(f"Fetching: {page_url}")
-            response = session.get(page_url, timeout=30)
-            response.raise_for_status()
-
-            content = response.text
-            video_urls = []
-
-            # Enhanced video URL patterns for better extraction
-            patterns = [
-                # Direct video file patterns
-                r'["\']([^"\']*\.mp4[^"\']*)["\']',
-                r'["\']([^"\']*\.m3u8[^"\']*)["\']',
-                r'["\']([^"\']*\.webm[^"\']*)["\']',
-                r'["\']([^"\']*\.ts[^"\']*)["\']',
-
-                # JavaScript player patterns
-                r'file["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'video["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'src["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'url["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'source["\']?\s*:\s*["\']([^"\']+)["\']',
-
-                # HLS specific patterns
-                r'master\.m3u8[^"\']*',
-                r'playlist\.m3u8[^"\']*',
-                r'index\.m3u8[^"\']*',
-
-                # Common streaming patterns
-                r'https?://[^"\']*\.m3u8[^"\']*',
-                r'https?://[^"\']*\.mp4[^"\']*',
-                r'https?://[^"\']*\.ts[^"\']*',
-
-                # Player-specific patterns
-                r'jwplayer[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
-                r'playerjs[^}]*file["\']?\s*:\s*["\']([^"\']+)["\']',
-            ]
-
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    if self.is_video_url_valid(match):
-                        from urllib.parse import urljoin
-                        full_url = urljoin(page_url, match)
-                        video_urls.append(full_url)
+                filename += '.mp4'
 
-            # Remove duplicates
-            video_urls = list(set(video_urls))
+            output_file = os.path.join(self.temp_dir, filename)
+
+            # IMMEDIATE extraction and download to prevent token expiration
+            # (fresh session like video_extractor.py, fetched off the event loop)
+            video_urls = await asyncio.to_thread(self.extract_video_urls_from_page, page_url)
 
             if not video_urls:
                 print("❌ No video URLs found")
@@ -2739,31 +4939,8 @@ class ContentExtractor:
             print(f"🎬 Downloading video IMMEDIATELY (fresh token)...")
             print()
 
-            # Download HLS stream to MP4 with fresh token (INLINE - no separate method calls)
-            # Get FFmpeg path for cross-platform compatibility
-            ffmpeg_path = self.get_ffmpeg_path()
-            if not ffmpeg_path:
-                print("❌ FFmpeg not available on this system")
-                return None
-
-            cmd = [
-                ffmpeg_path,  # Use detected FFmpeg path
-                '-user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                '-referer', 'https://luluvid.com/',
-                '-i', hls_url,
-                '-c', 'copy',
-                '-bsf:a', 'aac_adtstoasc',
-                '-f', 'mp4',
-                output_file,
-                '-y'
-            ]
-
-            import subprocess
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            success = result.returncode == 0
-
-            if success:
+            # Stream copy first, re-encode if that fails
+            if await self.download_hls_to_mp4_exact(hls_url, output_file):
                 print()
                 print("🎉 Download completed successfully!")
                 print(f"📁 Video saved as: {output_file}")
@@ -2771,35 +4948,7 @@ class ContentExtractor:
                     file_size = os.path.getsize(output_file)
                     print(f"File size: {file_size / 1024 / 1024:.1f}MB")
                 return output_file
-            else:
-                print(f"❌ FFmpeg error: {result.stderr}")
-
-                # Try with re-encoding if copy fails (cross-platform)
-                print("Trying with re-encoding...")
-                cmd_reencode = [
-                    ffmpeg_path,  # Use detected FFmpeg path
-                    '-user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    '-referer', 'https://luluvid.com/',
-                    '-i', hls_url,
-                    '-c:v', 'libx264',
-                    '-c:a', 'aac',
-                    '-preset', 'fast',
-                    '-crf', '23',
-                    output_file,
-                    '-y'
-                ]
-
-                result2 = subprocess.run(cmd_reencode, capture_output=True, text=True)
-
-                if result2.returncode == 0:
-                    print("🎉 Download completed with re-encoding!")
-                    if os.path.exists(output_file):
-                        file_size = os.path.getsize(output_file)
-                        print(f"File size: {file_size / 1024 / 1024:.1f}MB")
-                    return output_file
-                else:
-                    print(f"❌ Re-encoding also failed: {result2.stderr}")
-                    return None
+            return None
 
         except Exception as e:
             print(f"Error in exact copy method: {e}")
@@ -2885,7 +5034,7 @@ class ContentExtractor:
 
             # Use video_extractor.py approach with the luluvid page URL (tested and working!)
             logger.info(f"🎬 Using video_extractor.py approach with luluvid page URL: {referrer_url}")
-            video_extractor_result = self.download_luluvid_with_video_extractor(referrer_url, filename, referrer_url)
+            video_extractor_result = await self.download_luluvid_with_video_extractor(referrer_url, filename, referrer_url)
 
             if video_extractor_result and os.path.exists(video_extractor_result):
                 file_size = os.path.getsize(video_extractor_result)
@@ -2901,102 +5050,45 @@ class ContentExtractor:
             return None
 
     async def _download_m3u8_segments_manual(self, m3u8_url, filename=None, referrer_url=None):
-        """Fallback: Manual M3U8 segment download and concatenation"""
+        """Fallback: download the HLS stream natively (parallel segments, ordered write, faststart remux)"""
         try:
-            import tempfile
-            import os
-
-            # Download M3U8 playlist with proper headers for luluvid
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/vnd.apple.mpegurl,application/x-mpegURL,*/*',
+                'Accept': '*/*',
                 'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
                 'DNT': '1',
                 'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
                 'Referer': referrer_url or 'https://luluvid.com/'
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(m3u8_url, headers=headers) as response:
-                    if response.status != 200:
-                        logger.error(f"❌ Failed to download M3U8 playlist: {response.status}")
-                        return None
-
-                    playlist_content = await response.text()
-                    logger.info(f"📄 M3U8 playlist downloaded: {len(playlist_content)} characters")
-
-                    # Parse playlist to find segment URLs
-                    segment_urls = []
-                    base_url = '/'.join(m3u8_url.split('/')[:-1]) + '/'
-
-                    for line in playlist_content.split('\n'):
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            if line.startswith('http'):
-                                segment_urls.append(line)
-                            else:
-                                segment_urls.append(base_url + line)
-
-                    logger.info(f"🎬 Found {len(segment_urls)} video segments")
-
-                    if not segment_urls:
-                        logger.error("❌ No video segments found in M3U8 playlist")
-                        return None
-
-                    # Download segments and concatenate
-                    if not filename:
-                        filename = "luluvid_video.mp4"
-
-                    # Create temporary file
-                    temp_file = tempfile.NamedTemporaryFile(suffix='.mp4', delete=False)
-                    temp_path = temp_file.name
-                    temp_file.close()  # Close the file handle so we can write to it
-
-                    # Download segments (limit to reasonable number for testing)
-                    downloaded_segments = 0
-                    max_segments = min(50, len(segment_urls))  # Increased limit
-
-                    logger.info(f"🎬 Starting manual download of {max_segments} segments...")
-
-                    # Open file for writing
-                    with open(temp_path, 'wb') as output_file:
-                        for i, segment_url in enumerate(segment_urls[:max_segments]):
-                            try:
-                                # Use same headers for segments
-                                async with session.get(segment_url, headers=headers) as seg_response:
-                                    if seg_response.status == 200:
-                                        segment_data = await seg_response.read()
-                                        output_file.write(segment_data)
-                                        downloaded_segments += 1
-
-                                        # Log progress every 10 segments
-                                        if (i + 1) % 10 == 0 or i == max_segments - 1:
-                                            logger.info(f"📥 Downloaded {i+1}/{max_segments} segments")
-                                    else:
-                                        logger.warning(f"⚠️ Failed to download segment {i+1}: {seg_response.status}")
-                                        # Continue with other segments
-                            except Exception as e:
-                                logger.warning(f"⚠️ Error downloading segment {i+1}: {e}")
-                                # Continue with other segments
+            if not filename:
+                filename = "luluvid_video.mp4"
+            os.makedirs(self.temp_dir, exist_ok=True)
+            output_path = os.path.join(self.temp_dir, filename)
 
-                    if downloaded_segments > 0:
-                        file_size = os.path.getsize(temp_path)
-                        logger.info(f"✅ Manual M3U8 download completed. File size: {file_size / 1024 / 1024:.1f}MB")
-                        return temp_path
-                    else:
-                        logger.error("❌ No segments could be downloaded")
-                        if os.path.exists(temp_path):
-                            os.unlink(temp_path)
-                        return None
+            downloader = HLSDownloader(self.fetcher, ffmpeg_path=self.get_ffmpeg_path())
+            return await downloader.download(m3u8_url, output_path, headers)
 
         except Exception as e:
             logger.error(f"❌ Manual M3U8 download error: {e}")
             return None
 
     async def download_video_async(self, video_url, filename=None, referrer_url=None):
-        """Download video from any source using yt-dlp."""
+        """Download video from any source: native ranged download for direct files, yt-dlp otherwise."""
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+        # Direct MP4 links (Vidoza, Streamtape, Stream2z, ...) are fetched over parallel byte ranges
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': '*/*',
+        }
+        if referrer_url:
+            headers['Referer'] = referrer_url
+        output_path = os.path.join(self.temp_dir, f"{filename or 'video'}.mp4")
+        video_file = await RangedDownloader(self.fetcher).download(video_url, output_path, headers)
+        if video_file:
+            return video_file
+
         logger.info(f"Initiating download for {video_url} using yt-dlp wrapper.")
         try:
             # yt-dlp can be slow, so run it in an executor to avoid blocking the event loop
@@ -3057,33 +5149,33 @@ class ContentExtractor:
                     elif self.is_imagetwist_url(image_url):
                         headers['Referer'] = 'https://imagetwist.com/'
 
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(image_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30), allow_redirects=True) as response:
-                            if response.status in [200, 206]:
-                                content_type = response.headers.get('content-type', '').lower()
-                                content = await response.read()
-
-                                if (any(img_type in content_type for img_type in ['image/', 'application/octet-stream']) and
-                                    len(content) > 1000 and
-                                    not content.startswith(b'<!DOCTYPE') and
-                                    not content.startswith(b'<html')):
-
-                                    if not filename:
-                                        parsed_url = urlparse(image_url)
-                                        filename = os.path.basename(parsed_url.path)
-                                        if not filename or '.' not in filename:
-                                            match = re.search(r'/([^/]+\.(jpg|jpeg|png|gif|webp))$', image_url, re.I)
-                                            if match:
-                                                filename = match.group(1)
-                                            else:
-                                                filename = 'image.jpg'
+                    session = await self.fetcher.get_session()
+                    async with session.get(image_url, headers=headers, timeout=aiohttp.ClientTimeout(total=30), allow_redirects=True) as response:
+                        if response.status in [200, 206]:
+                            content_type = response.headers.get('content-type', '').lower()
+                            content = await response.read()
+
+                            if (any(img_type in content_type for img_type in ['image/', 'application/octet-stream']) and
+                                len(content) > 1000 and
+                                not content.startswith(b'<!DOCTYPE') and
+                                not content.startswith(b'<html')):
+
+                                if not filename:
+                                    parsed_url = urlparse(image_url)
+                                    filename = os.path.basename(parsed_url.path)
+                                    if not filename or '.' not in filename:
+                                        match = re.search(r'/([^/]+\.(jpg|jpeg|png|gif|webp))$', image_url, re.I)
+                                        if match:
+                                            filename = match.group(1)
+                                        else:
+                                            filename = 'image.jpg'
 
-                                    file_path = os.path.join(self.temp_dir, filename)
+                                file_path = os.path.join(self.temp_dir, filename)
 
-                                    async with aiofiles.open(file_path, 'wb') as f:
-                                        await f.write(content)
+                                async with aiofiles.open(file_path, 'wb') as f:
+                                    await f.write(content)
 
-                                    return file_path
+                                return file_path
 
                 except Exception as e:
                     continue
@@ -3159,7 +5251,7 @@ class ContentExtractor:
     def extract_images_from_html(self, html_content):
         """Extract image URLs from HTML content"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_document(html_content)
             images = []
 
             img_tags = soup.find_all('img')
@@ -3193,55 +5285,30 @@ class ContentExtractor:
         except Exception as e:
             return f"Error extracting images: {str(e)}"
 
-    def extract_images_from_url(self, url):
+    def extract_images_from_url(self, url, snapshot=None):
         """Extract all images from a webpage URL"""
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                return snapshot.error
 
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-
-            return self.extract_images_from_html(response.text)
+            return self.extract_images_from_html(snapshot.text)
 
-        except requests.exceptions.RequestException as e:
-            return f"Error fetching URL: {str(e)}"
         except Exception as e:
             return f"Error extracting images: {str(e)}"
 
     # Add the sample.py extraction methods to ContentExtractor class
-    def extract_title_sample_style(self, url):
+    def extract_title_sample_style(self, url, snapshot=None):
         """Extract title using sample.py method - fallback for URLs that don't work with current method"""
-        try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+        if snapshot is None:
+            snapshot = self.fetch_page_snapshot(url)
 
-            # Special handling for mmsdose.us URLs - use exact headers from test script
-            if 'mmsdose.us' in url:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'same-origin',
-                    'Cache-Control': 'max-age=0',
-                    'Referer': 'https://mmsdose.us/',
-                    'Origin': 'https://mmsdose.us'
-                }
-                time.sleep(random.uniform(1, 2))
-                response = requests.get(url, headers=headers, timeout=10)
-            else:
-                response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+        try:
+            if not snapshot.ok:
+                return self.extract_title(url, snapshot)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = snapshot.doc
 
             # Use sample.py method: look for h1 with specific class
             title_element = soup.find('h1', class_='text-xl md:text-2xl')
@@ -3251,174 +5318,118 @@ class ContentExtractor:
                     return self.clean_title(title)
 
             # Fallback to existing method
-            return self.extract_title(url)
+            return self.extract_title(url, snapshot)
 
         except Exception as e:
             logger.error(f"Error in sample-style title extraction: {e}")
-            return self.extract_title(url)  # Fallback to original method
+            return self.extract_title(url, snapshot)  # Fallback to original method
 
-    def extract_image_sample_style(self, url):
+    def extract_image_sample_style(self, url, snapshot=None):
         """Extract image using sample.py method - fallback for URLs that don't work with current method"""
-        max_retries = 3
-        retry_delay = 2  # seconds
-
-        for attempt in range(max_retries):
-            try:
-                # Add protocol if missing
-                if not url.startswith(('http://', 'https://')):
-                    url = 'https://' + url
-
-                # Special handling for mmsdose.us URLs - use exact headers from test script
-                if 'mmsdose.us' in url:
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'same-origin',
-                        'Cache-Control': 'max-age=0',
-                        'Referer': 'https://mmsdose.us/',
-                        'Origin': 'https://mmsdose.us'
-                    }
-                    time.sleep(random.uniform(1, 2))
-                    response = requests.get(url, headers=headers, timeout=15)
-                else:
-                    response = self.session.get(url, timeout=15)
-                response.raise_for_status()
+        if snapshot is None:
+            snapshot = self.fetch_page_snapshot(url)
+        if not snapshot.ok:
+            logger.error(f"❌ Failed to extract sample-style images: {snapshot.error}")
+            return []
 
-                soup = BeautifulSoup(response.content, 'html.parser')
+        try:
+            url = snapshot.url
+            img_tags = snapshot.buckets.nodes['img']
 
-                # Use sample.py method: look for ALL img elements with specific classes
-                img_elements = soup.find_all('img', class_='rounded object-contain shadow-lg')
-                logger.info(f"🔍 Found {len(img_elements)} images with class 'rounded object-contain shadow-lg'")
+            # Use sample.py method: look for ALL img elements with specific classes
+            img_elements = [img for img in img_tags if has_class(img, 'rounded object-contain shadow-lg')]
+            logger.info(f"🔍 Found {len(img_elements)} images with class 'rounded object-contain shadow-lg'")
 
-                # Also look for erome.com specific images
-                erome_img_elements = soup.find_all('img', class_='img-front')
-                logger.info(f"🔍 Found {len(erome_img_elements)} images with class 'img-front'")
+            # Also look for erome.com specific images
+            erome_img_elements = [img for img in img_tags if has_class(img, 'img-front')]
+            logger.info(f"🔍 Found {len(erome_img_elements)} images with class 'img-front'")
 
-                # Combine both sets of images
-                all_img_elements = img_elements + erome_img_elements
-                logger.info(f"🔍 Total images to process: {len(all_img_elements)}")
+            # Combine both sets of images
+            all_img_elements = img_elements + erome_img_elements
+            logger.info(f"🔍 Total images to process: {len(all_img_elements)}")
 
-                extracted_images = []
+            extracted_images = []
 
-                for i, img_element in enumerate(all_img_elements, 1):
-                    logger.info(f"🔍 Processing image {i}/{len(all_img_elements)}")
-                    logger.info(f"🔍 Image {i} alt: {img_element.get('alt', 'No alt')}")
+            for i, img_element in enumerate(all_img_elements, 1):
+                logger.info(f"🔍 Processing image {i}/{len(all_img_elements)}")
+                logger.info(f"🔍 Image {i} alt: {img_element.get('alt', 'No alt')}")
 
-                    # Try to get the actual image URL from data-src (lazy loading), srcset, or src
-                    image_url = None
+                # Try to get the actual image URL from data-src (lazy loading), srcset, or src
+                image_url = None
 
-                    # First try data-src (for lazy loading)
-                    data_src = img_element.get('data-src')
-                    if data_src:
-                        logger.info(f"🔍 Image {i} has data-src: {data_src}")
-                        image_url = data_src
+                # First try data-src (for lazy loading)
+                data_src = img_element.get('data-src')
+                if data_src:
+                    logger.info(f"🔍 Image {i} has data-src: {data_src}")
+                    image_url = data_src
+                else:
+                    # Try srcset
+                    srcset = img_element.get('srcset', '')
+                    if srcset:
+                        logger.info(f"🔍 Image {i} has srcset: {srcset[:100]}...")
+                        # Extract the highest resolution image from srcset
+                        srcset_parts = srcset.split(', ')
+                        if srcset_parts:
+                            # Get the last (highest resolution) image
+                            last_srcset = srcset_parts[-1]
+                            image_url = last_srcset.split(' ')[0]
                     else:
-                        # Try srcset
-                        srcset = img_element.get('srcset', '')
-                        if srcset:
-                            logger.info(f"🔍 Image {i} has srcset: {srcset[:100]}...")
-                            # Extract the highest resolution image from srcset
-                            srcset_parts = srcset.split(', ')
-                            if srcset_parts:
-                                # Get the last (highest resolution) image
-                                last_srcset = srcset_parts[-1]
-                                image_url = last_srcset.split(' ')[0]
-                        else:
-                            # Fallback to src attribute
-                            src = img_element.get('src')
-                            if src:
-                                logger.info(f"🔍 Image {i} has src: {src}")
-                                image_url = src
+                        # Fallback to src attribute
+                        src = img_element.get('src')
+                        if src:
+                            logger.info(f"🔍 Image {i} has src: {src}")
+                            image_url = src
 
-                    if image_url:
-                        # Convert relative URL to absolute
-                        if image_url.startswith('/'):
-                            image_url = urljoin(url, image_url)
-                        elif not image_url.startswith(('http://', 'https://')):
-                            image_url = urljoin(url, image_url)
+                if image_url:
+                    # Convert relative URL to absolute
+                    if image_url.startswith('/'):
+                        image_url = urljoin(url, image_url)
+                    elif not image_url.startswith(('http://', 'https://')):
+                        image_url = urljoin(url, image_url)
 
-                        # Filter out data URLs
-                        if not image_url.startswith('data:'):
-                            logger.info(f"🔍 Image {i} extracted URL: {image_url}")
-                            extracted_images.append({
-                                'url': image_url,
-                                'alt': img_element.get('alt', ''),
-                                'type': 'sample_style'
-                            })
-                        else:
-                            logger.warning(f"⚠️ Image {i} has data URL, skipping")
+                    # Filter out data URLs
+                    if not image_url.startswith('data:'):
+                        logger.info(f"🔍 Image {i} extracted URL: {image_url}")
+                        extracted_images.append({
+                            'url': image_url,
+                            'alt': img_element.get('alt', ''),
+                            'type': 'sample_style'
+                        })
                     else:
-                        logger.warning(f"⚠️ Image {i} has no src, data-src, or srcset")
-
-                # Remove duplicates while preserving order
-                seen_urls = set()
-                unique_images = []
-                for img in extracted_images:
-                    if img['url'] not in seen_urls:
-                        seen_urls.add(img['url'])
-                        unique_images.append(img)
+                        logger.warning(f"⚠️ Image {i} has data URL, skipping")
+                else:
+                    logger.warning(f"⚠️ Image {i} has no src, data-src, or srcset")
 
-                logger.info(f"✅ Extracted {len(unique_images)} unique images from {len(all_img_elements)} found images")
-                return unique_images
+            # Remove duplicates while preserving order
+            seen_urls = set()
+            unique_images = []
+            for img in extracted_images:
+                if img['url'] not in seen_urls:
+                    seen_urls.add(img['url'])
+                    unique_images.append(img)
 
-            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
-                    requests.exceptions.RequestException, ConnectionResetError) as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"⚠️ Connection error on attempt {attempt + 1}/{max_retries} for sample-style extraction: {str(e)}")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
-                else:
-                    logger.error(f"❌ Failed to extract sample-style images after {max_retries} attempts: {str(e)}")
-                    return []
-            except Exception as e:
-                logger.error(f"❌ Unexpected error in sample-style image extraction: {e}")
-                return []
+            logger.info(f"✅ Extracted {len(unique_images)} unique images from {len(all_img_elements)} found images")
+            return unique_images
 
-        return []
+        except Exception as e:
+            logger.error(f"❌ Unexpected error in sample-style image extraction: {e}")
+            return []
 
-    def extract_video_sample_style(self, url):
+    def extract_video_sample_style(self, url, snapshot=None):
         """Extract videos using sample.py method - fallback for URLs that don't work with current method"""
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-
-            # Special handling for mmsdose.us URLs - use exact headers from test script
-            if 'mmsdose.us' in url:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'same-origin',
-                    'Cache-Control': 'max-age=0',
-                    'Referer': 'https://mmsdose.us/',
-                    'Origin': 'https://mmsdose.us'
-                }
-                time.sleep(random.uniform(1, 2))
-                response = requests.get(url, headers=headers, timeout=15)
-            else:
-                response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                logger.error(f"Error in sample-style video extraction: {snapshot.error}")
+                return []
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            url = snapshot.url
+            buckets = snapshot.buckets
             video_urls = []
 
             # Look for video tags
-            video_tags = soup.find_all('video')
+            video_tags = buckets.nodes['video']
             for video in video_tags:
                 src = video.get('src')
                 if src:
@@ -3432,14 +5443,14 @@ class ContentExtractor:
                         video_urls.append(urljoin(url, src))
 
             # Look for iframe sources (embedded videos)
-            iframes = soup.find_all('iframe')
+            iframes = buckets.nodes['iframe']
             for iframe in iframes:
                 src = iframe.get('src')
                 if src:
                     video_urls.append(urljoin(url, src))
 
             # Look for links that might be video files
-            links = soup.find_all('a', href=True)
+            links = buckets.links
             video_extensions = ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv', '.m4v', '.3gp']
             for link in links:
                 href = link.get('href')
@@ -3449,34 +5460,25 @@ class ContentExtractor:
                         video_urls.append(urljoin(url, href))
 
             # Look for video URLs in script tags (common for embedded videos)
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    # Look for video URLs in script content
-                    video_patterns = [
-                        r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp)',
-                        r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp)[^\s"\']*',
-                        r'["\']([^"\']*\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp))["\']',
-                        r'videoUrl["\']?\s*[:=]\s*["\']([^"\']+)["\']',
-                        r'src["\']?\s*[:=]\s*["\']([^"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv|m4v|3gp))["\']'
-                    ]
-                    for pattern in video_patterns:
-                        matches = re.findall(pattern, script.string, re.IGNORECASE)
-                        for match in matches:
-                            if isinstance(match, tuple):
-                                video_urls.extend(match)
-                            else:
-                                video_urls.append(match)
+            for script in buckets.scripts:
+                # Look for video URLs in script content
+                for pattern in SAMPLE_SCRIPT_VIDEO_PATTERNS:
+                    matches = pattern.findall(script)
+                    for match in matches:
+                        if isinstance(match, tuple):
+                            video_urls.extend(match)
+                        else:
+                            video_urls.append(match)
 
             # Look for data attributes that might contain video URLs
-            elements_with_data = soup.find_all(attrs={'data-video': True})
+            elements_with_data = snapshot.doc.find_all(attrs={'data-video': True})
             for element in elements_with_data:
                 video_url = element.get('data-video')
                 if video_url:
                     video_urls.append(urljoin(url, video_url))
 
             # Look for video URLs in meta tags
-            meta_tags = soup.find_all('meta')
+            meta_tags = snapshot.doc.find_all('meta')
             for meta in meta_tags:
                 content = meta.get('content', '')
                 if any(ext in content.lower() for ext in video_extensions):
@@ -3499,68 +5501,94 @@ class ContentExtractor:
             logger.error(f"Error in sample-style video extraction: {e}")
             return []
 
-    def extract_actual_video_urls_sample_style(self, video_urls):
-        """Extract actual video URLs from embed pages using sample.py method"""
+    def _collect_embed_video_urls(self, video_url, buckets):
+        """Collect direct video URLs from the media buckets of an embed page"""
         actual_video_urls = []
 
-        for video_url in video_urls:
-            # If it's an embed URL, try to extract the actual video
-            if 'embed' in video_url or 'downloaddirect.xyz' in video_url:
-                try:
+        # Look for direct video links in the embed page
+        for link in buckets.links:
+            href = link.get('href')
+            if href and any(ext in href.lower() for ext in ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']):
+                actual_video_urls.append(urljoin(video_url, href))
+
+        # Look for video sources in embed page
+        for video in buckets.nodes['video']:
+            src = video.get('src')
+            if src:
+                actual_video_urls.append(urljoin(video_url, src))
+
+            # Also check for source tags inside video
+            sources = video.find_all('source')
+            for source in sources:
+                src = source.get('src')
+                if src:
+                    actual_video_urls.append(urljoin(video_url, src))
+
+        # Look for video URLs in script tags of embed page
+        for script in buckets.scripts:
+            for pattern in EMBED_SCRIPT_VIDEO_PATTERNS:
+                matches = pattern.findall(script)
+                for match in matches:
+                    if isinstance(match, tuple):
+                        actual_video_urls.extend(match)
+                    else:
+                        actual_video_urls.append(match)
+
+        return actual_video_urls
+
+    def extract_actual_video_urls_sample_style(self, video_urls):
+        """Extract actual video URLs from embed pages using sample.py method (embed pages fetched in parallel)"""
+        host_semaphores = {}
+
+        def resolve_one(video_url):
+            # If it's already a direct video URL, keep it
+            if 'embed' not in video_url and 'downloaddirect.xyz' not in video_url:
+                return [video_url]
+            try:
+                with host_semaphores[url_host(video_url)]:
                     logger.info(f"Checking embed URL: {video_url}")
                     response = self.session.get(video_url)
-                    if response.status_code == 200:
-                        embed_soup = BeautifulSoup(response.text, 'html.parser')
-
-                        # Look for direct video links in the embed page
-                        video_links = embed_soup.find_all('a', href=True)
-                        for link in video_links:
-                            href = link.get('href')
-                            if href and any(ext in href.lower() for ext in ['.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.mkv']):
-                                actual_video_urls.append(urljoin(video_url, href))
-
-                        # Look for video sources in embed page
-                        video_tags = embed_soup.find_all('video')
-                        for video in video_tags:
-                            src = video.get('src')
-                            if src:
-                                actual_video_urls.append(urljoin(video_url, src))
-
-                            # Also check for source tags inside video
-                            sources = video.find_all('source')
-                            for source in sources:
-                                src = source.get('src')
-                                if src:
-                                    actual_video_urls.append(urljoin(video_url, src))
-
-                        # Look for video URLs in script tags of embed page
-                        scripts = embed_soup.find_all('script')
-                        for script in scripts:
-                            if script.string:
-                                video_patterns = [
-                                    r'https?://[^\s"\']+\.(?:mp4|avi|mov|wmv|flv|webm|mkv)',
-                                    r'["\']([^"\']*\.(?:mp4|avi|mov|wmv|flv|webm|mkv))["\']'
-                                ]
-                                for pattern in video_patterns:
-                                    matches = re.findall(pattern, script.string, re.IGNORECASE)
-                                    for match in matches:
-                                        if isinstance(match, tuple):
-                                            actual_video_urls.extend(match)
-                                        else:
-                                            actual_video_urls.append(match)
-                except Exception as e:
-                    logger.error(f"Error processing embed URL {video_url}: {e}")
-            else:
-                # If it's already a direct video URL, keep it
-                actual_video_urls.append(video_url)
+                if response.status_code == 200:
+                    return self._collect_embed_video_urls(video_url, MediaBuckets(make_document(response.text)))
+            except Exception as e:
+                logger.error(f"Error processing embed URL {video_url}: {e}")
+            return []
+
+        # Host semaphores are created before the workers start so threads never race on setdefault
+        for video_url in video_urls:
+            host_semaphores.setdefault(url_host(video_url), threading.BoundedSemaphore(EMBED_RESOLVE_PER_HOST))
+        with ThreadPoolExecutor(max_workers=max(1, min(len(video_urls), IMAGE_DOWNLOAD_CONCURRENCY))) as pool:
+            results = list(pool.map(resolve_one, video_urls))
 
-        return list(set(actual_video_urls))
+        return list(set(itertools.chain.from_iterable(results)))
+
+    async def extract_actual_video_urls_sample_style_async(self, video_urls):
+        """Async variant of extract_actual_video_urls_sample_style"""
+        host_semaphores = {}
+
+        async def resolve_one(video_url):
+            # If it's already a direct video URL, keep it
+            if 'embed' not in video_url and 'downloaddirect.xyz' not in video_url:
+                return [video_url]
+            host_semaphore = host_semaphores.setdefault(url_host(video_url), asyncio.Semaphore(EMBED_RESOLVE_PER_HOST))
+            try:
+                async with host_semaphore:
+                    logger.info(f"Checking embed URL: {video_url}")
+                    snapshot = await self.fetcher.fetch_snapshot(video_url, max_retries=1)
+                if snapshot.ok:
+                    return self._collect_embed_video_urls(video_url, snapshot.buckets)
+            except Exception as e:
+                logger.error(f"Error processing embed URL {video_url}: {e}")
+            return []
+
+        results = await asyncio.gather(*(resolve_one(video_url) for video_url in video_urls))
+        return list(set(itertools.chain.from_iterable(results)))
 
     def is_hotpic_url(self, url):
         """Check if URL is from hotpic.cc domain"""
         if not url:
             return False
-        return 'hotpic.cc' in url.lower()
+        return media_hosts.lookup(url) == 'hotpic'
 
     def get_hotpic_album_info(self, soup, url):
         """Extract album title and other metadata from hotpic.cc"""
@@ -3579,16 +5607,17 @@ class ContentExtractor:
         # Fallback: Use the last part of the URL as the title
         return url.rstrip('/').split('/')[-1] or 'downloaded_media'
 
-    def extract_hotpic_media_links(self, url):
+    def extract_hotpic_media_links(self, url, snapshot=None):
         """Extract all media (images and videos) links from hotpic.cc page"""
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                logger.error(f"Error fetching hotpic media links: {snapshot.error}")
+                return [], "Error"
 
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            url = snapshot.url
+            soup = snapshot.doc
 
             # Get album title
             album_title = self.get_hotpic_album_info(soup, url)
@@ -3596,7 +5625,7 @@ class ContentExtractor:
             media_links = []
 
             # Find all spotlight links which contain the actual media
-            for link in soup.find_all('a', class_='spotlight'):
+            for link in (a for a in snapshot.buckets.links if has_class(a, 'spotlight')):
                 if link.get('href') and not link['href'].startswith('#'):
                     media_url = link['href']
                     if not media_url.startswith(('http://', 'https://')):
@@ -3643,19 +5672,19 @@ class ContentExtractor:
 
     def is_erome_url(self, url):
         """Check if URL is from erome.com"""
-        return 'erome.com' in url.lower()
+        return media_hosts.lookup(url) == 'erome'
 
-    def extract_erome_media_links(self, url):
+    def extract_erome_media_links(self, url, snapshot=None):
         """Extract media links from erome.com pages"""
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
+            if not snapshot.ok:
+                logger.error(f"❌ Error extracting erome media: {snapshot.error}")
+                return [], "No title found"
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            url = snapshot.url
+            soup = snapshot.doc
 
             # Extract title
             title = "No title found"
@@ -3667,7 +5696,8 @@ class ContentExtractor:
             images = []
 
             # First, look for erome-specific image classes
-            img_elements = soup.find_all('img', class_='img-front')
+            buckets = snapshot.buckets
+            img_elements = [img for img in buckets.nodes['img'] if has_class(img, 'img-front')]
             logger.info(f"🔍 Found {len(img_elements)} images with class 'img-front'")
 
             for img in img_elements:
@@ -3696,9 +5726,7 @@ class ContentExtractor:
             # If no images found with img-front class, try all img elements
             if not images:
                 logger.info("🔍 No images found with 'img-front' class, trying all img elements...")
-                all_img_elements = soup.find_all('img')
-
-                for img in all_img_elements:
+                for img in buckets.nodes['img']:
                     # Try data-src first (lazy loading), then src
                     image_url = img.get('data-src') or img.get('src')
                     if image_url:
@@ -3723,8 +5751,7 @@ class ContentExtractor:
 
             # Look for videos
             videos = []
-            video_elements = soup.find_all('video')
-            for video in video_elements:
+            for video in buckets.nodes['video']:
                 src = video.get('src')
                 if src:
                     if src.startswith('/'):
@@ -3739,8 +5766,7 @@ class ContentExtractor:
                     })
 
             # Also look for video sources
-            source_elements = soup.find_all('source')
-            for source in source_elements:
+            for source in buckets.nodes['source']:
                 src = source.get('src')
                 if src:
                     if src.startswith('/'):
@@ -3776,7 +5802,7 @@ class ContentExtractor:
             logger.error(f"❌ Error extracting erome media: {e}")
             return [], "No title found"
 
-    def extract_content_comprehensive(self, url):
+    def extract_content_comprehensive(self, url, snapshot=None):
         """Comprehensive content extraction for various websites (similar to the example script)"""
         try:
             # Add protocol if missing
@@ -3785,53 +5811,17 @@ class ContentExtractor:
 
             logger.info(f"🔍 Starting comprehensive content extraction from: {url}")
 
-            # Special handling for mmsdose.us URLs - use exact headers from test script
-            if 'mmsdose.us' in url:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'same-origin',
-                    'Cache-Control': 'max-age=0',
-                    'Referer': 'https://mmsdose.us/',
-                    'Origin': 'https://mmsdose.us'
-                }
-                time.sleep(random.uniform(1, 2))
-            else:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
+            if snapshot is None:
+                snapshot = self.fetch_page_snapshot(url)
 
-            # Add referer based on domain
-            if 'mmsbee' in url:
-                headers['Referer'] = 'https://mmsbee42.com/'
-            elif 'imagetwist' in url:
-                headers['Referer'] = 'https://imagetwist.com/'
-            elif 'vidoza' in url:
-                headers['Referer'] = 'https://vidoza.net/'
-            elif 'streamtape' in url:
-                headers['Referer'] = 'https://streamtape.com/'
-
-            # Use requests.get for mmsdose.us URLs, session.get for others
-            if 'mmsdose.us' in url:
-                response = requests.get(url, headers=headers, timeout=15)
-            else:
-                response = self.session.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            # The comprehensive pass is used as a fallback several times per job; compute it once per snapshot
+            if 'comprehensive' in snapshot.derived:
+                return snapshot.derived['comprehensive']
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if not snapshot.ok:
+                raise Exception(snapshot.error)
+
+            soup = snapshot.soup
 
             # Extract title using multiple methods
             title = "No title found"
@@ -3962,8 +5952,8 @@ class ContentExtractor:
                             continue  # Skip ALL thumbnail sizes
 
                         # Remove WordPress size suffixes to get ORIGINAL image
-                        original_url = re.sub(r'-\d+x\d+(?=\.[a-z]+)', '', img_url)
-                        original_url = re.sub(r'-scaled(?=\.[a-z]+)', '', original_url)
+                        original_url = WORDPRESS_SIZE_SUFFIX_RE.sub('', img_url)
+                        original_url = WORDPRESS_SCALED_SUFFIX_RE.sub('', original_url)
 
                         # ONLY pass if it's a legitimate original image
                         if original_url == img_url or not any(size in img_url for size in ['x', '-']):
@@ -4022,20 +6012,9 @@ class ContentExtractor:
             # Also look for video URLs in text content
             text_content = content_area.get_text()
 
-            # Look for video URLs in text using regex
-            video_patterns = [
-                r'https?://(?:www\.)?vidoza\.net/[a-zA-Z0-9]+\.html',
-                r'https?://(?:www\.)?streamtape\.(?:to|com)/(?:v|e)/[a-zA-Z0-9]+(?:/[^/\s]*)?(?:\.html)?',
-                r'https?://(?:www\.)?youtube\.com/watch\?v=[a-zA-Z0-9_-]+',
-                r'https?://(?:www\.)?youtu\.be/[a-zA-Z0-9_-]+',
-                r'https?://(?:www\.)?vimeo\.com/[0-9]+',
-                r'https?://(?:www\.)?dailymotion\.com/video/[a-zA-Z0-9]+',
-                r'https?://(?:www\.)?redtube\.com/[0-9]+',
-                r'https?://(?:www\.)?pornhub\.com/view_video\.php\?viewkey=[a-zA-Z0-9]+'
-            ]
-
-            for pattern in video_patterns:
-                matches = re.findall(pattern, text_content)
+            # Look for video URLs in text using regex (one scan for all hosts)
+            host_matches = COMPREHENSIVE_VIDEO_HOST_PATTERNS.findall(text_content)
+            for pattern, matches in zip(COMPREHENSIVE_VIDEO_HOST_PATTERNS.patterns, host_matches):
                 print(f"🔍 COMPREHENSIVE DEBUG: Pattern '{pattern}' found {len(matches)} matches: {matches}")
                 for match in matches:
                     if 'vidoza.net' in match:
@@ -4063,6 +6042,7 @@ class ContentExtractor:
             }
 
             logger.info(f"✅ Comprehensive extraction completed for {url}")
+            snapshot.derived['comprehensive'] = result
             return result
 
         except Exception as e:
@@ -4095,7 +6075,7 @@ class ContentExtractor:
             response = self.session.get(page_url, headers=headers, timeout=15)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_document(response.text)
 
             # Find the direct image URL on the hosting page
             img_tag = soup.find('img', class_='pic')
@@ -4148,6 +6128,70 @@ class ContentExtractor:
 # Initialize content extractor
 content_extractor = ContentExtractor()
 
+class EmbedResolver:
+    """Resolves video host pages to direct media URLs ahead of the downloads, a few pages per host at a time"""
+
+    def __init__(self, extractor, per_host=EMBED_RESOLVE_PER_HOST, ttl=EMBED_RESOLVE_TTL, max_entries=500):
+        self.resolvers = {
+            'Vidoza': (extractor.is_vidoza_url, extractor.extract_vidoza_video_url_async),
+            'Streamtape': (extractor.is_streamtape_url, extractor.extract_streamtape_video_url_async),
+            'Stream2z': (extractor.is_stream2z_url, extractor.extract_stream2z_video_url_async),
+        }
+        self.per_host = per_host
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.tasks = OrderedDict()  # (kind, url) -> (started_at, task)
+        self.host_semaphores = {}
+
+    async def _resolve(self, kind, url):
+        host_semaphore = self.host_semaphores.setdefault(url_host(url), asyncio.Semaphore(self.per_host))
+        async with host_semaphore:
+            return await self.resolvers[kind][1](url)
+
+    def _task(self, kind, url):
+        key = (kind, url)
+        entry = self.tasks.get(key)
+        if entry:
+            started_at, task = entry
+            failed = task.done() and (task.cancelled() or task.exception() is not None or task.result() is None)
+            # Resolved links carry expiring tokens (Streamtape's last about a minute), and failures are worth retrying
+            links = [url] + ([task.result()] if task.done() and not failed and isinstance(task.result(), str) else [])
+            if not failed and time.time() - started_at < expiring_link_ttl(links, self.ttl):
+                return task
+        task = asyncio.ensure_future(self._resolve(kind, url))
+        self.tasks[key] = (time.time(), task)
+        self.tasks.move_to_end(key)
+        while len(self.tasks) > self.max_entries:
+            self.tasks.popitem(last=False)
+        return task
+
+    def prefetch(self, kind, urls):
+        """Start resolving every host page of a kind in the background"""
+        if kind not in self.resolvers:
+            return 0
+        is_host_url = self.resolvers[kind][0]
+        started = 0
+        for url in urls:
+            # Only host pages: direct media links (hotpic, erome...) must not be fetched here
+            if is_host_url(url):
+                self._task(kind, url)
+                started += 1
+        if started:
+            logger.info(f"🔗 Resolving {started} {kind} page(s) in the background")
+        return started
+
+    async def resolve(self, kind, url):
+        """Direct media URL of a host page, reusing a prefetch when one is running or fresh"""
+        try:
+            return await asyncio.shield(self._task(kind, url))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error resolving {kind} page {url}: {e}")
+            return None
+
+embed_resolver = EmbedResolver(content_extractor)
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Start command handler"""
     welcome_message = """🤖 **Bot Started!**
@@ -4266,7 +6310,8 @@ async def restart_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reset bot state and clear any pending operations"""
     try:
         # Clear all user data and state
-        context.user_data.clear()
+        clear_user_state(context.user_data)
+        cancelled_jobs = processing_queue.cancel_user_jobs(update.effective_user.id)
 
         # Reset any global state variables
         if hasattr(context, 'bot_data'):
@@ -4297,6 +6342,7 @@ async def restart_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "✅ All pending operations cleared\n"
             "✅ Type selection state reset\n"
             "✅ Video processing state cleared\n"
+            f"✅ {cancelled_jobs} queued link(s) cancelled\n"
             "✅ Ready to start fresh\n\n"
             "**You can now:**\n"
             "• Send a new URL to process\n"
@@ -4345,6 +6391,10 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             status_info.append("✅ **Bot is ready** - No pending operations")
 
+        pending_jobs = processing_queue.pending_for_user(update.effective_user.id)
+        if pending_jobs:
+            status_info.append(f"📥 **Queued links:** {pending_jobs}")
+
         # Check authentication status
         global telegram_client
 
@@ -4387,6 +6437,244 @@ async def status_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Add the rest of your functions here (process_url_complete, etc.)
 # Copy from o_backup.py
 
+# --- Site extractor registry ---
+
+class SiteExtractor:
+    """A site module: the page hosts it handles and the extraction capabilities to run on its pages"""
+
+    def __init__(self, name, hosts, capabilities):
+        self.name = name
+        self.hosts = hosts
+        self.capabilities = frozenset(capabilities)
+
+# Capabilities: 'title', 'images' (ImageTwist with sample/comprehensive fallbacks),
+# 'videos' (Vidoza/Streamtape/Stream2z/Luluvid links with fallbacks), 'hotpic', 'erome'
+GENERIC_SITE = SiteExtractor('generic', [], ('title', 'images', 'videos'))
+SITE_EXTRACTORS = [
+    SiteExtractor('hotpic', ['hotpic.cc'], ('title', 'hotpic')),
+    SiteExtractor('erome', ['erome.com'], ('title', 'erome')),
+]
+
+site_extractors = HostRegistry()
+for site in SITE_EXTRACTORS:
+    site_extractors.register(site.hosts, site)
+
+extraction_executor = ThreadPoolExecutor(max_workers=EXTRACTION_THREADS, thread_name_prefix='extractor')
+
+def run_extractor(func, *args):
+    """Run a sync extractor on the bounded extraction executor"""
+    return asyncio.get_running_loop().run_in_executor(extraction_executor, func, *args)
+
+async def first_success(label, attempts, is_success, default=None, hedge_delay=None):
+    """Run a fallback chain: each attempt starts when the previous one fails or is still running
+    after hedge_delay; the first successful result wins and the attempts still running are abandoned.
+
+    Abandoning only cancels the awaiting task: an attempt running in a thread (see run_extractor)
+    runs to completion on the bounded extraction executor and its result is dropped."""
+    hedge_delay = EXTRACTION_HEDGE_DELAY if hedge_delay is None else hedge_delay
+    running = {}
+    next_index = 0
+    primary_result = None
+
+    def launch():
+        nonlocal next_index
+        name, factory = attempts[next_index]
+        running[asyncio.ensure_future(factory())] = (next_index, name)
+        next_index += 1
+
+    launch()
+    try:
+        while running:
+            timeout = hedge_delay if next_index < len(attempts) else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info(f"⏱️ {label}: still waiting after {hedge_delay}s, hedging with {attempts[next_index][0]}")
+                launch()
+                continue
+
+            # Earlier (preferred) attempts win ties
+            for task in sorted(done, key=lambda t: running[t][0]):
+                index, name = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ {label}: {name} failed: {e}")
+                    result = None
+                if index == 0:
+                    primary_result = result
+                if is_success(result):
+                    if index:
+                        logger.info(f"🏁 {label}: {name} fallback succeeded")
+                    return result
+                logger.info(f"{label}: {name} found nothing")
+                if next_index < len(attempts):
+                    launch()
+    finally:
+        for task in running:
+            task.cancel()
+
+    return primary_result if primary_result is not None else default
+
+def has_items(result):
+    """True for a non-empty result list (extractors return error strings on failure)"""
+    return bool(result) and not isinstance(result, str)
+
+async def extract_page_content(url, snapshot):
+    """Run the extractors the page's site needs and return title, images and per-host video lists"""
+    site = site_extractors.lookup(url, GENERIC_SITE)
+    logger.info(f"🧭 {url_host(url)} handled by the {site.name} extractor ({', '.join(sorted(site.capabilities))})")
+    started = time.time()
+
+    def on_page(extractor):
+        # Extractors parse the shared snapshot; run them off the event loop, on the bounded executor
+        return lambda: run_extractor(extractor, url, snapshot)
+
+    comprehensive_task = None
+
+    async def comprehensive():
+        # Several chains fall back to the comprehensive pass; they share one run of it
+        nonlocal comprehensive_task
+        if comprehensive_task is None:
+            comprehensive_task = asyncio.ensure_future(
+                run_extractor(content_extractor.extract_content_comprehensive, url, snapshot)
+            )
+        return await asyncio.shield(comprehensive_task) or {}
+
+    async def title_chain():
+        # Original method first, then sample style, then comprehensive
+        async def from_comprehensive():
+            result = await comprehensive()
+            title = result.get('title')
+            return title if title != "Error extracting content" else None
+
+        title = await first_success("Title extraction", [
+            ('original', on_page(content_extractor.extract_title)),
+            ('sample style', on_page(content_extractor.extract_title_sample_style)),
+            ('comprehensive', from_comprehensive),
+        ], lambda title: bool(title) and title != "No title found" and not title.startswith("Error extracting"),
+            default="No title found")
+        return content_extractor.clean_title(title)
+
+    async def image_chain():
+        # ImageTwist first, then sample style, then comprehensive
+        async def from_comprehensive():
+            result = await comprehensive()
+            # Convert comprehensive images to our format
+            return [{'url': img['url'], 'alt': img.get('alt', ''), 'type': 'comprehensive'} for img in result.get('images') or []]
+
+        images = await first_success("Image extraction", [
+            ('original', on_page(content_extractor.extract_imagetwist_urls)),
+            ('sample style', on_page(content_extractor.extract_image_sample_style)),
+            ('comprehensive', from_comprehensive),
+        ], has_items, default=[])
+        logger.info(f"🔍 Image extraction found: {len(images) if not isinstance(images, str) else 'Error'}")
+        return images
+
+    async def video_chain():
+        # Vidoza/Streamtape links first, then sample-style embeds, then comprehensive
+        async def from_host_links():
+            vidoza_urls, streamtape_urls = await asyncio.gather(
+                run_extractor(content_extractor.extract_vidoza_urls, url, snapshot),
+                run_extractor(content_extractor.extract_streamtape_urls, url, snapshot)
+            )
+            # Filter URLs to ensure each type only contains its own URLs
+            if has_items(vidoza_urls):
+                vidoza_urls = [v for v in vidoza_urls if content_extractor.is_vidoza_url(v['url'])]
+            if has_items(streamtape_urls):
+                streamtape_urls = [v for v in streamtape_urls if content_extractor.is_streamtape_url(v['url'])]
+            return vidoza_urls, streamtape_urls
+
+        async def from_sample_style():
+            sample_videos = await run_extractor(content_extractor.extract_video_sample_style, url, snapshot)
+            if not sample_videos:
+                return None
+            # Process sample videos to extract actual video URLs
+            actual_video_urls = await content_extractor.extract_actual_video_urls_sample_style_async([v['url'] for v in sample_videos])
+            return [{'url': video_url, 'text': '', 'title': '', 'type': 'sample_style'} for video_url in actual_video_urls], []
+
+        async def from_comprehensive():
+            result = await comprehensive()
+            return (
+                [{'url': link, 'text': '', 'title': '', 'type': 'comprehensive'} for link in result.get('vidoza_links') or []],
+                [{'url': link, 'text': '', 'title': '', 'type': 'comprehensive'} for link in result.get('streamtape_links') or []]
+            )
+
+        return await first_success("Video extraction", [
+            ('original', from_host_links),
+            ('sample style', from_sample_style),
+            ('comprehensive', from_comprehensive),
+        ], lambda result: bool(result) and (has_items(result[0]) or has_items(result[1])), default=([], []))
+
+    async def stream2z_links():
+        stream2z_urls = await run_extractor(content_extractor.extract_stream2z_urls, url, snapshot)
+        if has_items(stream2z_urls):
+            stream2z_urls = [v for v in stream2z_urls if content_extractor.is_stream2z_url(v['url'])]
+        return stream2z_urls
+
+    async def luluvid_links():
+        luluvid_urls = await run_extractor(content_extractor.extract_luluvid_urls, url, snapshot)
+        if has_items(luluvid_urls):
+            return [v for v in luluvid_urls if content_extractor.is_luluvid_url(v['url'])]
+        return []
+
+    async def album_media(capability, extract_media_links):
+        media_links, _ = await run_extractor(extract_media_links, url, snapshot)
+        return capability, media_links or []
+
+    async def nothing(value):
+        return value
+
+    # Independent extractors run side by side; the slowest path bounds the total
+    has_videos = 'videos' in site.capabilities
+    albums = [album_media(capability, extract_media_links)
+              for capability, extract_media_links in (('hotpic', content_extractor.extract_hotpic_media_links),
+                                                      ('erome', content_extractor.extract_erome_media_links))
+              if capability in site.capabilities]
+    clean_title, imagetwist_urls, (vidoza_urls, streamtape_urls), stream2z_urls, luluvid_urls, *album_results = await asyncio.gather(
+        title_chain() if 'title' in site.capabilities else nothing("No title found"),
+        image_chain() if 'images' in site.capabilities else nothing([]),
+        video_chain() if has_videos else nothing(([], [])),
+        stream2z_links() if has_videos else nothing([]),
+        luluvid_links() if has_videos else nothing([]),
+        *albums
+    )
+
+    # Album sites: their images and videos join the standard lists
+    for capability, media_links in album_results:
+        if isinstance(imagetwist_urls, str):
+            imagetwist_urls = []
+        if isinstance(vidoza_urls, str):
+            vidoza_urls = []
+        album_images = []
+        for media in media_links:
+            if media['type'] == 'video':
+                vidoza_urls.append({
+                    'url': media['url'],
+                    'text': media['title'],
+                    'title': media['title'],
+                    'type': capability
+                })
+            else:  # image
+                album_images.append({
+                    'url': media['url'],
+                    'alt': media['title'],
+                    'type': capability
+                })
+        if album_images:
+            logger.info(f"🔍 Adding {len(album_images)} {capability} images to existing images")
+            imagetwist_urls.extend(album_images)
+
+    logger.info(f"🔍 Extraction finished in {time.time() - started:.2f}s")
+    return {
+        'url': url,
+        'title': clean_title,
+        'imagetwist_urls': imagetwist_urls,
+        'vidoza_urls': vidoza_urls,
+        'streamtape_urls': streamtape_urls,
+        'stream2z_urls': stream2z_urls,
+        'luluvid_urls': luluvid_urls
+    }
+
 async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Complete URL processing: extract everything first, then post to channel, then create topic and post everything"""
     # Check memory usage at start
@@ -4400,171 +6688,91 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
     message_text = update.message.text
 
     # List to keep track of bot messages sent in the chat for later deletion
-    bot_messages_to_delete = []
-
-    # URL regex pattern
-    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+|(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}'
-
-    urls = re.findall(url_pattern, message_text)
-
-    if not urls:
-        await update.message.reply_text(
-            "❌ No valid URL found in your message. Please send a valid URL.",
-            parse_mode='Markdown'
-        )
-        return False
-
-    for url in urls:
-        # Step 1: Extract and store everything first
-        extract_msg = await update.message.reply_text("🔍 Extracting content (title, images, videos)...")
-        bot_messages_to_delete.append(extract_msg.message_id)
-
-        # Extract title - try original method first, then sample style as fallback, then comprehensive
-        title = content_extractor.extract_title(url)
-        if not title or title == "No title found":
-            logger.info("Original title extraction failed, trying sample style method...")
-            title = content_extractor.extract_title_sample_style(url)
-        if not title or title == "No title found":
-            logger.info("Sample style title extraction failed, trying comprehensive method...")
-            comprehensive_result = content_extractor.extract_content_comprehensive(url)
-            if comprehensive_result and comprehensive_result['title'] != "Error extracting content":
-                title = comprehensive_result['title']
-        clean_title = content_extractor.clean_title(title)
-
-        # Store clean_title in context for later use
-        context.user_data['clean_title'] = clean_title
-
-        # Extract ImageTwist images - try original method first, then sample style as fallback, then comprehensive
-        imagetwist_urls = content_extractor.extract_imagetwist_urls(url)
-        logger.info(f"🔍 Original image extraction found: {len(imagetwist_urls) if not isinstance(imagetwist_urls, str) else 'Error'}")
-
-        if not imagetwist_urls or isinstance(imagetwist_urls, str):
-            logger.info("Original image extraction failed, trying sample style method...")
-            imagetwist_urls = content_extractor.extract_image_sample_style(url)
-            logger.info(f"🔍 Sample style extraction found: {len(imagetwist_urls) if not isinstance(imagetwist_urls, str) else 'Error'}")
-
-        if not imagetwist_urls or isinstance(imagetwist_urls, str):
-            logger.info("Sample style image extraction failed, trying comprehensive method...")
-            comprehensive_result = content_extractor.extract_content_comprehensive(url)
-            if comprehensive_result and comprehensive_result['images']:
-                # Convert comprehensive images to our format
-                imagetwist_urls = []
-                for img in comprehensive_result['images']:
-                    imagetwist_urls.append({
-                        'url': img['url'],
-                        'alt': img.get('alt', ''),
-                        'type': 'comprehensive'
-                    })
-                logger.info(f"🔍 Comprehensive extraction found: {len(imagetwist_urls)} images")
-        else:
-            logger.info(f"🔍 Using original extraction method - found {len(imagetwist_urls)} images")
-
-        # Extract video URLs - try original methods first, then sample style as fallback
-        vidoza_urls = content_extractor.extract_vidoza_urls(url)
-        streamtape_urls = content_extractor.extract_streamtape_urls(url)
-        stream2z_urls = content_extractor.extract_stream2z_urls(url)
+    bot_messages_to_delete = []
 
-        # Filter URLs to ensure each type only contains its own URLs
-        if vidoza_urls and not isinstance(vidoza_urls, str):
-            vidoza_urls = [v for v in vidoza_urls if content_extractor.is_vidoza_url(v['url'])]
+    # URL regex pattern
+    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+|(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}'
 
-        if streamtape_urls and not isinstance(streamtape_urls, str):
-            streamtape_urls = [v for v in streamtape_urls if content_extractor.is_streamtape_url(v['url'])]
+    urls = re.findall(url_pattern, message_text)
 
-        if stream2z_urls and not isinstance(stream2z_urls, str):
-            stream2z_urls = [v for v in stream2z_urls if content_extractor.is_stream2z_url(v['url'])]
+    if not urls:
+        await update.message.reply_text(
+            "❌ No valid URL found in your message. Please send a valid URL.",
+            parse_mode='Markdown'
+        )
+        return False
 
-        # Extract luluvid URLs from the page content
-        luluvid_urls = content_extractor.extract_luluvid_urls(url)
-        if luluvid_urls and not isinstance(luluvid_urls, str):
-            luluvid_urls = [v for v in luluvid_urls if content_extractor.is_luluvid_url(v['url'])]
+    for url_index, url in enumerate(urls, 1):
+        # Unique prefix for this job's temp files
+        job_tag = f"{update.effective_chat.id}_{update.message.message_id}_{url_index}"
+        source_url = url
+
+        # Links already posted to the channel are not extracted again (a restarted job still resumes)
+        resuming = job_checkpoints.get(job_tag, 'extracted') is not None
+        posted = None if resuming else posted_index.lookup_page(url)
+        if posted:
+            await notify_already_posted(update, context, posted, bot_messages_to_delete)
+            continue
+
+        # Downloaded media for this job, shared by the channel and group posts
+        previous_cache = context.user_data.pop('media_cache', None)
+        if previous_cache:
+            previous_cache.clear()
+        media_cache = JobMediaCache(job_tag)
+        context.user_data['media_cache'] = media_cache
+        media_consumers = ('channel', 'group') if GROUP_ID else ('channel',)
+
+        # Step 1: Extract and store everything first (a restarted job reuses its saved extraction)
+        extracted = job_checkpoints.get(job_tag, 'extracted')
+        if extracted:
+            logger.info(f"♻️ Resuming job {job_tag} from its checkpoints")
         else:
-            luluvid_urls = []
+            # A link extracted a few minutes ago is not fetched and parsed again
+            extracted = extraction_cache.get('page', url)
+            if extracted:
+                logger.info(f"⚡ Using cached extraction for {url}")
+                job_checkpoints.mark(job_tag, 'extracted', value=extracted)
+        if not extracted:
+            extract_msg = await update.message.reply_text("🔍 Extracting content (title, images, videos)...")
+            bot_messages_to_delete.append(extract_msg.message_id)
 
-        # Extract hotpic media if it's a hotpic URL
-        hotpic_media = []
-        if content_extractor.is_hotpic_url(url):
-            media_links, album_title = content_extractor.extract_hotpic_media_links(url)
-            if media_links:
-                # Convert hotpic media to our standard format
-                for media in media_links:
-                    if media['type'] == 'video':
-                        vidoza_urls.append({
-                            'url': media['url'],
-                            'text': media['title'],
-                            'title': media['title'],
-                            'type': 'hotpic'
-                        })
-                    else:  # image
-                        hotpic_media.append(media)
+            # Fetch and parse the page once; every extractor below reads from this snapshot
+            snapshot = await content_extractor.fetch_page_snapshot_async(url)
+            # Extract (and later record) the page the redirects ended on, not just the link as sent
+            url = snapshot.final_url or snapshot.url
 
-        # Add hotpic images to the existing image list
-        if hotpic_media:
-            logger.info(f"🔍 Adding {len(hotpic_media)} hotpic images to existing images")
-            for media in hotpic_media:
-                imagetwist_urls.append({
-                    'url': media['url'],
-                    'alt': media['title'],
-                    'type': 'hotpic'
-                })
+            # The link may redirect to a page that was already posted
+            posted = posted_index.lookup_redirected_page(source_url, url)
+            if posted:
+                await notify_already_posted(update, context, posted, bot_messages_to_delete)
+                continue
 
-        # Extract erome media if it's an erome URL
-        erome_media = []
-        if content_extractor.is_erome_url(url):
-            media_links, erome_title = content_extractor.extract_erome_media_links(url)
-            if media_links:
-                # Convert erome media to our standard format
-                for media in media_links:
-                    if media['type'] == 'video':
-                        vidoza_urls.append({
-                            'url': media['url'],
-                            'text': media['title'],
-                            'title': media['title'],
-                            'type': 'erome'
-                        })
-                    else:  # image
-                        erome_media.append(media)
+            extracted = await extract_page_content(url, snapshot)
+            job_checkpoints.mark(job_tag, 'extracted', value=extracted)
+            if snapshot.ok:
+                extraction_cache.put('page', source_url, extracted)
 
-        # Add erome images to the existing image list
-        if erome_media:
-            logger.info(f"🔍 Adding {len(erome_media)} erome images to existing images")
-            for media in erome_media:
-                imagetwist_urls.append({
-                    'url': media['url'],
-                    'alt': media['title'],
-                    'type': 'erome'
-                })
+        url = extracted['url']
+        clean_title = extracted['title']
+        imagetwist_urls = extracted['imagetwist_urls']
+        vidoza_urls = extracted['vidoza_urls']
+        streamtape_urls = extracted['streamtape_urls']
+        stream2z_urls = extracted['stream2z_urls']
+        luluvid_urls = extracted['luluvid_urls']
 
-        # If no videos found with original methods, try sample style, then comprehensive
-        if (not vidoza_urls or isinstance(vidoza_urls, str)) and (not streamtape_urls or isinstance(streamtape_urls, str)):
-            logger.info("Original video extraction failed, trying sample style method...")
-            sample_videos = content_extractor.extract_video_sample_style(url)
-            if sample_videos:
-                # Process sample videos to extract actual video URLs
-                actual_video_urls = content_extractor.extract_actual_video_urls_sample_style([v['url'] for v in sample_videos])
-                if actual_video_urls:
-                    # Convert to our format
-                    vidoza_urls = [{'url': url, 'text': '', 'title': '', 'type': 'sample_style'} for url in actual_video_urls]
-                    streamtape_urls = []  # Clear streamtape since we found videos with sample method
-
-        # If still no videos, try comprehensive method
-        if (not vidoza_urls or isinstance(vidoza_urls, str)) and (not streamtape_urls or isinstance(streamtape_urls, str)):
-            logger.info("Sample style video extraction failed, trying comprehensive method...")
-            comprehensive_result = content_extractor.extract_content_comprehensive(url)
-            if comprehensive_result:
-                # Add Vidoza links from comprehensive extraction
-                if comprehensive_result['vidoza_links']:
-                    vidoza_urls = [{'url': url, 'text': '', 'title': '', 'type': 'comprehensive'} for url in comprehensive_result['vidoza_links']]
-                    logger.info(f"🔍 Comprehensive extraction found {len(vidoza_urls)} Vidoza videos")
-
-                # Add Streamtape links from comprehensive extraction
-                if comprehensive_result['streamtape_links']:
-                    streamtape_urls = [{'url': url, 'text': '', 'title': '', 'type': 'comprehensive'} for url in comprehensive_result['streamtape_links']]
-                    logger.info(f"🔍 Comprehensive extraction found {len(streamtape_urls)} Streamtape videos")
+        # Start turning host pages into direct links while the channel post and type selection happen
+        for kind, video_items in (('Vidoza', vidoza_urls), ('Streamtape', streamtape_urls), ('Stream2z', stream2z_urls)):
+            if has_items(video_items):
+                embed_resolver.prefetch(kind, [item['url'] for item in video_items])
+
+        # Store clean_title in context for later use
+        context.user_data['clean_title'] = clean_title
+        context.user_data['job_key'] = job_tag
 
         # Store all extracted data for later processing
         extracted_data = {
             'url': url,
+            'source_url': source_url,
             'title': clean_title,
             'imagetwist_urls': imagetwist_urls if not isinstance(imagetwist_urls, str) else [],
             'vidoza_urls': vidoza_urls if not isinstance(vidoza_urls, str) else [],
@@ -4579,13 +6787,14 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
         bot_messages_to_delete.append(channel_msg.message_id)
 
         # Post title to channel
-        if clean_title and clean_title != "No title found":
+        if clean_title and clean_title != "No title found" and not job_checkpoints.get(job_tag, 'channel_title'):
             try:
-                await context.bot.send_message(
+                title_message = await context.bot.send_message(
                     chat_id=CHANNEL_ID,
                     text=clean_title,
                     parse_mode=None
                 )
+                job_checkpoints.mark(job_tag, 'channel_title', value=title_message.message_id)
                 logger.info(f"📤 Title sent to channel: {clean_title}")
             except Exception as e:
                 logger.error(f"❌ Error sending title to channel: {e}")
@@ -4597,94 +6806,69 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
         if imagetwist_urls and not isinstance(imagetwist_urls, str):
             logger.info(f"🔍 Processing {len(imagetwist_urls)} images using batch upload (works for ALL domains)...")
 
-            # Download all images first
-            downloaded_images = []
-            for i, img_data in enumerate(imagetwist_urls, 1):
-                try:
-                    # Handle both ImageTwist and sample-style images
-                    image_url = img_data['url']
-                    image_alt = img_data.get('alt', 'unknown')
-                    image_type = img_data.get('type', 'imagetwist')
-
-                    logger.info(f"📥 Downloading image {i}/{len(imagetwist_urls)} from: {image_url}")
-                    file_path = await content_extractor.download_image_async(
-                        image_url,
-                        f"image_{i}_{image_alt}.jpg",
-                        referrer_url=url
-                    )
-
-                    if file_path and os.path.exists(file_path):
-                        file_size = os.path.getsize(file_path)
-                        if file_size > 1000:
-                            downloaded_images.append({
-                                'file_path': file_path,
-                                'index': i,
-                                'file_size': file_size
-                            })
-                            logger.info(f"✅ Image {i} downloaded successfully ({file_size} bytes)")
-                        else:
-                            logger.warning(f"⚠️ Image {i} file too small ({file_size} bytes) - likely corrupted")
-                    else:
-                        logger.warning(f"⚠️ Image {i} download failed - check logs above for HTTP error details")
-                except Exception as e:
-                    logger.error(f"❌ Error downloading image {i}: {e}")
-
-            # Upload images in batches of 5
-            batch_size = 5
-            total_batches = (len(downloaded_images) + batch_size - 1) // batch_size
-
-            logger.info(f"📤 Starting batch upload: {len(downloaded_images)} images in {total_batches} batches of {batch_size}")
-
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(downloaded_images))
-                batch_images = downloaded_images[start_idx:end_idx]
-
-                logger.info(f"📤 Batch {batch_num + 1}/{total_batches}: Uploading images {start_idx + 1}-{end_idx}")
-
-                # Upload batch with retry logic
-                max_retries = 3
-                retry_delay = 5
-
-                for retry in range(max_retries):
-                    try:
-                        # Upload all images in this batch
-                        for img_data in batch_images:
-                            with open(img_data['file_path'], 'rb') as img:
-                                await context.bot.send_photo(
-                                    chat_id=CHANNEL_ID,
-                                    photo=img
-                                )
-                                successful_image_downloads += 1
-                                logger.info(f"📤 Image {img_data['index']} sent to channel ({img_data['file_size']} bytes)")
-
-                        logger.info(f"✅ Batch {batch_num + 1}/{total_batches} completed successfully!")
-                        break  # Success, exit retry loop
-
-                    except Exception as upload_error:
-                        error_msg = str(upload_error)
-                        if "429" in error_msg or "Flood control" in error_msg:
-                            if retry < max_retries - 1:
-                                logger.warning(f"⚠️ Flood control hit for batch {batch_num + 1}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                await asyncio.sleep(retry_delay)
-                                retry_delay *= 2  # Exponential backoff
-                        else:
-                                logger.error(f"❌ Failed to upload batch {batch_num + 1} after {max_retries} retries due to flood control")
-                    else:
-                            logger.error(f"❌ Error uploading batch {batch_num + 1}: {upload_error}")
-                            break
-
-                # Wait 3 seconds between batches (except after the last batch)
-                if batch_num < total_batches - 1:
-                    logger.info(f"⏳ Waiting 3s before next batch...")
-                    await asyncio.sleep(3)
+            # Images posted before a restart are only downloaded again if the group still needs them
+            channel_posted = job_checkpoints.items(job_tag, 'channel_image')
+            group_posted = job_checkpoints.items(job_tag, 'group_image')
+            image_consumers = {}
+            duplicate_images = 0
+            for index in range(1, len(imagetwist_urls) + 1):
+                # Images some earlier link already put in the channel are skipped entirely
+                if str(index) not in channel_posted and posted_index.lookup_media(url=imagetwist_urls[index - 1]['url']):
+                    duplicate_images += 1
+                    continue
+                consumers = tuple(c for c in media_consumers
+                                  if str(index) not in (channel_posted if c == 'channel' else group_posted))
+                if consumers:
+                    image_consumers[index] = consumers
+            pending_indices = list(image_consumers)
+            if channel_posted:
+                logger.info(f"♻️ {len(channel_posted)} image(s) already posted to channel, {len(pending_indices)} still needed")
+
+            # Download all images concurrently (results keep the original order for posting)
+            download_results = await content_extractor.download_images_concurrently(
+                [imagetwist_urls[index - 1] for index in pending_indices],
+                referrer_url=url,
+                prefix=f"image_{job_tag}"
+            )
+            seen_hashes = set()
+            for result in download_results:
+                result['index'] = pending_indices[result['index'] - 1]
+                if result['file_path']:
+                    # Same picture under a different URL (or twice on this page)
+                    content_hash = file_content_hash(result['file_path'])
+                    if str(result['index']) not in channel_posted and (
+                            content_hash in seen_hashes or posted_index.lookup_media(content_hash=content_hash)):
+                        duplicate_images += 1
+                        os.remove(result['file_path'])
+                        continue
+                    seen_hashes.add(content_hash)
+                    media_cache.add(result['index'], result['file_path'], image_consumers[result['index']],
+                                    url=result['url'], index=result['index'], file_size=result['file_size'],
+                                    content_hash=content_hash)
+
+            failed_images = [r for r in download_results if r['error']]
+            if failed_images:
+                failed_msg = await update.message.reply_text(format_image_failures(failed_images, len(download_results)))
+                bot_messages_to_delete.append(failed_msg.message_id)
+            if duplicate_images:
+                logger.info(f"♻️ Skipped {duplicate_images} image(s) already posted to the channel")
+                duplicate_msg = await update.message.reply_text(f"♻️ Skipped {duplicate_images} image(s) already posted to the channel")
+                bot_messages_to_delete.append(duplicate_msg.message_id)
+
+            def on_channel_album(album):
+                job_checkpoints.mark_items(job_tag, 'channel_image', [img['key'] for img in album])
+                for img in album:
+                    reference = media_registry.get(img['file_path']) or {}
+                    posted_index.record_media([img['url']], img['content_hash'], reference.get('chat_id'), reference.get('message_id'))
+
+            successful_image_downloads = len(channel_posted) + await post_images_to_channel(
+                context.bot,
+                media_cache.items_for('channel'),
+                on_posted=on_channel_album
+            )
 
-            # Clean up downloaded files
-            for img_data in downloaded_images:
-                try:
-                    os.remove(img_data['file_path'])
-                except:
-                    pass
+            # Files stay on disk until the group topic has used them too
+            media_cache.release_consumer('channel')
 
             logger.info(f"✅ Batch upload completed! {successful_image_downloads}/{len(imagetwist_urls)} images sent successfully!")
 
@@ -4747,6 +6931,11 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
             context.user_data['selection_message_id'] = selection_msg.message_id
             context.user_data['selection_timestamp'] = time.time()  # Add timestamp for timeout
 
+            # Save the menu so the selection still works after a restart
+            job_checkpoints.mark(job_tag, 'selection_menu', user_id=update.effective_user.id, value={
+                key: context.user_data.get(key) for key in SELECTION_STATE_KEYS
+            })
+
             return True  # Stop here and wait for user selection
 
         # If no videos, proceed to create topic and post everything
@@ -4757,55 +6946,46 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
                 bot_messages_to_delete.append(topic_msg.message_id)
 
                 try:
-                    # Create topic
-                    logger.info(f"🎯 Creating group topic with title: {clean_title}")
-                    topic_id = await create_group_topic(clean_title, GROUP_ID)
+                    # Create topic (once; a restarted job reuses the topic it already created)
+                    topic_id = job_checkpoints.get(job_tag, 'topic')
+                    if not topic_id:
+                        logger.info(f"🎯 Creating group topic with title: {clean_title}")
+                        topic_id = await create_group_topic(clean_title, GROUP_ID)
+                        if topic_id:
+                            job_checkpoints.mark(job_tag, 'topic', value=topic_id)
 
                     if topic_id:
-                        logger.info(f"✅ Group topic created successfully: {clean_title} (ID: {topic_id})")
+                        logger.info(f"✅ Group topic ready: {clean_title} (ID: {topic_id})")
 
                         # Post title to topic
-                        try:
-                            client_to_use = telegram_client
-                            group_entity = await client_to_use.get_entity(GROUP_ID)
-                            await client_to_use.send_message(
-                                group_entity,
-                                clean_title,
-                                reply_to=topic_id
-                            )
-                            logger.info(f"📤 Title posted to group topic")
-                        except Exception as e:
-                            logger.error(f"❌ Failed to post title to group topic: {e}")
+                        if not job_checkpoints.get(job_tag, 'group_title'):
+                            try:
+                                client_to_use = telegram_client
+                                group_entity = await peer_cache.input_peer(client_to_use, GROUP_ID)
+                                await send_scheduler.run(
+                                    lambda: client_to_use.send_message(group_entity, clean_title, reply_to=topic_id),
+                                    GROUP_ID, topic_id, label="topic title"
+                                )
+                                job_checkpoints.mark(job_tag, 'group_title')
+                                logger.info(f"📤 Title posted to group topic")
+                            except Exception as e:
+                                logger.error(f"❌ Failed to post title to group topic: {e}")
+                                peer_cache.invalidate_on_error(GROUP_ID, e)
 
                         # Post images to topic
                         if successful_image_downloads > 0:
                             try:
-                                # Re-download images for group posting
-                                image_files_for_group = []
-                                for i, img_data in enumerate(imagetwist_urls, 1):
-                                    try:
-                                        file_path = await content_extractor.download_image_async(
-                                            img_data['url'],
-                                            f"group_image_{i}_{img_data.get('alt', 'unknown')}.jpg",
-                                            referrer_url=url
-                                        )
-                                        if file_path and os.path.exists(file_path) and os.path.getsize(file_path) > 1000:
-                                            image_files_for_group.append(file_path)
-                                    except Exception as e:
-                                        logger.error(f"Error preparing image for group: {e}")
-
-                                if image_files_for_group:
-                                    logger.info(f"⏳ Waiting 3s before posting {len(image_files_for_group)} images to group...")
-                                    await asyncio.sleep(3)
-                                    await post_images_to_group_topic(image_files_for_group, topic_id, GROUP_ID)
+                                # Reuse the files already downloaded for the channel
+                                group_items = media_cache.items_for('group')
+                                image_keys = {item['file_path']: item['key'] for item in group_items}
+
+                                if group_items:
+                                    await post_images_to_group_topic(
+                                        [item['file_path'] for item in group_items], topic_id, GROUP_ID, bot=context.bot,
+                                        on_posted=lambda album: job_checkpoints.mark_items(
+                                            job_tag, 'group_image', [image_keys[path] for path in album])
+                                    )
                                     logger.info(f"📤 Images posted to group topic")
-
-                                # Clean up group image files
-                                for file_path in image_files_for_group:
-                                    try:
-                                        os.remove(file_path)
-                                    except:
-                                        pass
                             except Exception as e:
                                 logger.error(f"❌ Failed to post images to group topic: {e}")
 
@@ -4817,6 +6997,14 @@ async def process_url_complete(update: Update, context: ContextTypes.DEFAULT_TYP
             else:
                 logger.warning("❌ No group ID or title available for group posting")
 
+            # Group posting is done (or skipped): drop the remaining cached files
+            media_cache.release_consumer('group')
+            context.user_data.pop('media_cache', None)
+
+            # The job is complete: remember the link and make sure a restart does not replay it
+            posted_index.record_page([source_url, url], CHANNEL_ID, job_checkpoints.get(job_tag, 'channel_title'))
+            job_checkpoints.clear(job_tag)
+
         # Send completion message
         completion_msg = await update.message.reply_text("✅ Processing complete! All content sent to channel and group.")
         bot_messages_to_delete.append(completion_msg.message_id)
@@ -4860,6 +7048,7 @@ async def extract_images_from_html_content(update: Update, context: ContextTypes
     if '<img' not in html_content.lower():
         return False
 
+    # Pasted HTML is only inspected: the image URLs are listed, never downloaded or posted to the channel
     processing_msg = await update.message.reply_text("🔍 Extracting images from HTML...")
     bot_messages_to_delete.append(processing_msg.message_id)
 
@@ -4868,6 +7057,7 @@ async def extract_images_from_html_content(update: Update, context: ContextTypes
     if isinstance(images, str):  # Error message
         error_msg = await update.message.reply_text(f"❌ {images}")
         bot_messages_to_delete.append(error_msg.message_id)
+        images = []
 
     if not images:
         no_images_msg = await update.message.reply_text("❌ No valid images found in the HTML content.")
@@ -4907,6 +7097,432 @@ async def extract_images_from_html_content(update: Update, context: ContextTypes
 
     return True
 
+# --- Persistent job queue ---
+
+class JobCheckpoints:
+    """Per-stage progress of each job in SQLite, so a restarted bot resumes from the last completed step"""
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = db_path
+        self.db = None
+
+    def _conn(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.db_path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS job_checkpoints ("
+                " job_key TEXT NOT NULL,"
+                " stage TEXT NOT NULL,"
+                " item TEXT NOT NULL DEFAULT '',"
+                " user_id INTEGER,"
+                " value TEXT,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (job_key, stage, item))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_user ON job_checkpoints (user_id, stage)")
+            self.db.commit()
+        return self.db
+
+    def mark(self, job_key, stage, item='', value=True, user_id=None):
+        """Record that a stage (or one item of it) is complete"""
+        self.mark_items(job_key, stage, [item], value, user_id)
+
+    def mark_items(self, job_key, stage, items, value=True, user_id=None):
+        """Record several completed items of a stage in one transaction"""
+        if not job_key:
+            return
+        db = self._conn()
+        now = time.time()
+        db.executemany(
+            "INSERT OR REPLACE INTO job_checkpoints (job_key, stage, item, user_id, value, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(job_key, stage, str(item), user_id, json.dumps(value), now) for item in items]
+        )
+        db.commit()
+
+    def get(self, job_key, stage, item=''):
+        """Value stored for a completed stage or item, or None if it has not completed"""
+        if not job_key:
+            return None
+        row = self._conn().execute(
+            "SELECT value FROM job_checkpoints WHERE job_key = ? AND stage = ? AND item = ?",
+            (job_key, stage, str(item))
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def items(self, job_key, stage):
+        """All completed items of a stage as {item: value}"""
+        if not job_key:
+            return {}
+        rows = self._conn().execute(
+            "SELECT item, value FROM job_checkpoints WHERE job_key = ? AND stage = ?", (job_key, stage)
+        ).fetchall()
+        return {item: json.loads(value) for item, value in rows}
+
+    def pending_selection(self, user_id):
+        """Saved type selection state of this user's newest unfinished job, or None"""
+        row = self._conn().execute(
+            "SELECT value FROM job_checkpoints WHERE user_id = ? AND stage = 'selection_menu' "
+            "ORDER BY updated_at DESC LIMIT 1",
+            (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def clear(self, job_key):
+        """Forget a finished (or abandoned) job"""
+        if not job_key:
+            return
+        self._conn().execute("DELETE FROM job_checkpoints WHERE job_key = ?", (job_key,))
+        self.db.commit()
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+job_checkpoints = JobCheckpoints()
+
+# User data saved with the type selection menu, enough to run the selection after a restart
+SELECTION_STATE_KEYS = (
+    'vidoza_urls', 'streamtape_urls', 'stream2z_urls', 'luluvid_urls', 'sample_videos', 'hotpic_videos',
+    'erome_videos', 'clean_title', 'extracted_data', 'selection_message_id', 'selection_timestamp', 'job_key'
+)
+
+def restore_selection_state(user_id, user_data):
+    """Bring back a type selection menu that was still open when the bot stopped"""
+    if user_data.get('waiting_for_type_selection', False):
+        return False
+    state = job_checkpoints.pending_selection(user_id)
+    if not state:
+        return False
+    user_data.update(state)
+    user_data['waiting_for_type_selection'] = True
+    logger.info(f"♻️ Restored pending type selection for user {user_id} (job {state.get('job_key')})")
+    return True
+
+# --- Already-posted index ---
+
+TRACKING_QUERY_PARAMS = ('fbclid', 'gclid', 'ref', 'ref_src', 'igshid')
+
+def normalize_url(url):
+    """Canonical form of a URL for dedupe: lowercase host without www, no fragment, tracking params or trailing slash"""
+    try:
+        parsed = urlparse(url.strip())
+    except Exception:
+        return url
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in TRACKING_QUERY_PARAMS
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return f"{parsed.scheme.lower() or 'http'}://{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+def file_content_hash(file_path):
+    """SHA-256 of a file's content, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class BloomFilter:
+    """Fixed-size Bloom filter: answers 'definitely new' without touching the database"""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class PostedIndex:
+    """Persistent index of pages and media already posted to the channel (SQLite plus an in-memory Bloom filter)"""
+
+    def __init__(self, db_path=JOB_DB_PATH):
+        self.db_path = db_path
+        self.db = None
+        self.bloom = None
+
+    def _conn(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.db_path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS posted_index ("
+                " key TEXT PRIMARY KEY,"
+                " chat_id INTEGER,"
+                " message_id INTEGER,"
+                " created_at REAL NOT NULL)"
+            )
+            self.db.commit()
+
+            started = time.time()
+            self.bloom = BloomFilter(DEDUPE_BLOOM_CAPACITY, DEDUPE_BLOOM_ERROR_RATE)
+            loaded = 0
+            for (key,) in self.db.execute("SELECT key FROM posted_index"):
+                self.bloom.add(key)
+                loaded += 1
+            logger.info(f"🗂️ Loaded {loaded} posted entries into the dedupe filter in {time.time() - started:.1f}s")
+        return self.db
+
+    def _lookup(self, key):
+        db = self._conn()
+        if key not in self.bloom:
+            return None
+        row = db.execute("SELECT chat_id, message_id FROM posted_index WHERE key = ?", (key,)).fetchone()
+        return {'chat_id': row[0], 'message_id': row[1]} if row else None
+
+    def _record(self, keys, chat_id=None, message_id=None):
+        db = self._conn()
+        now = time.time()
+        db.executemany(
+            "INSERT OR IGNORE INTO posted_index (key, chat_id, message_id, created_at) VALUES (?, ?, ?, ?)",
+            [(key, chat_id, message_id, now) for key in keys]
+        )
+        db.commit()
+        for key in keys:
+            self.bloom.add(key)
+
+    def lookup_page(self, url):
+        """Channel reference of an already-posted source page, or None"""
+        return self._lookup(f"page:{normalize_url(url)}")
+
+    def lookup_redirected_page(self, source_url, final_url):
+        """Channel reference when source_url redirected to a different, already-posted page, or None"""
+        if not final_url or normalize_url(final_url) == normalize_url(source_url):
+            return None
+        return self.lookup_page(final_url)
+
+    def lookup_media(self, url=None, content_hash=None):
+        """Channel reference of already-posted media, matched by resolved URL or content hash, or None"""
+        if url:
+            hit = self._lookup(f"media:{normalize_url(url)}")
+            if hit:
+                return hit
+        if content_hash:
+            return self._lookup(f"sha256:{content_hash}")
+        return None
+
+    def record_page(self, urls, chat_id=None, message_id=None):
+        """Remember source page URLs (as sent and as resolved) once their post is complete"""
+        self._record({f"page:{normalize_url(url)}" for url in urls if url}, chat_id, message_id)
+
+    def record_media(self, urls=(), content_hash=None, chat_id=None, message_id=None):
+        """Remember posted media by its resolved URLs and content hash"""
+        keys = {f"media:{normalize_url(url)}" for url in urls if url}
+        if content_hash:
+            keys.add(f"sha256:{content_hash}")
+        self._record(keys, chat_id, message_id)
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+posted_index = PostedIndex()
+
+class PersistentJobQueue:
+    """SQLite-backed queue of incoming messages, worked off by a pool of async workers"""
+
+    def __init__(self, db_path=JOB_DB_PATH, workers=JOB_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self.application = None
+        self.db = None
+        self.wakeup = None
+        self.tasks = []
+        self.running_users = set()
+        self.last_served = {}  # user_id -> time their last job started (round-robin between users)
+
+    def start(self, application):
+        """Open the job table, requeue jobs interrupted by the last shutdown and start the workers"""
+        self.application = application
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " user_id INTEGER NOT NULL,"
+            " chat_id INTEGER NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " update_json TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'queued',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)")
+
+        # Jobs that were running when the bot stopped go back to the queue, unless they keep dying
+        now = time.time()
+        self.db.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', finished_at = ? "
+            "WHERE status = 'running' AND attempts >= ?",
+            (now, JOB_MAX_ATTEMPTS)
+        )
+        requeued = self.db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'").rowcount
+        self.db.commit()
+        if requeued:
+            logger.info(f"♻️ Requeued {requeued} job(s) interrupted by the last shutdown")
+
+        self.wakeup = asyncio.Event()
+        self.wakeup.set()
+        self.tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"🧵 Started {self.workers} job worker(s)")
+
+    async def stop(self):
+        """Stop the workers; jobs still running are requeued on the next start"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.db:
+            self.db.close()
+            self.db = None
+        job_checkpoints.close()
+        posted_index.close()
+
+    def enqueue(self, update, kind):
+        """Persist an incoming message as a job and return its id"""
+        cursor = self.db.execute(
+            "INSERT INTO jobs (user_id, chat_id, kind, update_json, created_at) VALUES (?, ?, ?, ?, ?)",
+            (update.effective_user.id, update.effective_chat.id, kind, json.dumps(update.to_dict()), time.time())
+        )
+        self.db.commit()
+        self.wakeup.set()
+        return cursor.lastrowid
+
+    def jobs_ahead(self, job_id):
+        """Number of queued or running jobs submitted before this one"""
+        row = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE id < ? AND status IN ('queued', 'running')", (job_id,)
+        ).fetchone()
+        return row[0]
+
+    def pending_for_user(self, user_id):
+        """Number of this user's jobs that are queued or running"""
+        if not self.db:
+            return 0
+        row = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE user_id = ? AND status IN ('queued', 'running')", (user_id,)
+        ).fetchone()
+        return row[0]
+
+    def cancel_user_jobs(self, user_id):
+        """Drop this user's queued jobs; returns how many were cancelled"""
+        if not self.db:
+            return 0
+        cancelled = self.db.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE user_id = ? AND status = 'queued'",
+            (time.time(), user_id)
+        ).rowcount
+        self.db.commit()
+        return cancelled
+
+    def _is_waiting_for_selection(self, user_id):
+        """True while this user still has a type selection menu open"""
+        user_data = self.application.user_data[user_id]
+        restore_selection_state(user_id, user_data)
+        if not user_data.get('waiting_for_type_selection', False):
+            return False
+        if time.time() - user_data.get('selection_timestamp', 0) > SELECTION_TIMEOUT:
+            # An abandoned menu must not hold this user's queue forever
+            clear_user_state(user_data)
+            return False
+        return True
+
+    def _claim_next(self):
+        """Mark the next fair job as running and return it, or None if nothing can run yet"""
+        rows = self.db.execute(
+            "SELECT id, user_id, kind, update_json FROM jobs WHERE status = 'queued' ORDER BY id"
+        ).fetchall()
+
+        # One job per user at a time; users take turns, oldest job first within a user.
+        # New URLs wait while the user still has to answer the type selection of the previous one.
+        candidates = {}
+        for job_id, user_id, kind, update_json in rows:
+            if user_id in self.running_users or user_id in candidates:
+                continue
+            if kind == 'url' and self._is_waiting_for_selection(user_id):
+                continue
+            candidates[user_id] = (job_id, user_id, kind, update_json)
+        if not candidates:
+            return None
+
+        job = min(candidates.values(), key=lambda j: (self.last_served.get(j[1], 0), j[0]))
+        self.db.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? WHERE id = ?",
+            (time.time(), job[0])
+        )
+        self.db.commit()
+        self.running_users.add(job[1])
+        self.last_served[job[1]] = time.time()
+        return job
+
+    def _finish(self, job_id, status, error=None):
+        self.db.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id)
+        )
+        self.db.commit()
+
+    async def _worker(self, worker_number):
+        while True:
+            job = self._claim_next()
+            if not job:
+                self.wakeup.clear()
+                try:
+                    # Poll now and then so expired selection menus release queued URLs
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, user_id, kind, update_json = job
+            logger.info(f"⚙️ Worker {worker_number} running {kind} job {job_id} for user {user_id}")
+            try:
+                await self._run(kind, update_json)
+                self._finish(job_id, 'done')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Job {job_id} failed: {e}")
+                self._finish(job_id, 'failed', str(e))
+            finally:
+                self.running_users.discard(user_id)
+                self.wakeup.set()
+
+    async def _run(self, kind, update_json):
+        """Rebuild the update and its context, then process it like the handler used to"""
+        update = Update.de_json(json.loads(update_json), self.application.bot)
+        context = self.application.context_types.context.from_update(update, self.application)
+        try:
+            if kind == 'selection':
+                restore_selection_state(update.effective_user.id, context.user_data)
+            if context.user_data.get('waiting_for_type_selection', False):
+                await handle_type_selection(update, context)
+            else:
+                await process_url_complete(update, context)
+        except Exception as e:
+            if update.message:
+                await update.message.reply_text(f"❌ Error processing message: {str(e)}")
+            raise
+
+processing_queue = PersistentJobQueue()
+
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle text messages and URLs"""
     try:
@@ -4925,11 +7541,12 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             logger.info(f"Ignoring message from {update.message.chat.type} chat")
             return
 
-        # Check if we're waiting for type selection
+        # Check if we're waiting for type selection (possibly one saved before a restart)
+        restore_selection_state(update.effective_user.id, context.user_data)
         if context.user_data.get('waiting_for_type_selection', False):
             # Check for timeout (5 minutes)
             selection_timestamp = context.user_data.get('selection_timestamp', 0)
-            if time.time() - selection_timestamp > 300:  # 5 minutes timeout
+            if time.time() - selection_timestamp > SELECTION_TIMEOUT:
                 await update.message.reply_text(
                     "⏰ **Selection timeout!**\n\n"
                     "You took too long to select a video type.\n"
@@ -4937,7 +7554,7 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     "Send a new URL to start fresh!",
                     parse_mode='Markdown'
                 )
-                context.user_data.clear()
+                clear_user_state(context.user_data)
                 return
 
             # Check if user sent a command (starts with /)
@@ -4945,11 +7562,16 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # Let the command handlers process it
                 return
 
-            await handle_type_selection(update, context)
+            processing_queue.enqueue(update, 'selection')
             return
 
-        # Process URL
-        await process_url_complete(update, context)
+        # Queue the URL; a worker runs extraction, download and posting
+        job_id = processing_queue.enqueue(update, 'url')
+        jobs_ahead = processing_queue.jobs_ahead(job_id)
+        if jobs_ahead:
+            await update.message.reply_text(f"📥 Link queued - {jobs_ahead} job(s) ahead of it")
+        else:
+            await update.message.reply_text("📥 Link queued - starting now")
 
     except Exception as e:
         logger.error(f"Error in handle_text: {e}")
@@ -5042,11 +7664,12 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
 
     if not urls_to_process:
         await update.message.reply_text(f"❌ No {type_name} URLs found to process.")
-        context.user_data.clear()
+        clear_user_state(context.user_data)
         return
 
     # Get the stored title from context
     clean_title = context.user_data.get('clean_title')
+    job_key = context.user_data.get('job_key')
 
     # Step 1: Post videos to channel first
     processing_msg = await update.message.reply_text(f"🎬 Processing {len(urls_to_process)} {type_name} video(s) for channel...")
@@ -5054,20 +7677,39 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
 
     successful_downloads = 0
 
+    # Resolve every host page of the selection up front so downloads never wait on a page load
+    embed_resolver.prefetch(type_name, [url_item['url'] for url_item in urls_to_process])
+
     for i, url_item in enumerate(urls_to_process, 1):
         video_url = url_item['url']
 
+        # Videos posted to the channel before a restart are not downloaded or posted again
+        video_key = f"{selected_type}_{i}"
+        channel_checkpoint = job_checkpoints.get(job_key, 'channel_video', video_key)
+        if channel_checkpoint:
+            logger.info(f"♻️ {type_name} video {i} already posted to channel, skipping")
+            successful_downloads += 1
+            context.user_data.setdefault('downloaded_videos', []).append(channel_checkpoint['file'])
+            continue
+        videos_before = len(context.user_data.get('downloaded_videos', []))
+        mp4_url = None
+        content_hash = None
+
+        # Videos some earlier link already put in the channel are not extracted or downloaded again
+        if posted_index.lookup_media(url=video_url):
+            logger.info(f"♻️ {type_name} video {i} already posted to channel, skipping: {video_url}")
+            duplicate_msg = await update.message.reply_text(f"♻️ {type_name} video {i} was already posted to the channel - skipping")
+            bot_messages_to_delete.append(duplicate_msg.message_id)
+            continue
+
         try:
             extract_msg = await update.message.reply_text(f"🔍 Extracting {type_name} video {i}/{len(urls_to_process)}...")
             bot_messages_to_delete.append(extract_msg.message_id)
 
             # Extract MP4 URL based on type
-            if type_name == 'Vidoza':
-                mp4_url = content_extractor.extract_vidoza_video_url(video_url)
-            elif type_name == 'Streamtape':
-                mp4_url = content_extractor.extract_streamtape_video_url(video_url)
-            elif type_name == 'Stream2z':
-                mp4_url = content_extractor.extract_stream2z_video_url(video_url)
+            if type_name in ('Vidoza', 'Streamtape', 'Stream2z'):
+                # Usually already resolved in the background
+                mp4_url = await embed_resolver.resolve(type_name, video_url)
             elif type_name == 'Luluvid':
                 # Luluvid works differently - it downloads directly and returns file path
                 logger.info(f"🎬 Processing Luluvid video {i} with video_extractor.py method...")
@@ -5075,7 +7717,7 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                 bot_messages_to_delete.append(processing_msg.message_id)
 
                 # For Luluvid, we get the downloaded file directly
-                video_file = content_extractor.extract_luluvid_video_url(video_url)
+                video_file = await content_extractor.extract_luluvid_video_url(video_url)
 
                 if video_file and os.path.exists(video_file):
                     file_size = os.path.getsize(video_file)
@@ -5099,12 +7741,6 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                             bot_messages_to_delete.append(too_large_msg.message_id)
                             continue
 
-                        # Add delay before video upload to avoid flood control
-                        if i > 1:  # Don't delay the first video
-                            delay = min(3, i // 5)  # Progressive delay: 1s after 5 videos, 2s after 10, 3s after 15
-                            logger.info(f"⏳ Waiting {delay}s before uploading Luluvid video {i} to avoid flood control...")
-                            await asyncio.sleep(delay)
-
                         # Upload Luluvid video to channel
                         caption = ""
                         max_retries = 3
@@ -5158,7 +7794,7 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                     else:
                                         logger.error("❌ API upload also failed for Luluvid video")
                                 elif "429" in error_msg or "FloodWait" in error_msg:
-                                    wait_time = 30 + (retry * 10)  # Progressive backoff
+                                    wait_time = get_flood_wait_seconds(bot_error) or 30 + (retry * 10)  # Server wait, else progressive backoff
                                     logger.info(f"⏳ Rate limited, waiting {wait_time}s before retry {retry + 1}/{max_retries}")
                                     await asyncio.sleep(wait_time)
                                 else:
@@ -5201,22 +7837,26 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
             else:
                 continue
 
+            if mp4_url and mp4_url != "LULUVID_DIRECT_FILE" and posted_index.lookup_media(url=mp4_url):
+                logger.info(f"♻️ {type_name} video {i} resolves to an already-posted file, skipping: {mp4_url}")
+                duplicate_msg = await update.message.reply_text(f"♻️ {type_name} video {i} was already posted to the channel - skipping")
+                bot_messages_to_delete.append(duplicate_msg.message_id)
+                continue
+
             if mp4_url and mp4_url != "LULUVID_DIRECT_FILE":
                 found_mp4_msg = await update.message.reply_text(f"✅ Found MP4 URL for {type_name} video {i}. Validating...")
                 bot_messages_to_delete.append(found_mp4_msg.message_id)
 
                 # Quick validation check before download
                 try:
-                    import httpx
-                    async with httpx.AsyncClient(timeout=10) as client:
-                        response = await client.head(mp4_url)
-                        if response.status_code == 404:
-                            validation_fail_msg = await update.message.reply_text(f"❌ {type_name} video {i} URL is dead (404). Skipping...")
-                            bot_messages_to_delete.append(validation_fail_msg.message_id)
-                            continue
-                        elif response.status_code not in [200, 206, 302, 301, 307, 308]:
-                            validation_warn_msg = await update.message.reply_text(f"⚠️ {type_name} video {i} URL returned {response.status_code}. Trying download anyway...")
-                            bot_messages_to_delete.append(validation_warn_msg.message_id)
+                    status_code = await content_extractor.fetcher.head_status(mp4_url)
+                    if status_code == 404:
+                        validation_fail_msg = await update.message.reply_text(f"❌ {type_name} video {i} URL is dead (404). Skipping...")
+                        bot_messages_to_delete.append(validation_fail_msg.message_id)
+                        continue
+                    elif status_code not in [200, 206, 302, 301, 307, 308]:
+                        validation_warn_msg = await update.message.reply_text(f"⚠️ {type_name} video {i} URL returned {status_code}. Trying download anyway...")
+                        bot_messages_to_delete.append(validation_warn_msg.message_id)
                 except Exception as validation_error:
                     validation_error_msg = await update.message.reply_text(f"⚠️ Could not validate {type_name} video {i}. Trying download anyway...")
                     bot_messages_to_delete.append(validation_error_msg.message_id)
@@ -5225,14 +7865,45 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                 download_progress_msg = await update.message.reply_text(f"📥 Starting download for {type_name} video {i}...")
                 bot_messages_to_delete.append(download_progress_msg.message_id)
 
+                # Large direct files are uploaded to the channel while they download
+                pipelined = await download_and_upload_pipelined(
+                    content_extractor,
+                    mp4_url,
+                    os.path.join(content_extractor.temp_dir, f"{type_name.lower()}_video_{update.effective_chat.id}_{i}.mp4"),
+                    headers={'User-Agent': content_extractor.session.headers['User-Agent'], 'Referer': video_url}
+                )
+                if pipelined:
+                    video_file, _ = pipelined
+                    successful_downloads += 1
+                    file_size_mb = content_extractor.get_file_size_mb(video_file)
+                    pipelined_msg = await update.message.reply_text(
+                        f"✅ {type_name} video {i} downloaded and sent to channel ({file_size_mb:.1f}MB)"
+                    )
+                    bot_messages_to_delete.append(pipelined_msg.message_id)
+
+                    # Store video file for group upload later
+                    if 'downloaded_videos' not in context.user_data:
+                        context.user_data['downloaded_videos'] = []
+                    context.user_data['downloaded_videos'].append(video_file)
+                    continue
+
                 try:
                     video_file = await content_extractor.download_video_async(
                         mp4_url,
-                        f"{type_name.lower()}_video_{i}.mp4",
+                        f"{type_name.lower()}_video_{update.effective_chat.id}_{i}.mp4",
                         referrer_url=video_url
                     )
 
                     if video_file and os.path.exists(video_file):
+                        # Same video behind a different link
+                        content_hash = await asyncio.to_thread(file_content_hash, video_file)
+                        if posted_index.lookup_media(content_hash=content_hash):
+                            logger.info(f"♻️ {type_name} video {i} content was already posted, skipping upload")
+                            os.remove(video_file)
+                            duplicate_msg = await update.message.reply_text(f"♻️ {type_name} video {i} was already posted to the channel - skipping")
+                            bot_messages_to_delete.append(duplicate_msg.message_id)
+                            continue
+
                         file_size = os.path.getsize(video_file)
                         download_success_msg = await update.message.reply_text(
                             f"✅ Download completed for {type_name} video {i} ({file_size / 1024 / 1024:.1f}MB). Sending to channel..."
@@ -5255,12 +7926,6 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                 continue
 
                             try:
-                                # Add delay before video upload to avoid flood control
-                                if i > 1:  # Don't delay the first video
-                                    delay = min(3, i // 5)  # Progressive delay: 1s after 5 videos, 2s after 10, 3s after 15
-                                    logger.info(f"⏳ Waiting {delay}s before uploading video {i} to avoid flood control...")
-                                    await asyncio.sleep(delay)
-
                                 # Route based on file size
                                 caption = ""
                                 max_retries = 3
@@ -5302,8 +7967,9 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                             break  # Exit bot retry loop, try API upload
                                         elif "429" in error_msg or "Flood control" in error_msg:
                                             if retry < max_retries - 1:
-                                                logger.warning(f"⚠️ Flood control hit for video {i}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                                await asyncio.sleep(retry_delay)
+                                                wait_time = get_flood_wait_seconds(bot_error) or retry_delay
+                                                logger.warning(f"⚠️ Flood control hit for video {i}, retrying in {wait_time:.0f}s... (attempt {retry + 1}/{max_retries})")
+                                                await asyncio.sleep(wait_time)
                                                 retry_delay *= 2  # Exponential backoff
                                             else:
                                                 logger.error(f"❌ Failed to upload video {i} after {max_retries} retries due to flood control")
@@ -5341,8 +8007,9 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                             error_msg = str(upload_error)
                                             if "429" in error_msg or "Flood control" in error_msg:
                                                 if retry < max_retries - 1:
-                                                    logger.warning(f"⚠️ Flood control hit for large video {i}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                                    await asyncio.sleep(retry_delay)
+                                                    wait_time = get_flood_wait_seconds(upload_error) or retry_delay
+                                                    logger.warning(f"⚠️ Flood control hit for large video {i}, retrying in {wait_time:.0f}s... (attempt {retry + 1}/{max_retries})")
+                                                    await asyncio.sleep(wait_time)
                                                     retry_delay *= 2  # Exponential backoff
                                                 else:
                                                     logger.error(f"❌ Failed to upload large video {i} after {max_retries} retries due to flood control")
@@ -5402,12 +8069,6 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                             continue
 
                         try:
-                            # Add delay before video upload to avoid flood control
-                            if i > 1:  # Don't delay the first video
-                                delay = min(3, i // 5)  # Progressive delay: 1s after 5 videos, 2s after 10, 3s after 15
-                                logger.info(f"⏳ Waiting {delay}s before uploading video {i} to avoid flood control...")
-                                await asyncio.sleep(delay)
-
                             # Route based on file size
                             caption = ""
                             max_retries = 3
@@ -5438,8 +8099,9 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
 
                                         if "429" in error_msg or "Flood control" in error_msg:
                                             if retry < max_retries - 1:
-                                                logger.warning(f"⚠️ Flood control hit for small video {i}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                                await asyncio.sleep(retry_delay)
+                                                wait_time = get_flood_wait_seconds(bot_error) or retry_delay
+                                                logger.warning(f"⚠️ Flood control hit for small video {i}, retrying in {wait_time:.0f}s... (attempt {retry + 1}/{max_retries})")
+                                                await asyncio.sleep(wait_time)
                                                 retry_delay *= 2  # Exponential backoff
                                             else:
                                                 logger.error(f"❌ Failed to upload small video {i} after {max_retries} retries due to flood control")
@@ -5472,8 +8134,9 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                         error_msg = str(upload_error)
                                         if "429" in error_msg or "Flood control" in error_msg:
                                             if retry < max_retries - 1:
-                                                logger.warning(f"⚠️ Flood control hit for large video {i}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                                await asyncio.sleep(retry_delay)
+                                                wait_time = get_flood_wait_seconds(upload_error) or retry_delay
+                                                logger.warning(f"⚠️ Flood control hit for large video {i}, retrying in {wait_time:.0f}s... (attempt {retry + 1}/{max_retries})")
+                                                await asyncio.sleep(wait_time)
                                                 retry_delay *= 2  # Exponential backoff
                                             else:
                                                 logger.error(f"❌ Failed to upload large video {i} after {max_retries} retries due to flood control")
@@ -5537,6 +8200,23 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                 f"❌ Error processing {type_name} video {i}: {str(e)}"
             )
             bot_messages_to_delete.append(process_error_msg.message_id)
+        finally:
+            # Every successful channel upload adds its file to downloaded_videos
+            downloaded_videos = context.user_data.get('downloaded_videos', [])
+            if len(downloaded_videos) > videos_before:
+                video_file = downloaded_videos[-1]
+                reference = media_registry.get(video_file) or {}
+                job_checkpoints.mark(job_key, 'channel_video', video_key, value={
+                    'file': video_file,
+                    'chat_id': reference.get('chat_id'),
+                    'message_id': reference.get('message_id')
+                })
+                if content_hash is None and os.path.exists(video_file):
+                    content_hash = await asyncio.to_thread(file_content_hash, video_file)
+                posted_index.record_media(
+                    [video_url, mp4_url if mp4_url != "LULUVID_DIRECT_FILE" else None], content_hash,
+                    reference.get('chat_id'), reference.get('message_id')
+                )
 
     # Step 2: Create topic and post everything to group
     if GROUP_ID and clean_title and clean_title != "No title found" and successful_downloads > 0:
@@ -5544,25 +8224,31 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
         bot_messages_to_delete.append(topic_msg.message_id)
 
         try:
-            # Create topic
-            logger.info(f"🎯 Creating group topic with title: {clean_title}")
-            topic_id = await create_group_topic(clean_title, GROUP_ID)
+            # Create topic (once; a restarted job reuses the topic it already created)
+            topic_id = job_checkpoints.get(job_key, 'topic')
+            if not topic_id:
+                logger.info(f"🎯 Creating group topic with title: {clean_title}")
+                topic_id = await create_group_topic(clean_title, GROUP_ID)
+                if topic_id:
+                    job_checkpoints.mark(job_key, 'topic', value=topic_id)
 
             if topic_id:
-                logger.info(f"✅ Group topic created successfully: {clean_title} (ID: {topic_id})")
+                logger.info(f"✅ Group topic ready: {clean_title} (ID: {topic_id})")
 
                 # Post title to topic
-                try:
-                    client_to_use = telegram_client
-                    group_entity = await client_to_use.get_entity(GROUP_ID)
-                    await client_to_use.send_message(
-                        group_entity,
-                        clean_title,
-                        reply_to=topic_id
-                    )
-                    logger.info(f"📤 Title posted to group topic")
-                except Exception as e:
-                    logger.error(f"❌ Failed to post title to group topic: {e}")
+                if not job_checkpoints.get(job_key, 'group_title'):
+                    try:
+                        client_to_use = telegram_client
+                        group_entity = await peer_cache.input_peer(client_to_use, GROUP_ID)
+                        await send_scheduler.run(
+                            lambda: client_to_use.send_message(group_entity, clean_title, reply_to=topic_id),
+                            GROUP_ID, topic_id, label="topic title"
+                        )
+                        job_checkpoints.mark(job_key, 'group_title')
+                        logger.info(f"📤 Title posted to group topic")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to post title to group topic: {e}")
+                        peer_cache.invalidate_on_error(GROUP_ID, e)
 
                 # Post images to topic FIRST (if any were extracted)
                 extracted_data = context.user_data.get('extracted_data', {})
@@ -5572,80 +8258,49 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                     try:
                         logger.info(f"📤 Posting {len(imagetwist_urls)} images to group topic")
 
-                        # Re-download images for group posting using batch system
-                        logger.info(f"📤 Preparing {len(imagetwist_urls)} images for group posting using batch system...")
-
-                        # Download all images for group
-                        group_images = []
-                        for i, img_data in enumerate(imagetwist_urls, 1):
-                            try:
-                                # Handle both ImageTwist and sample-style images
-                                image_url = img_data['url']
-                                image_alt = img_data.get('alt', 'unknown')
-                                image_type = img_data.get('type', 'imagetwist')
-
-                                logger.info(f"📥 Downloading group image {i}/{len(imagetwist_urls)} from: {image_url}")
-                                file_path = await content_extractor.download_image_async(
-                                    image_url,
-                                    f"group_image_{i}_{image_alt}.jpg",
-                                    referrer_url=extracted_data.get('url', '')
-                                )
-                                if file_path and os.path.exists(file_path) and os.path.getsize(file_path) > 1000:
-                                    group_images.append(file_path)
-                                    logger.info(f"✅ Group image {i} downloaded successfully")
-                            except Exception as e:
-                                logger.error(f"Error downloading group image {i}: {e}")
-
-                        if group_images:
-                            # Upload group images in batches of 5
-                            batch_size = 5
-                            total_batches = (len(group_images) + batch_size - 1) // batch_size
-
-                            logger.info(f"📤 Starting group batch upload: {len(group_images)} images in {total_batches} batches of {batch_size}")
-
-                            for batch_num in range(total_batches):
-                                start_idx = batch_num * batch_size
-                                end_idx = min(start_idx + batch_size, len(group_images))
-                                batch_images_group = group_images[start_idx:end_idx]
-
-                                logger.info(f"📤 Group Batch {batch_num + 1}/{total_batches}: Uploading images {start_idx + 1}-{end_idx}")
-
-                                # Upload batch with retry logic
-                                max_retries = 3
-                                retry_delay = 5
-
-                                for retry in range(max_retries):
-                                    try:
-                                        await post_images_to_group_topic(batch_images_group, topic_id, GROUP_ID)
-                                        logger.info(f"✅ Group Batch {batch_num + 1}/{total_batches} completed successfully!")
-                                        break  # Success, exit retry loop
-
-                                    except Exception as upload_error:
-                                        error_msg = str(upload_error)
-                                        if "429" in error_msg or "Flood control" in error_msg:
-                                            if retry < max_retries - 1:
-                                                logger.warning(f"⚠️ Flood control hit for group batch {batch_num + 1}, retrying in {retry_delay}s... (attempt {retry + 1}/{max_retries})")
-                                                await asyncio.sleep(retry_delay)
-                                                retry_delay *= 2  # Exponential backoff
-                                            else:
-                                                logger.error(f"❌ Failed to upload group batch {batch_num + 1} after {max_retries} retries due to flood control")
-                                        else:
-                                            logger.error(f"❌ Error uploading group batch {batch_num + 1}: {upload_error}")
-                                            break
-
-                                # Wait 3 seconds between batches (except after the last batch)
-                                if batch_num < total_batches - 1:
-                                    logger.info(f"⏳ Waiting 3s before next group batch...")
-                                    await asyncio.sleep(3)
-
-                            logger.info(f"✅ Group batch upload completed! {len(group_images)} images posted to group topic!")
+                        # Reuse the images downloaded for the channel; only download if the cache is gone
+                        media_cache = context.user_data.get('media_cache')
+                        if media_cache and media_cache.has_consumer('group'):
+                            group_items = media_cache.items_for('group')
+                            logger.info(f"♻️ Reusing {len(group_items)} cached images for group posting")
+                        else:
+                            # Skip images a restarted job already posted to the topic
+                            group_posted = job_checkpoints.items(job_key, 'group_image')
+                            pending_indices = [index for index in range(1, len(imagetwist_urls) + 1)
+                                               if str(index) not in group_posted]
+                            logger.info(f"📤 Preparing {len(pending_indices)} images for group posting using batch system...")
+
+                            # Download all images for group concurrently (order is preserved)
+                            group_results = await content_extractor.download_images_concurrently(
+                                [imagetwist_urls[index - 1] for index in pending_indices],
+                                referrer_url=extracted_data.get('url', ''),
+                                prefix=f"group_image_{update.effective_chat.id}_{update.message.message_id}"
+                            )
+                            media_cache = JobMediaCache(f"group_{update.effective_chat.id}_{update.message.message_id}")
+                            context.user_data['media_cache'] = media_cache
+                            for result in group_results:
+                                result['index'] = pending_indices[result['index'] - 1]
+                                if result['file_path']:
+                                    media_cache.add(result['index'], result['file_path'], ('group',),
+                                                    url=result['url'], index=result['index'], file_size=result['file_size'])
+                            group_items = media_cache.items_for('group')
+
+                            failed_images = [r for r in group_results if r['error']]
+                            if failed_images:
+                                failed_msg = await update.message.reply_text(format_image_failures(failed_images, len(group_results)))
+                                bot_messages_to_delete.append(failed_msg.message_id)
+
+                        if group_items:
+                            image_keys = {item['file_path']: item['key'] for item in group_items}
+                            await post_images_to_group_topic(
+                                [item['file_path'] for item in group_items], topic_id, GROUP_ID, bot=context.bot,
+                                on_posted=lambda album: job_checkpoints.mark_items(
+                                    job_key, 'group_image', [image_keys[path] for path in album])
+                            )
+                            logger.info(f"✅ Group album upload completed! {len(group_items)} images posted to group topic!")
 
-                        # Clean up group image files
-                        for file_path in group_images:
-                            try:
-                                os.remove(file_path)
-                            except:
-                                pass
+                        # Group was the last consumer of the cached images
+                        media_cache.release_consumer('group')
                     except Exception as e:
                         logger.error(f"❌ Failed to post images to group topic: {e}")
 
@@ -5663,15 +8318,27 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                         error_msg = await update.message.reply_text(f"❌ Cannot post videos to group: {validation_msg}")
                         bot_messages_to_delete.append(error_msg.message_id)
                     else:
+                        channel_refs = {ref['file']: ref for ref in job_checkpoints.items(job_key, 'channel_video').values()}
                         for i, video_file in enumerate(downloaded_videos, 1):
+                            if job_checkpoints.get(job_key, 'group_video', video_file):
+                                logger.info(f"♻️ Video {i} already posted to group topic, skipping")
+                                continue
+
                             if video_file and os.path.exists(video_file):
                                 file_size_mb = content_extractor.get_file_size_mb(video_file)
                                 logger.info(f"📤 Uploading video {i} to group topic ({file_size_mb:.1f}MB)")
 
                                 try:
+                                    # Reuse the channel upload (file_id / Telethon media) so the video is not uploaded twice
+                                    group_upload_success = False
+                                    result = await send_media_by_reference(context.bot, video_file, GROUP_ID, topic_id)
+                                    if result:
+                                        job_checkpoints.mark(job_key, 'group_video', video_file)
+                                        logger.info(f"♻️ Video {i} sent to group topic by reference, skipping re-upload")
+                                        continue
+
                                     # Try bot's send_video first for ALL videos in group (bot can handle up to 2GB)
                                     logger.info(f"📤 Using bot send_video for group upload ({file_size_mb:.1f}MB)")
-                                    group_upload_success = False
 
                                     try:
                                         result = await memory_efficient_video_upload(
@@ -5683,6 +8350,7 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                         )
                                         logger.info(f"✅ Group video upload successful! Message ID: {result.message_id}")
                                         group_upload_success = True
+                                        job_checkpoints.mark(job_key, 'group_video', video_file)
                                     except Exception as group_error:
                                         error_msg = str(group_error)
                                         logger.error(f"❌ Group video upload failed: {group_error}")
@@ -5701,10 +8369,25 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
                                     # If bot upload failed due to file size, try API upload as fallback
                                     if not group_upload_success and file_size_mb > 50:
                                         logger.info(f"🚀 Bot upload failed, trying API upload for group ({file_size_mb:.1f}MB)")
-                                        await upload_to_group_topic(video_file, "", topic_id, GROUP_ID)
+                                        if await upload_to_group_topic(video_file, "", topic_id, GROUP_ID):
+                                            job_checkpoints.mark(job_key, 'group_video', video_file)
 
                                 except Exception as e:
                                     logger.error(f"❌ Failed to upload video {i} to group topic: {e}")
+                            elif channel_refs.get(video_file, {}).get('message_id'):
+                                # The local file did not survive a restart; copy the channel post instead
+                                channel_ref = channel_refs[video_file]
+                                try:
+                                    await context.bot.copy_message(
+                                        chat_id=GROUP_ID,
+                                        from_chat_id=channel_ref['chat_id'],
+                                        message_id=channel_ref['message_id'],
+                                        reply_to_message_id=topic_id
+                                    )
+                                    job_checkpoints.mark(job_key, 'group_video', video_file)
+                                    logger.info(f"♻️ Video {i} copied from the channel post to group topic")
+                                except Exception as e:
+                                    logger.error(f"❌ Failed to copy video {i} to group topic: {e}")
                             else:
                                 logger.warning(f"⚠️ Video file {i} not found or invalid")
 
@@ -5762,6 +8445,15 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
         # Clear the downloaded videos list
         context.user_data['downloaded_videos'] = []
 
+    # Remember the link so it is not posted again - only once something was posted, so failed links can be retried
+    if successful_downloads > 0:
+        extracted_data = context.user_data.get('extracted_data', {})
+        posted_index.record_page(
+            [extracted_data.get('source_url'), extracted_data.get('url')], CHANNEL_ID, job_checkpoints.get(job_key, 'channel_title')
+        )
+    else:
+        job_checkpoints.clear(job_key)
+
     # Send completion message
     if successful_downloads > 0:
         success_msg = await update.message.reply_text(
@@ -5792,7 +8484,7 @@ async def handle_type_selection(update: Update, context: ContextTypes.DEFAULT_TY
         await safe_delete_message(context.bot, update.effective_chat.id, msg_id, f"bot message {msg_id}")
 
     # Clear context and restart
-    context.user_data.clear()
+    clear_user_state(context.user_data)
     start_msg = await start(update, context)
 
     # Delete the start message after a short delay
@@ -5817,7 +8509,7 @@ async def vidoza_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     processing_msg = await update.message.reply_text("🔍 Searching for Vidoza videos...")
     bot_messages_to_delete.append(processing_msg.message_id)
 
-    vidoza_urls = content_extractor.extract_vidoza_urls(url)
+    vidoza_urls = await content_extractor.extract_vidoza_urls_async(url)
 
     if isinstance(vidoza_urls, str):  # Error message
         error_response_msg = await update.message.reply_text(f"❌ {vidoza_urls}")
@@ -5903,7 +8595,7 @@ async def streamtape_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     processing_msg = await update.message.reply_text("🔍 Searching for Streamtape videos...")
     bot_messages_to_delete.append(processing_msg.message_id)
 
-    streamtape_urls = content_extractor.extract_streamtape_urls(url)
+    streamtape_urls = await content_extractor.extract_streamtape_urls_async(url)
 
     if isinstance(streamtape_urls, str):  # Error message
         error_response_msg = await update.message.reply_text(f"❌ {streamtape_urls}")
@@ -5960,7 +8652,7 @@ async def images_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     processing_msg = await update.message.reply_text("🔍 Extracting images from webpage...")
     bot_messages_to_delete.append(processing_msg.message_id)
 
-    images = content_extractor.extract_images_from_url(url)
+    images = await content_extractor.extract_images_from_url_async(url)
 
     if isinstance(images, str):  # Error message
         error_response_msg = await update.message.reply_text(f"❌ {images}")
@@ -6378,18 +9070,18 @@ async def create_group_topic(title, group_id):
 
         logger.info("✅ Client ready for group topic creation")
 
-        # Get current user info
+        # Get current user info (fetched once per client)
         try:
-            me = await client_to_use.get_me()
+            me = await peer_cache.get_me(client_to_use)
             logger.info(f"👤 Current user: {me.first_name} (@{me.username}) - ID: {me.id}")
         except Exception as e:
             logger.error(f"❌ Failed to get current user: {e}")
 
-        # Get group entity directly (like test script)
+        # Get group peer and forum flags (resolved once and cached)
         try:
-            logger.info(f"🔍 Getting group entity: {group_id}")
-            group_entity = await client_to_use.get_entity(group_id)
-            logger.info(f"✅ Found group: {group_entity.title} (ID: {group_entity.id})")
+            group = await peer_cache.get(client_to_use, group_id)
+            group_entity = group['peer']
+            logger.info(f"✅ Found group: {group['title']} (ID: {group['id']})")
         except Exception as e:
             logger.error(f"❌ Failed to get group entity: {e}")
             return None
@@ -6397,12 +9089,12 @@ async def create_group_topic(title, group_id):
         # Check if group supports topics (like test script)
         try:
             # Check if it's a channel/supergroup
-            if not hasattr(group_entity, 'megagroup'):
+            if not group['megagroup']:
                 logger.error("❌ This chat is not a supergroup. Topics only work in supergroups.")
                 return None
 
             # Check if forum mode is enabled (like test script)
-            if not (hasattr(group_entity, 'forum') and group_entity.forum):
+            if not group['forum']:
                 logger.error("❌ Forum mode is not enabled in this group. Enable topics first in group settings.")
                 return None
 
@@ -6445,6 +9137,7 @@ async def create_group_topic(title, group_id):
     except Exception as e:
         logger.error(f"❌ Failed to create forum topic: {e}")
         logger.error(f"❌ Error type: {type(e).__name__}")
+        peer_cache.invalidate_on_error(group_id, e)
         import traceback
         logger.error(f"❌ Full traceback: {traceback.format_exc()}")
         return None
@@ -6463,12 +9156,43 @@ async def upload_to_group_topic(video_file, caption, topic_id, group_id):
             logger.error("❌ Telegram client is not available for group upload.")
             return False
 
-        group_entity = await client_to_use.get_entity(group_id)
+        group_entity = await peer_cache.input_peer(client_to_use, group_id)
+
+        # Usually cached from the channel upload of the same file
+        video_attributes = get_video_attributes_for_streaming(await prepare_video_for_upload(video_file))
 
         # Get file size
         file_size = os.path.getsize(video_file)
         file_size_mb = file_size / (1024 * 1024)
 
+        # Built-in parallel uploader first, so upload speed doesn't depend on FastTelethonhelper
+        if NATIVE_UPLOAD_ENABLED:
+            logger.info("🚀 Using the built-in parallel uploader for group upload")
+            try:
+                async with client_pool.connections(UPLOAD_CONNECTIONS) as upload_clients:
+                    file_object = await native_upload(video_file, upload_clients)
+
+                    result = await send_scheduler.run(
+                        lambda: upload_clients[0].send_file(
+                            group_entity,
+                            file_object,
+                            caption=caption,
+                            supports_streaming=True,
+                            attributes=[video_attributes],
+                            video_note=False,
+                            force_document=False,
+                            reply_to=topic_id
+                        ),
+                        group_id, topic_id, label="group video"
+                    )
+
+                logger.info(f"✅ Successfully uploaded to group via parallel uploader: {result.id}")
+                return True
+
+            except Exception as e:
+                logger.warning(f"Built-in parallel upload failed for group upload: {e}")
+                peer_cache.invalidate_on_error(group_id, e)
+
         # Use FastTelethonhelper for ultra-fast uploads
         if FAST_TELETHON_AVAILABLE:
             logger.info("⚡ Using FastTelethonhelper for ultra-fast group upload")
@@ -6487,40 +9211,51 @@ async def upload_to_group_topic(video_file, caption, topic_id, group_id):
                             logger.info(f"⚡ FastTelethonhelper Group: {mb_uploaded}MB")
 
                 # Use FastTelethonhelper's fast_upload
-                file_object = await fast_upload(
-                    client_to_use,
-                    video_file,
-                    reply=None,
-                    name=os.path.basename(video_file),
-                    progress_bar_function=fast_progress_callback
-                )
+                async with client_pool.acquire() as upload_client:
+                    file_object = await fast_upload(
+                        upload_client,
+                        video_file,
+                        reply=None,
+                        name=os.path.basename(video_file),
+                        progress_bar_function=fast_progress_callback
+                    )
 
-                # Send the file to group as video with streaming support
-                result = await client_to_use.send_file(
-                    group_entity,
-                    file_object,
-                    caption=caption,
-                    supports_streaming=True,
-                    video_note=False,
-                    force_document=False,
-                    reply_to=topic_id
-                )
+                    # Send the file to group as video with streaming support
+                    result = await send_scheduler.run(
+                        lambda: upload_client.send_file(
+                            group_entity,
+                            file_object,
+                            caption=caption,
+                            supports_streaming=True,
+                            attributes=[video_attributes],
+                            video_note=False,
+                            force_document=False,
+                            reply_to=topic_id
+                        ),
+                        group_id, topic_id, label="group video"
+                    )
 
                 logger.info(f"✅ Successfully uploaded to group via FastTelethonhelper: {result.id}")
                 return True
 
             except Exception as e:
                 logger.warning(f"FastTelethonhelper failed for group upload: {e}")
+                peer_cache.invalidate_on_error(group_id, e)
                 # Fall back to standard method
                 logger.info("📤 Falling back to standard upload method for group")
 
-        # Standard upload method (fallback)
-        with open(video_file, 'rb') as video:
-            result = await client_to_use.send_file(
-                group_entity,
-                video,
-                supports_streaming=True,
-                reply_to=topic_id
+        # Standard upload method (fallback); upload once, then send under the scheduler
+        async with client_pool.acquire() as upload_client:
+            uploaded_file = await upload_client.upload_file(video_file)
+            result = await send_scheduler.run(
+                lambda: upload_client.send_file(
+                    group_entity,
+                    uploaded_file,
+                    supports_streaming=True,
+                    attributes=[video_attributes],
+                    reply_to=topic_id
+                ),
+                group_id, topic_id, label="group video"
             )
 
         logger.info(f"✅ Successfully uploaded to group: {result.id}")
@@ -6528,40 +9263,143 @@ async def upload_to_group_topic(video_file, caption, topic_id, group_id):
 
     except Exception as e:
         logger.error(f"❌ Failed to upload to group: {e}")
+        peer_cache.invalidate_on_error(group_id, e)
         return False
 
-async def post_images_to_group_topic(image_files, topic_id, group_id):
-    """Post images to a forum topic in a group or as regular messages"""
+async def notify_already_posted(update, context, posted, bot_messages_to_delete):
+    """Tell the user a link was already posted, forwarding the existing channel post when enabled"""
+    logger.info(f"♻️ Skipping already-posted link: {update.message.text}")
+    duplicate_msg = await update.message.reply_text("♻️ This link was already posted to the channel - skipping it.")
+    bot_messages_to_delete.append(duplicate_msg.message_id)
+    if DEDUPE_RESHARE_EXISTING and posted.get('message_id'):
+        try:
+            await context.bot.forward_message(
+                chat_id=update.effective_chat.id,
+                from_chat_id=posted['chat_id'],
+                message_id=posted['message_id']
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not forward the existing channel post: {e}")
+
+def clear_user_state(user_data):
+    """Clear a user's job state, deleting any cached media files still on disk"""
+    media_cache = user_data.get('media_cache')
+    if media_cache:
+        media_cache.clear()
+    job_checkpoints.clear(user_data.get('job_key'))
+    user_data.clear()
+
+async def send_photo_album(bot, chat_id, photos, reply_to_message_id=None):
+    """Send up to MEDIA_GROUP_SIZE photos (file paths or file_ids) as one album, returning the sent messages"""
+    open_files = []
     try:
-        global telegram_client
+        sources = []
+        for photo in photos:
+            if os.path.exists(photo):
+                photo = open(photo, 'rb')
+                open_files.append(photo)
+            sources.append(photo)
+
+        # Albums need at least two items
+        if len(sources) == 1:
+            message = await bot.send_photo(chat_id=chat_id, photo=sources[0], reply_to_message_id=reply_to_message_id)
+            return [message]
+        media = [InputMediaPhoto(source) for source in sources]
+        return list(await bot.send_media_group(chat_id=chat_id, media=media, reply_to_message_id=reply_to_message_id))
+    finally:
+        for file_obj in open_files:
+            file_obj.close()
+
+def format_image_failures(failed_images, total):
+    """Build a short user-facing report of images that could not be downloaded"""
+    lines = [f"⚠️ {len(failed_images)}/{total} image(s) could not be downloaded:"]
+    for result in failed_images[:10]:
+        lines.append(f"• Image {result['index']}: {result['error']}")
+    if len(failed_images) > 10:
+        lines.append(f"... and {len(failed_images) - 10} more")
+    return "\n".join(lines)
+
+async def post_images_to_channel(bot, downloaded_images, on_posted=None):
+    """Post downloaded images to the channel as albums, returning how many were sent"""
+    successful_uploads = 0
+    total_albums = (len(downloaded_images) + MEDIA_GROUP_SIZE - 1) // MEDIA_GROUP_SIZE
+
+    logger.info(f"📤 Starting album upload: {len(downloaded_images)} images in {total_albums} albums of up to {MEDIA_GROUP_SIZE}")
+
+    for album_num in range(total_albums):
+        start_idx = album_num * MEDIA_GROUP_SIZE
+        album = downloaded_images[start_idx:start_idx + MEDIA_GROUP_SIZE]
+        photo_paths = [img_data['file_path'] for img_data in album]
 
-        client_to_use = telegram_client
-        if not client_to_use or not client_to_use.is_connected():
-            await init_telegram_client()
-            client_to_use = telegram_client
+        try:
+            # Bot API sends are paced and flood-retried by send_scheduler
+            messages = await send_photo_album(bot, CHANNEL_ID, photo_paths)
+        except Exception as upload_error:
+            logger.error(f"❌ Error uploading album {album_num + 1}/{total_albums}: {upload_error}")
+            continue
 
-        if not client_to_use:
-            logger.error("❌ Telegram client is not available for image upload.")
-            return False
+        for img_data, message in zip(album, messages):
+            media_registry.record_bot_message(img_data['file_path'], message)
+        successful_uploads += len(album)
+        if on_posted:
+            on_posted(album)
+        logger.info(f"✅ Album {album_num + 1}/{total_albums} sent: images {start_idx + 1}-{start_idx + len(album)}")
+
+    return successful_uploads
 
-        group_entity = await client_to_use.get_entity(group_id)
+async def post_images_to_group_topic(image_files, topic_id, group_id, bot=None, on_posted=None):
+    """Post images to a forum topic in a group as albums"""
+    try:
+        global telegram_client
 
         successful_uploads = 0
+        client_to_use = None
+        group_entity = None
+        total_albums = (len(image_files) + MEDIA_GROUP_SIZE - 1) // MEDIA_GROUP_SIZE
+
+        for album_num in range(total_albums):
+            album = image_files[album_num * MEDIA_GROUP_SIZE:(album_num + 1) * MEDIA_GROUP_SIZE]
+            label = f"group album {album_num + 1}/{total_albums}"
+
+            # Images already posted to the channel are resent by file_id, without a second upload
+            entries = [media_registry.get(image_file) for image_file in album]
+            if bot and all(entry and entry.get('kind') == 'photo' for entry in entries):
+                try:
+                    await send_photo_album(bot, group_id, [entry['bot_file_id'] for entry in entries], topic_id)
+                    successful_uploads += len(album)
+                    if on_posted:
+                        on_posted(album)
+                    logger.info(f"♻️ {label} sent by reference ({len(album)} images)")
+                    continue
+                except Exception as e:
+                    logger.warning(f"⚠️ Sending {label} by reference failed, uploading instead: {e}")
 
-        for image_file in image_files:
             try:
-                with open(image_file, 'rb') as image:
-                    result = await client_to_use.send_file(
-                        group_entity,
-                        image,
-                        reply_to=topic_id
-                    )
+                if group_entity is None:
+                    client_to_use = telegram_client
+                    if not client_to_use or not client_to_use.is_connected():
+                        await init_telegram_client()
+                        client_to_use = telegram_client
+
+                    if not client_to_use:
+                        logger.error("❌ Telegram client is not available for image upload.")
+                        return False
+
+                    group_entity = await peer_cache.input_peer(client_to_use, group_id)
 
-                    successful_uploads += 1
-                    logger.info(f"✅ Uploaded image {successful_uploads}/{len(image_files)}")
+                async with client_pool.acquire() as upload_client:
+                    await send_scheduler.run(
+                        lambda: upload_client.send_file(group_entity, album, reply_to=topic_id),
+                        group_id, topic_id, label=label
+                    )
+                successful_uploads += len(album)
+                if on_posted:
+                    on_posted(album)
+                logger.info(f"✅ Uploaded {label} ({len(album)} images)")
 
             except Exception as e:
-                logger.error(f"❌ Failed to upload image {image_file}: {e}")
+                logger.error(f"❌ Failed to upload {label}: {e}")
+                peer_cache.invalidate_on_error(group_id, e)
 
         logger.info(f"✅ Successfully uploaded {successful_uploads}/{len(image_files)} images to group")
         return True
@@ -6589,7 +9427,7 @@ def run_flask():
 def run_bot_polling():
     """Function to run the Telegram bot's polling mechanism."""
     try:
-        application = Application.builder().token(BOT_TOKEN).build()
+        application = Application.builder().token(BOT_TOKEN).rate_limiter(SchedulerRateLimiter()).build()
 
         # Initialize API clients at startup (only if session files exist)
         async def post_init(application):
@@ -6604,6 +9442,8 @@ def run_bot_polling():
                     # Initialize Telegram client
                     if await init_telegram_client():
                         logger.info("✅ Telegram API client initialized successfully")
+                        await peer_cache.warm(telegram_client)
+                        await client_pool.refresh()
                     else:
                         logger.warning("⚠️ Telegram API client initialization failed")
 
@@ -6615,6 +9455,9 @@ def run_bot_polling():
             except Exception as e:
                 logger.error(f"❌ Error initializing API clients: {e}")
 
+            # Start the job workers (also resumes jobs left over from the last run)
+            processing_queue.start(application)
+
         # Add post_init callback to initialize API clients
         application.post_init = post_init
 
@@ -6626,6 +9469,9 @@ def run_bot_polling():
 
                 global telegram_client
 
+                # Disconnect the extra upload connections, then the main client
+                await client_pool.stop()
+
                 # Cleanup Telegram client
                 if telegram_client:
                     try:
@@ -6637,6 +9483,12 @@ def run_bot_polling():
                     finally:
                         telegram_client = None
 
+                # Stop job workers; unfinished jobs resume on the next start
+                await processing_queue.stop()
+
+                # Close the shared async HTTP session
+                await content_extractor.fetcher.close()
+
                 # Pyrogram cleanup removed - no longer used
 
             except Exception as e:
@@ -6964,13 +9816,29 @@ async def speed_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
         status_text += "\n**Upload Method Priority:**\n"
+        methods = []
+        if NATIVE_UPLOAD_ENABLED:
+            methods.append(f"🚀 Built-in parallel uploader ({UPLOAD_WORKERS} workers, {UPLOAD_PART_SIZE // 1024}KB parts, "
+                           f"{UPLOAD_CONNECTIONS} connection(s))")
         if FAST_TELETHON_AVAILABLE:
-            status_text += "1. ⚡ FastTelethon (ultra-fast)\n"
-            status_text += "2. 📤 Standard Telethon (fallback)\n"
-        else:
-            status_text += "1. 📤 Standard Telethon (fallback)\n"
-
-        if FAST_TELETHON_AVAILABLE:
+            methods.append("⚡ FastTelethon (ultra-fast)")
+        methods.append("📤 Standard Telethon (fallback)")
+        for number, method in enumerate(methods, 1):
+            status_text += f"{number}. {method}\n"
+
+        if upload_stats:
+            recent = list(upload_stats)
+            total_mb = sum(stats['mb'] for stats in recent)
+            total_seconds = sum(stats['seconds'] for stats in recent)
+            status_text += f"\n**Recent uploads ({len(recent)}):** {total_mb:.0f}MB at "
+            status_text += f"{total_mb / total_seconds if total_seconds else 0:.1f}MB/s average, "
+            status_text += f"best {max(stats['mb_per_second'] for stats in recent):.1f}MB/s, "
+            status_text += f"{sum(stats['retries'] for stats in recent)} part retries\n"
+        status_text += "**Pool connections:** " + (", ".join(
+            f"{name} ({'busy ' + str(active) if active else 'idle'}{'' if healthy else ', reconnecting'})"
+            for name, active, healthy in client_pool.stats()) or "not started") + "\n"
+
+        if FAST_TELETHON_AVAILABLE or NATIVE_UPLOAD_ENABLED:
             status_text += "\n✅ **Fast-upload optimizations are available!**"
         else:
             status_text += "\n⚠️ **No optimizations available.** Use `/install_optimizations` to install faster upload methods."
@@ -7240,7 +10108,7 @@ async def comprehensive_extract_command(update: Update, context: ContextTypes.DE
 
         try:
             # Use the comprehensive extraction function
-            result = content_extractor.extract_content_comprehensive(url)
+            result = await content_extractor.extract_content_comprehensive_async(url)
 
             if not result or result['title'] == "Error extracting content":
                 await update.message.edit_text("❌ **Failed to extract content from the URL**\n\nPlease check if the URL is valid and accessible.")
@@ -0,0 +1,95 @@
+import asyncio
+
+import main
+
+
+def attempt(log, name, result, delay=0.0, error=None):
+    async def run():
+        log.append(name)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return (name, run)
+
+
+def run_chain(attempts, default=None, hedge_delay=0.05):
+    return asyncio.run(main.first_success("test", attempts, bool, default=default, hedge_delay=hedge_delay))
+
+
+def test_primary_success_skips_fallbacks():
+    log = []
+    result = run_chain([attempt(log, 'primary', 'A'), attempt(log, 'fallback', 'B')])
+    assert result == 'A'
+    assert log == ['primary']
+
+
+def test_failed_primary_falls_through_in_order():
+    log = []
+    result = run_chain([
+        attempt(log, 'primary', None),
+        attempt(log, 'second', None, error=RuntimeError("boom")),
+        attempt(log, 'third', 'C'),
+    ])
+    assert result == 'C'
+    assert log == ['primary', 'second', 'third']
+
+
+def test_slow_primary_is_hedged_and_fallback_wins():
+    log = []
+    result = run_chain([attempt(log, 'primary', 'A', delay=1.0), attempt(log, 'fallback', 'B')])
+    assert result == 'B'
+    assert log == ['primary', 'fallback']
+
+
+def test_slow_primary_still_wins_if_it_finishes_first():
+    log = []
+    result = run_chain([attempt(log, 'primary', 'A', delay=0.08), attempt(log, 'fallback', 'B', delay=1.0)])
+    assert result == 'A'
+
+
+def test_earlier_attempt_wins_a_tie():
+    async def chain():
+        gate = asyncio.Event()
+
+        async def waiting(value):
+            await gate.wait()
+            return value
+
+        async def release_later():
+            await asyncio.sleep(0.1)
+            gate.set()
+
+        asyncio.ensure_future(release_later())
+        return await main.first_success("tie", [('primary', lambda: waiting('A')), ('fallback', lambda: waiting('B'))],
+                                        bool, hedge_delay=0.01)
+
+    assert asyncio.run(chain()) == 'A'
+
+
+def test_all_failing_returns_primary_result_or_default():
+    log = []
+    assert run_chain([attempt(log, 'primary', []), attempt(log, 'fallback', None)], default='none') == []
+    assert run_chain([attempt(log, 'primary', None, error=ValueError()), attempt(log, 'fallback', None)],
+                     default='none') == 'none'
+
+
+def test_losing_attempts_are_abandoned():
+    async def chain():
+        slow_finished = []
+
+        async def slow():
+            await asyncio.sleep(0.5)
+            slow_finished.append(True)
+            return 'A'
+
+        async def fast():
+            return 'B'
+
+        result = await main.first_success("abandon", [('primary', slow), ('fallback', fast)], bool, hedge_delay=0.01)
+        await asyncio.sleep(0.6)
+        return result, slow_finished
+
+    result, slow_finished = asyncio.run(chain())
+    assert result == 'B'
+    assert slow_finished == []
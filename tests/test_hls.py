@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+import main
+
+MASTER = """#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,RESOLUTION=640x360
+low/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720
+high/index.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:40
+#EXTINF:10.0,
+seg0.ts
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x0000000000000000000000000000ABCD
+#EXTINF:10.0,
+seg1.ts
+#EXT-X-KEY:METHOD=NONE
+#EXTINF:10.0,
+https://cdn.example.com/abs/seg2.ts
+#EXT-X-ENDLIST
+"""
+
+
+def test_parse_master_playlist_variants():
+    playlist = main.parse_m3u8(MASTER, "https://example.com/video/master.m3u8")
+    assert playlist['segments'] == []
+    assert playlist['variants'] == [
+        {'url': "https://example.com/video/low/index.m3u8", 'bandwidth': 800000},
+        {'url': "https://example.com/video/high/index.m3u8", 'bandwidth': 2500000},
+    ]
+
+
+def test_parse_media_playlist_segments_and_keys():
+    playlist = main.parse_m3u8(MEDIA, "https://example.com/video/high/index.m3u8")
+    segments = playlist['segments']
+    assert [segment['url'] for segment in segments] == [
+        "https://example.com/video/high/seg0.ts",
+        "https://example.com/video/high/seg1.ts",
+        "https://cdn.example.com/abs/seg2.ts",
+    ]
+    assert [segment['sequence'] for segment in segments] == [40, 41, 42]
+    assert segments[0]['key'] is None
+    assert segments[1]['key'] == {
+        'method': 'AES-128',
+        'uri': "https://example.com/video/high/key.bin",
+        'iv': bytes.fromhex("ABCD".zfill(32)),
+    }
+    assert segments[2]['key'] is None
+    assert playlist['init_url'] is None
+
+
+def test_parse_fmp4_init_segment():
+    playlist = main.parse_m3u8('#EXTM3U\n#EXT-X-MAP:URI="init.mp4"\n#EXTINF:4,\nseg0.m4s\n',
+                               "https://example.com/v/index.m3u8")
+    assert playlist['init_url'] == "https://example.com/v/init.mp4"
+    assert len(playlist['segments']) == 1
+
+
+class FakeHLSDownloader(main.HLSDownloader):
+    """Serves playlists and segments from memory; later segments arrive first"""
+
+    def __init__(self, files, delays):
+        super().__init__(fetcher=None, ffmpeg_path=None, concurrency=4, retries=1)
+        self.files = files
+        self.delays = delays
+
+    async def _fetch(self, url, headers):
+        await asyncio.sleep(self.delays.get(url, 0))
+        return self.files[url]
+
+
+def test_segments_are_written_in_playlist_order(tmp_path):
+    base = "https://example.com/v/"
+    count = 12
+    playlist = "#EXTM3U\n" + "".join(f"#EXTINF:2,\nseg{i}.ts\n" for i in range(count)) + "#EXT-X-ENDLIST\n"
+    files = {base + "index.m3u8": playlist.encode()}
+    files.update({base + f"seg{i}.ts": f"<segment {i}>".encode() for i in range(count)})
+    delays = {base + f"seg{i}.ts": (count - i) * 0.005 for i in range(count)}
+
+    output = str(tmp_path / "out.mp4")
+    result = asyncio.run(FakeHLSDownloader(files, delays).download(base + "index.m3u8", output))
+    assert result == output
+    with open(output, 'rb') as f:
+        assert f.read() == b"".join(f"<segment {i}>".encode() for i in range(count))
+
+
+def test_master_playlist_follows_best_variant(tmp_path):
+    base = "https://example.com/video/"
+    files = {
+        base + "master.m3u8": MASTER.encode(),
+        base + "high/index.m3u8": b"#EXTM3U\n#EXTINF:2,\na.ts\n#EXTINF:2,\nb.ts\n",
+        base + "high/a.ts": b"A",
+        base + "high/b.ts": b"B",
+    }
+    output = str(tmp_path / "out.mp4")
+    assert asyncio.run(FakeHLSDownloader(files, {}).download(base + "master.m3u8", output)) == output
+    with open(output, 'rb') as f:
+        assert f.read() == b"AB"
+
+
+def test_aes128_segment_uses_sequence_number_as_default_iv():
+    if not main.CRYPTOGRAPHY_AVAILABLE:
+        pytest.skip("cryptography not installed")
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    key = bytes(range(16))
+    plain = b"transport stream payload"
+    padding = 16 - len(plain) % 16
+    encryptor = Cipher(algorithms.AES(key), modes.CBC((7).to_bytes(16, 'big'))).encryptor()
+    data = encryptor.update(plain + bytes([padding]) * padding) + encryptor.finalize()
+
+    downloader = FakeHLSDownloader({"https://example.com/key": key}, {})
+    segment = {'url': "seg.ts", 'sequence': 7, 'key': {'method': 'AES-128', 'uri': "https://example.com/key", 'iv': None}}
+    assert asyncio.run(downloader._decrypt(data, segment, {})) == plain
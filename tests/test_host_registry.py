@@ -0,0 +1,50 @@
+import main
+
+
+def make_registry():
+    registry = main.HostRegistry()
+    registry.register(['example.com'], 'generic')
+    registry.register(['videos.example.com'], 'videos')
+    registry.register(['Vidoza.NET'], 'vidoza')
+    return registry
+
+
+def test_exact_and_subdomain_match():
+    registry = make_registry()
+    assert registry.lookup("https://vidoza.net/embed-1.html") == 'vidoza'
+    assert registry.lookup("https://www.vidoza.net/embed-1.html") == 'vidoza'
+    assert registry.lookup("https://a.b.vidoza.net/x") == 'vidoza'
+
+
+def test_most_specific_domain_wins():
+    registry = make_registry()
+    assert registry.lookup("https://videos.example.com/watch") == 'videos'
+    assert registry.lookup("https://cdn.videos.example.com/watch") == 'videos'
+    assert registry.lookup("https://www.example.com/") == 'generic'
+
+
+def test_lookalike_hosts_do_not_match():
+    registry = make_registry()
+    assert registry.lookup("https://notvidoza.net/x") is None
+    assert registry.lookup("https://vidoza.net.evil.com/x") is None
+    assert registry.lookup("https://example.com.evil.org/") is None
+
+
+def test_host_normalisation_and_default():
+    registry = make_registry()
+    assert registry.lookup("HTTPS://WWW.VIDOZA.NET:8443/x") == 'vidoza'
+    assert registry.lookup("vidoza.net/embed") == 'vidoza'
+    assert registry.lookup("https://unknown.org/", default='fallback') == 'fallback'
+    assert registry.lookup("") is None
+
+
+def test_bare_tld_is_never_matched():
+    registry = main.HostRegistry()
+    registry.register(['net'], 'tld')
+    assert registry.lookup("https://vidoza.net/") is None
+
+
+def test_builtin_media_hosts():
+    assert main.media_hosts.lookup("https://streamtape.com/e/abc") == 'streamtape'
+    assert main.media_hosts.lookup("https://i.imgur.com/a.jpg") == 'image_host'
+    assert main.media_hosts.lookup("https://example.org/") is None
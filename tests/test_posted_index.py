@@ -0,0 +1,67 @@
+import main
+
+
+def make_index(tmp_path):
+    return main.PostedIndex(db_path=str(tmp_path / "jobs.db"))
+
+
+def test_bloom_filter_membership():
+    bloom = main.BloomFilter(1000, 0.01)
+    bloom.add("page:https://example.com/a")
+    assert "page:https://example.com/a" in bloom
+    assert "page:https://example.com/b" not in bloom
+
+
+def test_record_and_lookup_page(tmp_path):
+    index = make_index(tmp_path)
+    assert index.lookup_page("https://example.com/post") is None
+    index.record_page(["https://example.com/post", None], chat_id=-100, message_id=7)
+    assert index.lookup_page("https://example.com/post") == {'chat_id': -100, 'message_id': 7}
+    index.close()
+
+
+def test_record_and_lookup_media_by_hash(tmp_path):
+    index = make_index(tmp_path)
+    index.record_media(["https://cdn.example.com/v.mp4"], content_hash="abc", chat_id=-100, message_id=9)
+    assert index.lookup_media(url="https://cdn.example.com/v.mp4")['message_id'] == 9
+    assert index.lookup_media(content_hash="abc")['message_id'] == 9
+    assert index.lookup_media(url="https://cdn.example.com/other.mp4") is None
+    index.close()
+
+
+def test_index_survives_reopen(tmp_path):
+    index = make_index(tmp_path)
+    index.record_page(["https://example.com/post"], chat_id=-100, message_id=7)
+    index.close()
+    assert make_index(tmp_path).lookup_page("https://example.com/post")['message_id'] == 7
+
+
+def test_link_redirecting_to_posted_page_is_found(tmp_path):
+    index = make_index(tmp_path)
+    index.record_page(["https://example.com/final-page"], chat_id=-100, message_id=5)
+
+    # Input URL -> redirect -> already-posted page
+    snapshot = main.PageSnapshot("https://short.example/abc", html="<html></html>",
+                                 final_url="https://example.com/final-page")
+    assert index.lookup_page("https://short.example/abc") is None
+    posted = index.lookup_redirected_page("https://short.example/abc", snapshot.final_url)
+    assert posted == {'chat_id': -100, 'message_id': 5}
+    index.close()
+
+
+def test_redirect_lookup_ignores_unredirected_links(tmp_path):
+    index = make_index(tmp_path)
+    index.record_page(["https://example.com/page"], chat_id=-100, message_id=5)
+    # No redirect: the normal lookup already handled this link
+    assert index.lookup_redirected_page("https://example.com/page", "https://example.com/page") is None
+    assert index.lookup_redirected_page("https://example.com/page", None) is None
+    index.close()
+
+
+def test_redirected_job_records_final_url(tmp_path):
+    index = make_index(tmp_path)
+    # process_url_complete records both the link as sent and the page it redirected to
+    index.record_page(["https://short.example/abc", "https://example.com/final-page"], chat_id=-100, message_id=3)
+    assert index.lookup_page("https://short.example/abc")['message_id'] == 3
+    assert index.lookup_redirected_page("https://other.example/x", "https://example.com/final-page")['message_id'] == 3
+    index.close()
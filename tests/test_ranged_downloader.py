@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+import aiohttp
+from aiohttp import web
+
+import main
+
+
+class SessionFetcher:
+    def __init__(self):
+        self.session = None
+
+    async def get_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+
+def test_plan_ranges_covers_file_without_gaps():
+    downloader = main.RangedDownloader(SessionFetcher(), chunk_size=10)
+    assert downloader.plan_ranges(25) == [(0, 9), (10, 19), (20, 24)]
+    assert downloader.plan_ranges(20) == [(0, 9), (10, 19)]
+    assert downloader.plan_ranges(0) == []
+
+
+def test_plan_ranges_sizes_add_up():
+    downloader = main.RangedDownloader(SessionFetcher(), chunk_size=8 * 1024 * 1024)
+    total = 123_456_789
+    ranges = downloader.plan_ranges(total)
+    assert ranges[0][0] == 0 and ranges[-1][1] == total - 1
+    assert sum(end - start + 1 for start, end in ranges) == total
+    assert all(next_start == end + 1 for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+
+
+def serve(payload, short_range=None):
+    """Local server answering range requests; short_range=(start) truncates that range's response"""
+    async def handler(request):
+        header = request.headers.get('Range')
+        if not header:
+            return web.Response(body=payload, headers={'Accept-Ranges': 'bytes'})
+        start, end = header.split('=')[1].split('-')
+        start, end = int(start), int(end or len(payload) - 1)
+        body = payload[start:end + 1]
+        if short_range is not None and start == short_range:
+            body = body[:len(body) // 2]
+        return web.Response(status=206, body=body, headers={
+            'Content-Range': f'bytes {start}-{start + len(body) - 1}/{len(payload)}',
+            'Content-Type': 'video/mp4',
+        })
+
+    app = web.Application()
+    app.router.add_get('/video.mp4', handler)
+    return app
+
+
+async def download(tmp_path, payload, short_range=None, **kwargs):
+    runner = web.AppRunner(serve(payload, short_range))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    fetcher = SessionFetcher()
+    try:
+        downloader = main.RangedDownloader(fetcher, connections=3, chunk_size=64 * 1024, retries=1)
+        output = str(tmp_path / 'video.mp4')
+        return await downloader.download(f'http://127.0.0.1:{port}/video.mp4', output, **kwargs), output
+    finally:
+        if fetcher.session:
+            await fetcher.session.close()
+        await runner.cleanup()
+
+
+def test_ranged_download_reassembles_file(tmp_path):
+    payload = os.urandom(300 * 1024 + 17)
+    done = []
+    result, output = asyncio.run(download(tmp_path, payload, on_range_done=lambda start, end: done.append((start, end))))
+    assert result == output
+    with open(output, 'rb') as f:
+        assert f.read() == payload
+    assert sorted(done) == main.RangedDownloader(None, chunk_size=64 * 1024).plan_ranges(len(payload))
+
+
+def test_short_range_fails_the_download(tmp_path):
+    payload = os.urandom(300 * 1024)
+    result, output = asyncio.run(download(tmp_path, payload, short_range=128 * 1024))
+    assert result is None
+    assert not os.path.exists(output)
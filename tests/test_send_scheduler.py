@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+class FakeClock:
+    """Monotonic clock that only moves when main sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += max(seconds, 0)
+        await asyncio.sleep(0)
+
+
+class FakeAsyncio:
+    def __init__(self, clock):
+        self._clock = clock
+
+    def __getattr__(self, name):
+        if name == 'sleep':
+            return self._clock.sleep
+        return getattr(asyncio, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, 'time', clock)
+    monkeypatch.setattr(main, 'asyncio', FakeAsyncio(clock))
+    return clock
+
+
+def test_token_bucket_allows_burst_then_paces(clock):
+    bucket = main.TokenBucket(rate=2, capacity=3)
+
+    async def take(count):
+        times = []
+        for _ in range(count):
+            await bucket.acquire()
+            times.append(clock.now - 1000.0)
+        return times
+
+    times = asyncio.run(take(5))
+    assert times[:3] == [0, 0, 0]
+    assert times[3] == pytest.approx(0.5)
+    assert times[4] == pytest.approx(1.0)
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = main.TokenBucket(rate=1, capacity=2)
+
+    async def run():
+        await bucket.acquire()
+        await bucket.acquire()
+        clock.now += 100  # Idle time never banks more than capacity
+        start = clock.now
+        for _ in range(3):
+            await bucket.acquire()
+        return clock.now - start
+
+    assert asyncio.run(run()) == pytest.approx(1.0)
+
+
+def test_private_chat_is_paced_per_chat(clock):
+    scheduler = main.SendScheduler()
+
+    async def run():
+        for _ in range(main.SEND_BURST_PRIVATE + 2):
+            await scheduler.acquire(12345)
+        return clock.now - 1000.0
+
+    assert asyncio.run(run()) == pytest.approx(2 / main.SEND_RATE_PRIVATE)
+
+
+def test_edits_do_not_use_the_chat_budget(clock):
+    scheduler = main.SendScheduler()
+
+    async def run():
+        for _ in range(10):
+            await scheduler.acquire(12345, edit=True)
+        edits_done = clock.now
+        for _ in range(main.SEND_BURST_PRIVATE):
+            await scheduler.acquire(12345)
+        return edits_done, clock.now
+
+    edits_done, replies_done = asyncio.run(run())
+    assert edits_done > 1000.0  # Edits were paced...
+    assert replies_done == edits_done  # ...but the reply burst was still available
+
+
+def test_topic_sends_are_paced_per_topic(clock):
+    scheduler = main.SendScheduler()
+
+    async def run():
+        await scheduler.acquire(-100123, topic_id=5)
+        await scheduler.acquire(-100123, topic_id=6)
+        other_topic = clock.now
+        await scheduler.acquire(-100123, topic_id=5)
+        return other_topic, clock.now
+
+    other_topic, same_topic = asyncio.run(run())
+    assert other_topic == 1000.0
+    assert same_topic == pytest.approx(1000.0 + 1 / main.SEND_RATE_TOPIC)
+
+
+def test_flood_wait_blocks_the_chat_and_retries(clock):
+    scheduler = main.SendScheduler()
+    calls = []
+
+    async def send():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise main.FloodWaitError(request=None, capture=7)
+        return "sent"
+
+    assert asyncio.run(scheduler.run(send, -100123)) == "sent"
+    assert calls[1] - calls[0] >= 7
@@ -0,0 +1,103 @@
+import asyncio
+import struct
+
+import main
+
+
+def box(box_type, payload, large=False):
+    if large:
+        return struct.pack('>I4sQ', 1, box_type, len(payload) + 16) + payload
+    return struct.pack('>I4s', len(payload) + 8, box_type) + payload
+
+
+def trak(handler, codec, width=0, height=0, rotated=False, version=0):
+    a, b, c, d = (0, 0x10000, -0x10000, 0) if rotated else (0x10000, 0, 0, 0x10000)
+    matrix = struct.pack('>9i', a, b, 0, c, d, 0, 0, 0, 0x40000000)
+    header = struct.pack('>B3x', version) + b'\0' * (32 if version == 1 else 20)
+    tkhd = box(b'tkhd', header + b'\0' * 16 + matrix + struct.pack('>II', width << 16, height << 16))
+    hdlr = box(b'hdlr', b'\0' * 8 + handler + b'\0' * 12 + b'name\0')
+    stsd = box(b'stsd', b'\0' * 4 + struct.pack('>I', 1) + struct.pack('>I4s', 16, codec) + b'\0' * 8)
+    return box(b'trak', tkhd + box(b'mdia', hdlr + box(b'minf', box(b'stbl', stsd))))
+
+
+def moov(version=0, rotated=False):
+    if version == 1:
+        mvhd = box(b'mvhd', struct.pack('>B3x', 1) + b'\0' * 16 + struct.pack('>IQ', 1000, 93500) + b'\0' * 80)
+    else:
+        mvhd = box(b'mvhd', struct.pack('>B3x', 0) + b'\0' * 8 + struct.pack('>II', 600, 600 * 42) + b'\0' * 80)
+    return box(b'moov', mvhd + trak(b'vide', b'avc1', 1280, 720, rotated, version) + trak(b'soun', b'mp4a'))
+
+
+FTYP = box(b'ftyp', b'isom\0\0\0\0isomavc1')
+MDAT = box(b'mdat', b'\0' * 4096, large=True)
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_moov_at_end_is_not_faststart(tmp_path):
+    info = main.probe_mp4(write(tmp_path, 'end.mp4', FTYP + MDAT + moov()))
+    assert info == {
+        'container': 'mp4',
+        'duration': 42.0,
+        'width': 1280,
+        'height': 720,
+        'video_codec': 'avc1',
+        'audio_codec': 'mp4a',
+        'faststart': False,
+    }
+
+
+def test_moov_first_is_faststart_with_version1_boxes_and_rotation(tmp_path):
+    info = main.probe_mp4(write(tmp_path, 'start.mp4', FTYP + moov(version=1, rotated=True) + MDAT))
+    assert info['faststart'] is True
+    assert info['duration'] == 93.5
+    # Rotated 90 degrees: the player shows it portrait
+    assert (info['width'], info['height']) == (720, 1280)
+
+
+def test_non_mp4_and_missing_moov_return_none(tmp_path):
+    assert main.probe_mp4(write(tmp_path, 'video.mkv', b'\x1aE\xdf\xa3' + b'x' * 1000)) is None
+    assert main.probe_mp4(write(tmp_path, 'partial.mp4', FTYP + MDAT)) is None
+    assert main.probe_mp4(str(tmp_path / 'missing.mp4')) is None
+
+
+def test_truncated_moov_does_not_raise(tmp_path):
+    data = FTYP + MDAT + moov()
+    info = main.probe_mp4(write(tmp_path, 'cut.mp4', data[:-40]))
+    assert info is None or info['faststart'] is False
+
+
+def test_video_attributes_use_probe_values():
+    attributes = main.get_video_attributes_for_streaming({'duration': 41.6, 'width': 1280, 'height': 720})
+    assert (attributes.duration, attributes.w, attributes.h) == (42, 1280, 720)
+    assert attributes.supports_streaming
+    defaults = main.get_video_attributes_for_streaming(None)
+    assert (defaults.duration, defaults.w, defaults.h) == (0, 1920, 1080)
+
+
+def test_faststart_remux_only_when_needed(tmp_path, monkeypatch):
+    remuxes = []
+
+    async def fake_remux(cmd, label, timeout=None, progress_callback=None):
+        remuxes.append(cmd)
+        output = cmd[cmd.index('-f') + 2]
+        with open(output, 'wb') as f:
+            f.write(FTYP + moov() + MDAT)
+        return 0, ''
+
+    monkeypatch.setattr(main, 'run_media_subprocess', fake_remux)
+    monkeypatch.setattr(main.ContentExtractor, 'get_ffmpeg_path', lambda self: '/usr/bin/ffmpeg')
+
+    start_path = write(tmp_path, 'start.mp4', FTYP + moov() + MDAT)
+    info = asyncio.run(main.prepare_video_for_upload(start_path))
+    assert info['faststart'] is True and remuxes == []
+
+    end_path = write(tmp_path, 'end.mp4', FTYP + MDAT + moov())
+    info = asyncio.run(main.prepare_video_for_upload(end_path))
+    assert len(remuxes) == 1
+    assert info['faststart'] is True
+    assert main.probe_mp4(end_path)['faststart'] is True